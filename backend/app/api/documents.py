@@ -3,19 +3,24 @@ Documents API router.
 Handles document upload, listing, deletion, and semantic search.
 """
 
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, BackgroundTasks
+from datetime import datetime, timezone
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 from typing import Optional, List
+import asyncio
+import os
 import uuid
 
-from app.core.database import get_supabase
+from app.core.config import settings
+from app.core.database import get_supabase, run_query
 from app.models.document_schemas import (
     Document,
     DocumentUploadResponse,
+    IngestionJobStatus,
     DocumentSearchRequest,
     DocumentSearchResponse,
     DocumentSearchResult,
 )
-from app.services.document_processor import DocumentProcessor
+from app.services.ingestion_queue import get_ingestion_queue
 from app.services.vector_store import get_vector_store, VectorStoreManager
 
 
@@ -25,56 +30,42 @@ router = APIRouter(prefix="/api/documents", tags=["documents"])
 # Supported file types
 ALLOWED_EXTENSIONS = {"pdf", "docx", "xlsx", "xls", "csv", "txt", "md"}
 MAX_FILE_SIZE = 50 * 1024 * 1024  # 50 MB
+SPOOL_CHUNK_SIZE = 1024 * 1024  # 1 MB
 
 
-async def _process_and_index_document(
-    document_id: str,
-    file_content: bytes,
-    file_name: str,
-    file_type: str,
-    collection_name: str,
-):
-    """Background task to process and index a document."""
-    db = get_supabase()
-    vector_store = get_vector_store()
-    processor = DocumentProcessor()
+async def _spool_upload(file: UploadFile, file_ext: str) -> tuple[str, int]:
+    """
+    Stream an upload to the spool directory in chunks.
+
+    Returns:
+        Tuple of (spool path, file size in bytes)
+    """
+    os.makedirs(settings.ingestion_spool_dir, exist_ok=True)
+    path = os.path.abspath(os.path.join(settings.ingestion_spool_dir, f"{uuid.uuid4()}.{file_ext}"))
+    file_size = 0
     
     try:
-        # Process the file into chunks
-        chunks = processor.process_file(
-            file_content=file_content,
-            file_name=file_name,
-            file_type=file_type,
-            additional_metadata={"document_id": document_id},
-        )
-        
-        if not chunks:
-            raise ValueError("No text content extracted from document")
-        
-        # Index chunks in Qdrant
-        chunk_count = await vector_store.index_document(
-            collection_name=collection_name,
-            document_id=document_id,
-            chunks=chunks,
-        )
-        
-        # Update document status to indexed
-        db.table("documents").update({
-            "status": "indexed",
-            "chunk_count": chunk_count,
-        }).eq("id", document_id).execute()
-        
-    except Exception as e:
-        # Update document status to failed
-        db.table("documents").update({
-            "status": "failed",
-            "error_message": str(e),
-        }).eq("id", document_id).execute()
+        with open(path, "wb") as spool:
+            while chunk := await file.read(SPOOL_CHUNK_SIZE):
+                file_size += len(chunk)
+                if file_size > MAX_FILE_SIZE:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"File too large. Maximum size is {MAX_FILE_SIZE // (1024*1024)} MB"
+                    )
+                await asyncio.to_thread(spool.write, chunk)
+    except BaseException:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass  # open() never created it
+        raise
+    
+    return path, file_size
 
 
 @router.post("/upload", response_model=DocumentUploadResponse)
 async def upload_document(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     meeting_id: Optional[str] = Form(None),
     persona_id: Optional[str] = Form(None),
@@ -111,17 +102,6 @@ async def upload_document(
             detail=f"File type '{file_ext}' not supported. Allowed: {', '.join(ALLOWED_EXTENSIONS)}"
         )
     
-    # Read file content
-    file_content = await file.read()
-    file_size = len(file_content)
-    
-    # Validate file size
-    if file_size > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File too large. Maximum size is {MAX_FILE_SIZE // (1024*1024)} MB"
-        )
-    
     # Determine collection name
     if meeting_id:
         collection_name = VectorStoreManager.meeting_collection_name(meeting_id)
@@ -132,6 +112,9 @@ async def upload_document(
     else:
         raise HTTPException(status_code=400, detail="Invalid target for document upload")
     
+    # Spool to disk (enforces the size limit without buffering the whole file)
+    spool_path, file_size = await _spool_upload(file, file_ext)
+    
     # Create document record
     document_id = str(uuid.uuid4())
     db = get_supabase()
@@ -152,17 +135,21 @@ async def upload_document(
     elif stack_id:
         doc_data["stack_id"] = stack_id
     
-    db.table("documents").insert(doc_data).execute()
-    
-    # Queue background processing
-    background_tasks.add_task(
-        _process_and_index_document,
-        document_id=document_id,
-        file_content=file_content,
-        file_name=file.filename,
-        file_type=file_ext,
-        collection_name=collection_name,
-    )
+    try:
+        await run_query(db.table("documents").insert(doc_data))
+        
+        # Queue durable background processing
+        await get_ingestion_queue().enqueue(
+            document_id=document_id,
+            spool_path=spool_path,
+            file_name=file.filename,
+            file_type=file_ext,
+            file_size=file_size,
+            collection_name=collection_name,
+        )
+    except BaseException:
+        os.unlink(spool_path)
+        raise
     
     return DocumentUploadResponse(
         id=document_id,
@@ -178,11 +165,12 @@ async def list_meeting_documents(meeting_id: str):
     """List all documents for a meeting."""
     db = get_supabase()
     
-    result = db.table("documents")\
-        .select("*")\
-        .eq("meeting_id", meeting_id)\
-        .order("created_at", desc=True)\
-        .execute()
+    result = await run_query(
+        db.table("documents")
+        .select("*")
+        .eq("meeting_id", meeting_id)
+        .order("created_at", desc=True)
+    )
     
     return result.data
 
@@ -192,11 +180,12 @@ async def list_persona_documents(persona_id: str):
     """List all documents in a persona's knowledge stack."""
     db = get_supabase()
     
-    result = db.table("documents")\
-        .select("*")\
-        .eq("persona_id", persona_id)\
-        .order("created_at", desc=True)\
-        .execute()
+    result = await run_query(
+        db.table("documents")
+        .select("*")
+        .eq("persona_id", persona_id)
+        .order("created_at", desc=True)
+    )
     
     return result.data
 
@@ -206,11 +195,12 @@ async def list_stack_documents(stack_id: str):
     """List all documents in a knowledge stack."""
     db = get_supabase()
     
-    result = db.table("documents")\
-        .select("*")\
-        .eq("stack_id", stack_id)\
-        .order("created_at", desc=True)\
-        .execute()
+    result = await run_query(
+        db.table("documents")
+        .select("*")
+        .eq("stack_id", stack_id)
+        .order("created_at", desc=True)
+    )
     
     return result.data
 
@@ -220,11 +210,12 @@ async def get_document(document_id: str):
     """Get a single document by ID."""
     db = get_supabase()
     
-    result = db.table("documents")\
-        .select("*")\
-        .eq("id", document_id)\
-        .single()\
-        .execute()
+    result = await run_query(
+        db.table("documents")
+        .select("*")
+        .eq("id", document_id)
+        .single()
+    )
     
     if not result.data:
         raise HTTPException(status_code=404, detail="Document not found")
@@ -232,6 +223,32 @@ async def get_document(document_id: str):
     return result.data
 
 
+@router.get("/{document_id}/job", response_model=IngestionJobStatus)
+async def get_document_job(document_id: str):
+    """Get the ingestion job status and timings for a document."""
+    job = await get_ingestion_queue().get_for_document(document_id)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="No ingestion job for document")
+    
+    def to_datetime(ts: Optional[float]) -> Optional[datetime]:
+        return datetime.fromtimestamp(ts, tz=timezone.utc) if ts is not None else None
+    
+    return IngestionJobStatus(
+        job_id=job.id,
+        document_id=job.document_id,
+        status=job.status,
+        attempts=job.attempts,
+        file_size_bytes=job.file_size,
+        enqueued_at=to_datetime(job.enqueued_at),
+        started_at=to_datetime(job.started_at),
+        finished_at=to_datetime(job.finished_at),
+        queued_seconds=job.queued_seconds,
+        processing_seconds=job.processing_seconds,
+        last_error=job.last_error,
+    )
+
+
 @router.delete("/{document_id}")
 async def delete_document(document_id: str):
     """
@@ -241,17 +258,25 @@ async def delete_document(document_id: str):
     vector_store = get_vector_store()
     
     # Get document info
-    result = db.table("documents")\
-        .select("*")\
-        .eq("id", document_id)\
-        .single()\
-        .execute()
+    result = await run_query(
+        db.table("documents")
+        .select("*")
+        .eq("id", document_id)
+        .single()
+    )
     
     if not result.data:
         raise HTTPException(status_code=404, detail="Document not found")
     
     doc = result.data
     
+    # Drop a pending ingestion job and its spooled upload
+    for path in await get_ingestion_queue().cancel_for_document(document_id):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+    
     # Delete vectors from Qdrant
     if doc.get("qdrant_collection"):
         await vector_store.delete_document(
@@ -260,7 +285,7 @@ async def delete_document(document_id: str):
         )
     
     # Delete document record
-    db.table("documents").delete().eq("id", document_id).execute()
+    await run_query(db.table("documents").delete().eq("id", document_id))
     
     return {"message": "Document deleted", "id": document_id}
 
@@ -310,10 +335,11 @@ async def search_documents(request: DocumentSearchRequest):
     doc_info = {}
     
     if document_ids:
-        docs = db.table("documents")\
-            .select("id, file_name")\
-            .in_("id", document_ids)\
-            .execute()
+        docs = await run_query(
+            db.table("documents")
+            .select("id, file_name")
+            .in_("id", document_ids)
+        )
         doc_info = {d["id"]: d["file_name"] for d in docs.data}
     
     return DocumentSearchResponse(
@@ -3,7 +3,7 @@ from typing import Optional
 from datetime import datetime
 import uuid
 
-from app.core.database import get_supabase
+from app.core.database import get_supabase, run_query
 from app.models.knowledge_stacks_schemas import (
     KnowledgeStack,
     KnowledgeStackCreate,
@@ -23,7 +23,7 @@ async def list_knowledge_stacks(user_id: Optional[str] = None):
         # Get user's stacks
         query = query.eq("user_id", user_id)
         
-    result = query.order("created_at", desc=True).execute()
+    result = await run_query(query.order("created_at", desc=True))
     stacks = [KnowledgeStack(**s) for s in result.data]
     
     return KnowledgeStackListResponse(stacks=stacks, total=len(stacks))
@@ -45,7 +45,7 @@ async def create_knowledge_stack(data: KnowledgeStackCreate):
         "updated_at": now,
     }
     
-    result = db.table("knowledge_stacks").insert(stack_data).execute()
+    result = await run_query(db.table("knowledge_stacks").insert(stack_data))
     return KnowledgeStack(**result.data[0])
 
 
@@ -53,7 +53,7 @@ async def create_knowledge_stack(data: KnowledgeStackCreate):
 async def get_knowledge_stack(stack_id: str):
     """Get a specific knowledge stack."""
     db = get_supabase()
-    result = db.table("knowledge_stacks").select("*").eq("id", stack_id).execute()
+    result = await run_query(db.table("knowledge_stacks").select("*").eq("id", stack_id))
     
     if not result.data:
         raise HTTPException(status_code=404, detail="Knowledge stack not found")
@@ -77,7 +77,7 @@ async def update_knowledge_stack(stack_id: str, data: KnowledgeStackUpdate):
         
     update_data["updated_at"] = datetime.utcnow().isoformat()
     
-    result = db.table("knowledge_stacks").update(update_data).eq("id", stack_id).execute()
+    result = await run_query(db.table("knowledge_stacks").update(update_data).eq("id", stack_id))
     
     if not result.data:
         raise HTTPException(status_code=404, detail="Knowledge stack not found")
@@ -89,7 +89,7 @@ async def update_knowledge_stack(stack_id: str, data: KnowledgeStackUpdate):
 async def delete_knowledge_stack(stack_id: str):
     """Delete a knowledge stack."""
     db = get_supabase()
-    result = db.table("knowledge_stacks").delete().eq("id", stack_id).execute()
+    result = await run_query(db.table("knowledge_stacks").delete().eq("id", stack_id))
     
     if not result.data:
         raise HTTPException(status_code=404, detail="Knowledge stack not found")
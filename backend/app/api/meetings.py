@@ -5,6 +5,7 @@ Meetings API routes.
 from fastapi import APIRouter, HTTPException
 from typing import List
 
+from app.core.config import settings
 from app.models import (
     Meeting,
     MeetingCreate,
@@ -19,11 +20,17 @@ from app.models import (
     Consensus,
     EndMeetingRequest,
     EndMeetingResponse,
-    EndMeetingVote,
     MeetingStatus,
 )
 from app.services import MeetingManager, Orchestrator
-from app.llm import get_provider, LLMMessage
+from app.services.tokens import count_tokens_cached, get_context_length, meeting_encoding
+from app.services.voting import collect_votes, is_majority
+from app.services.meeting_summarizer import (
+    format_transcript,
+    get_meeting_summarizer,
+    get_summary_provider,
+)
+from app.llm import LLMMessage, LLMProvider
 
 router = APIRouter()
 
@@ -140,56 +147,32 @@ async def get_consensus(meeting_id: str):
 
 @router.get("/{meeting_id}/context-stats")
 async def get_context_stats(meeting_id: str):
-    """Get context/token usage statistics for a meeting."""
-    import tiktoken
+    """
+    Get context/token usage statistics for a meeting.
     
+    Message tokens come from the meeting's running total (each message is
+    counted once, when saved), so the transcript is never loaded or re-encoded.
+    """
     manager = get_meeting_manager()
-    meeting = await manager.get_meeting(meeting_id)
+    meeting = await manager.get_meeting_overview(meeting_id)
     
     if not meeting:
         raise HTTPException(status_code=404, detail="Meeting not found")
     
-    # Use cl100k_base encoding (used by Claude, GPT-4, etc.)
-    try:
-        enc = tiktoken.get_encoding("cl100k_base")
-    except Exception:
-        # Fallback: rough estimate of 4 chars per token
-        total_chars = 0
-        for msg in meeting.messages:
-            total_chars += len(msg.content)
-            if msg.thinking_content:
-                total_chars += len(msg.thinking_content)
-        for participant in meeting.participants:
-            total_chars += len(participant.system_prompt)
-        
-        estimated_tokens = total_chars // 4
-        max_tokens = 128000  # Claude's context window
-        
-        return {
-            "current_tokens": estimated_tokens,
-            "max_tokens": max_tokens,
-            "usage_percent": round((estimated_tokens / max_tokens) * 100, 1),
-            "message_count": len(meeting.messages),
-            "participant_count": len(meeting.participants),
-        }
-    
-    # Count tokens in all messages
-    message_tokens = 0
-    for msg in meeting.messages:
-        message_tokens += len(enc.encode(msg.content))
-        if msg.thinking_content:
-            message_tokens += len(enc.encode(msg.thinking_content))
-    
-    # Count tokens in system prompts
-    system_tokens = 0
-    for participant in meeting.participants:
-        system_tokens += len(enc.encode(participant.system_prompt))
-    
-    # Count agenda tokens
-    agenda_tokens = len(enc.encode(meeting.agenda)) if meeting.agenda else 0
+    encoding = meeting_encoding(meeting.participants)
+    
+    message_tokens = meeting.message_tokens
+    system_tokens = sum(count_tokens_cached(p.system_prompt, encoding) for p in meeting.participants)
+    agenda_tokens = count_tokens_cached(meeting.agenda, encoding)
     
     total_tokens = message_tokens + system_tokens + agenda_tokens
-    max_tokens = 128000  # Claude's context window (can be made configurable)
+    max_tokens = settings.context_window_tokens or min(
+        (
+            get_context_length(p.provider_config.provider or None, p.provider_config.model or None)
+            for p in meeting.participants
+        ),
+        default=settings.context_default_length,
+    )
     
     return {
         "current_tokens": total_tokens,
@@ -198,8 +181,9 @@ async def get_context_stats(meeting_id: str):
         "message_tokens": message_tokens,
         "system_tokens": system_tokens,
         "agenda_tokens": agenda_tokens,
-        "message_count": len(meeting.messages),
+        "message_count": meeting.message_count,
         "participant_count": len(meeting.participants),
+        "encoding": encoding,
     }
 
 
@@ -217,107 +201,53 @@ async def end_meeting(meeting_id: str, data: EndMeetingRequest):
     
     votes = []
     
-    # If not force end, collect votes from each AI
+    # If not force end, collect votes from all AIs concurrently
     if not data.force_end:
         await manager.update_meeting_status(meeting_id, MeetingStatus.VOTING.value)
         
-        # Build conversation summary for voting context
-        recent_messages = meeting.messages[-20:]  # Last 20 messages for context
-        conversation_context = "\n".join([
-            f"{msg.sender_name}: {msg.content[:200]}..." if len(msg.content) > 200 else f"{msg.sender_name}: {msg.content}"
-            for msg in recent_messages
-        ])
-        
-        # Get vote from each participant
-        for participant in meeting.participants:
-            try:
-                provider = get_provider(
-                    participant.provider_config.provider or None,
-                    participant.provider_config.model or None
-                )
-                
-                vote_prompt = f"""You are {participant.name}, a {participant.role} in this meeting.
-                
-The user is proposing to end this meeting. Based on the recent discussion below, please vote on whether you think the meeting should end now.
-
-RECENT DISCUSSION:
-{conversation_context}
-
-MEETING AGENDA:
-{meeting.agenda}
-
-Please respond with ONLY a JSON object in this exact format (no other text):
-{{"vote": true or false, "reason": "Your brief reason (1-2 sentences)"}}
-
-Vote TRUE if you believe the meeting has achieved its objectives or reached a natural conclusion.
-Vote FALSE if you believe there are important topics still to discuss."""
-
-                messages = [LLMMessage(role="user", content=vote_prompt)]
-                response = await provider.complete(messages=messages, tools=[], temperature=0.3)
-                
-                # Parse the response
-                import json
-                try:
-                    content = response.content.strip()
-                    # Try to extract JSON from the response
-                    if "```json" in content:
-                        content = content.split("```json")[1].split("```")[0].strip()
-                    elif "```" in content:
-                        content = content.split("```")[1].split("```")[0].strip()
-                    
-                    vote_data = json.loads(content)
-                    votes.append(EndMeetingVote(
-                        participant_id=participant.id,
-                        participant_name=participant.name,
-                        vote=vote_data.get("vote", False),
-                        reason=vote_data.get("reason", "No reason provided")
-                    ))
-                except (json.JSONDecodeError, KeyError):
-                    # If parsing fails, mark as abstain (no vote)
-                    votes.append(EndMeetingVote(
-                        participant_id=participant.id,
-                        participant_name=participant.name,
-                        vote=False,
-                        reason=f"Could not parse vote response: {response.content[:100]}..."
-                    ))
-                    
-            except Exception as e:
-                votes.append(EndMeetingVote(
-                    participant_id=participant.id,
-                    participant_name=participant.name,
-                    vote=False,
-                    reason=f"Error getting vote: {str(e)}"
-                ))
+        async for vote in collect_votes(meeting, timeout=settings.vote_timeout):
+            votes.append(vote)
         
         # Check if majority voted to end
         yes_votes = sum(1 for v in votes if v.vote)
-        should_end = yes_votes > len(votes) / 2
         
-        if not should_end:
+        if not is_majority(votes, len(meeting.participants)):
             # Revert to active status
             await manager.update_meeting_status(meeting_id, MeetingStatus.ACTIVE.value)
             return EndMeetingResponse(
                 success=False,
                 votes=votes,
                 summary=None,
-                message=f"Vote failed: {yes_votes}/{len(votes)} voted to end. Meeting continues."
+                message=f"Vote failed: {yes_votes}/{len(meeting.participants)} voted to end. Meeting continues."
             )
     
-    # Meeting will end - generate executive summary
-    all_messages = meeting.messages
-    conversation_full = "\n".join([
-        f"{msg.sender_name}: {msg.content}"
-        for msg in all_messages
-    ])
+    try:
+        executive_summary = await _generate_executive_summary(manager, meeting)
+    except Exception:
+        # Nothing is saved; the meeting can be ended again
+        await manager.update_meeting_status(meeting_id, MeetingStatus.ACTIVE.value)
+        raise
+    
+    return EndMeetingResponse(
+        success=True,
+        votes=votes,
+        summary=executive_summary,
+        message="Meeting ended successfully. Executive summary generated."
+    )
+
+
+async def _executive_summary_request(
+    manager: MeetingManager,
+    meeting: MeetingWithParticipants,
+) -> tuple[LLMProvider, List[LLMMessage]]:
+    """Provider and prompt for the executive summary."""
+    # Build from the rolling summary plus the few messages it does not cover yet
+    summarizer = get_meeting_summarizer()
+    rolling_summary = await summarizer.catch_up(manager, meeting)
+    recent_messages = meeting.messages[rolling_summary.message_count:]
     
     # Use the first participant's provider for summary generation
-    if meeting.participants:
-        provider = get_provider(
-            meeting.participants[0].provider_config.provider or None,
-            meeting.participants[0].provider_config.model or None
-        )
-    else:
-        provider = get_provider()
+    provider = get_summary_provider(meeting)
     
     summary_prompt = f"""Generate an Executive Summary of this meeting.
 
@@ -329,8 +259,11 @@ MEETING AGENDA:
 PARTICIPANTS:
 {", ".join([p.name + " (" + p.role + ")" for p in meeting.participants])}
 
-FULL CONVERSATION:
-{conversation_full}
+SUMMARY OF THE DISCUSSION SO FAR:
+{rolling_summary.render() or "(none)"}
+
+MOST RECENT MESSAGES:
+{format_transcript(recent_messages) or "(none)"}
 
 Please create a comprehensive executive summary in this format:
 
@@ -354,14 +287,19 @@ Please create a comprehensive executive summary in this format:
 ## Conclusion
 [Brief concluding statement]"""
 
-    messages = [LLMMessage(role="user", content=summary_prompt)]
-    response = await provider.complete(messages=messages, tools=[], temperature=0.3)
-    executive_summary = response.content
+    return provider, [LLMMessage(role="user", content=summary_prompt)]
+
+
+async def _save_executive_summary(
+    manager: MeetingManager,
+    meeting: MeetingWithParticipants,
+    executive_summary: str,
+) -> None:
+    """Save the executive summary as a system message and mark the meeting ended."""
     
-    # Save the summary as a system message
     await manager.save_message(
         MessageCreate(
-            meeting_id=meeting_id,
+            meeting_id=meeting.id,
             content=f"📋 **MEETING ENDED**\n\n{executive_summary}",
             sender_type=SenderType.SYSTEM,
             sender_name="System"
@@ -369,14 +307,96 @@ Please create a comprehensive executive summary in this format:
     )
     
     # Update meeting status to ended
-    await manager.update_meeting_status(meeting_id, MeetingStatus.ENDED.value)
+    await manager.update_meeting_status(meeting.id, MeetingStatus.ENDED.value)
+
+
+async def _generate_executive_summary(manager: MeetingManager, meeting: MeetingWithParticipants) -> str:
+    """Generate and save the executive summary, then mark the meeting ended."""
+    provider, messages = await _executive_summary_request(manager, meeting)
+    response = await provider.complete(messages=messages, tools=[], temperature=0.3)
+    executive_summary = response.content
     
-    return EndMeetingResponse(
-        success=True,
-        votes=votes,
-        summary=executive_summary,
-        message="Meeting ended successfully. Executive summary generated."
-    )
+    await _save_executive_summary(manager, meeting, executive_summary)
+    return executive_summary
+
+
+@router.post("/{meeting_id}/end/stream")
+async def end_meeting_stream(meeting_id: str, data: EndMeetingRequest):
+    """
+    End a meeting via Server-Sent Events.
+    
+    Streams each vote as it arrives, then the executive summary tokens as
+    they are generated. The summary message is saved once, at the end.
+    """
+    from sse_starlette.sse import EventSourceResponse
+    from app.llm import StreamEvent, StreamEventType
+    from app.services.streaming import events_to_sse
+    
+    manager = get_meeting_manager()
+    
+    meeting = await manager.get_meeting(meeting_id)
+    if not meeting:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    
+    if meeting.status != MeetingStatus.ACTIVE:
+        raise HTTPException(status_code=400, detail=f"Meeting is already {meeting.status}")
+    
+    async def end_events():
+        ended = False
+        try:
+            if not data.force_end:
+                await manager.update_meeting_status(meeting_id, MeetingStatus.VOTING.value)
+                
+                votes = []
+                async for vote in collect_votes(meeting, timeout=settings.vote_timeout):
+                    votes.append(vote)
+                    yield StreamEvent(
+                        type=StreamEventType.VOTE,
+                        participant_id=vote.participant_id,
+                        participant_name=vote.participant_name,
+                        vote=vote.vote,
+                        reason=vote.reason,
+                    )
+                
+                if not is_majority(votes, len(meeting.participants)):
+                    yes_votes = sum(1 for v in votes if v.vote)
+                    yield StreamEvent(
+                        type=StreamEventType.DONE,
+                        content=f"Vote failed: {yes_votes}/{len(meeting.participants)} voted to end. Meeting continues.",
+                    )
+                    return
+            
+            provider, messages = await _executive_summary_request(manager, meeting)
+            executive_summary = ""
+            async for event in provider.stream(messages=messages, tools=[], temperature=0.3):
+                if event.type == StreamEventType.TEXT:
+                    executive_summary += event.content or ""
+                    yield event
+                elif event.type == StreamEventType.ERROR:
+                    yield event
+                    return
+            
+            await _save_executive_summary(manager, meeting, executive_summary)
+            ended = True
+            yield StreamEvent(
+                type=StreamEventType.DONE,
+                content="Meeting ended successfully. Executive summary generated.",
+            )
+        finally:
+            if not ended:
+                # Vote failed, summary failed (error event or exception) or the
+                # client went away: nothing is saved and the meeting continues
+                await manager.update_meeting_status(meeting_id, MeetingStatus.ACTIVE.value)
+    
+    async def stream_generator():
+        try:
+            async for sse_line in events_to_sse(end_events()):
+                yield sse_line
+        except Exception as e:
+            import json
+            yield {"data": json.dumps({"type": "error", "content": str(e)})}
+    
+    return EventSourceResponse(stream_generator())
 
 
 @router.post("/{meeting_id}/archive")
@@ -1,5 +1,5 @@
 # Core module exports
 from app.core.config import settings
-from app.core.database import get_supabase, get_supabase_admin
+from app.core.database import get_supabase, get_supabase_admin, run_query
 
-__all__ = ["settings", "get_supabase", "get_supabase_admin"]
+__all__ = ["settings", "get_supabase", "get_supabase_admin", "run_query"]
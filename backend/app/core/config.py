@@ -9,6 +9,7 @@ class Settings(BaseSettings):
     supabase_url: str
     supabase_key: str
     supabase_service_key: str = ""
+    db_max_concurrency: int = 16  # Max concurrent Supabase round-trips per worker
     
     # OpenRouter
     openrouter_api_key: str = ""
@@ -26,15 +27,97 @@ class Settings(BaseSettings):
     # Default provider: "openrouter", "ollama", or "gemini"
     default_llm_provider: str = "ollama"
     
+    # Shared HTTP client pool (one client per upstream host)
+    http2_enabled: bool = True  # Requires httpx[http2]; falls back to HTTP/1.1
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry: float = 30.0
+    http_connect_timeout: float = 10.0
+    http_default_timeout: float = 60.0
+    
+    # Per-provider request timeouts (seconds)
+    openrouter_timeout: float = 60.0
+    gemini_timeout: float = 60.0
+    ollama_timeout: float = 120.0  # Longer timeout for local models
+    embedding_timeout: float = 60.0
+    llm_stream_timeout: float = 120.0
+    
+    # Provider warm-up (at startup) and health checks
+    provider_warmup_on_startup: bool = True
+    provider_check_timeout: float = 60.0  # Per provider; an Ollama warm-up loads the model
+    
+    # Client-side LLM rate limiting (per process)
+    llm_provider_concurrency: dict[str, int] = {"openrouter": 16, "gemini": 8, "ollama": 4}  # In-flight requests; 0 = unlimited
+    llm_provider_rpm: dict[str, float] = {"openrouter": 0, "gemini": 60, "ollama": 0}  # Requests per minute; 0 = unlimited
+    llm_model_concurrency: int = 0  # Per (provider, model) on top of the provider limit; 0 = unlimited
+    llm_model_rpm: float = 0  # Per (provider, model); 0 = unlimited
+    ollama_exclusive_model: bool = True  # Don't interleave requests for different Ollama models
+    llm_max_retries: int = 3  # Retries of 429/5xx/connection errors
+    llm_retry_backoff: float = 1.0  # Seconds, doubled per attempt (jittered)
+    llm_retry_max_delay: float = 30.0  # Cap for backoff and Retry-After waits
+    
+    # Turn failover and hedging
+    llm_fallback_chain: list[str] = []  # "provider" or "provider:model", tried after the participant's own
+    llm_hedge_after_ms: float = 0  # Start the next provider if no token arrived by then; 0 = off
+    llm_max_hedges: int = 1  # Extra parallel requests per streamed round
+    llm_health_alpha: float = 0.2  # EWMA weight of the newest latency/error sample
+    llm_slow_ttft_ms: float = 10000  # First-token latency above which a provider's health score drops
+    llm_min_health_score: float = 0.5  # Providers below this move to the end of the chain
+    llm_health_reset_seconds: float = 60.0  # Unhealthy providers get another chance after this long idle
+    
+    # Prompt caching of the stable persona/agenda/history prefix
+    prompt_cache_enabled: bool = True
+    gemini_cache_ttl_seconds: int = 600  # Lifetime of Gemini cachedContents entries
+    gemini_cache_min_tokens: int = 4096  # Smallest prefix worth an explicit Gemini cache
+    
+    # Ollama KV-cache reuse
+    ollama_keep_alive: str = "30m"  # How long the model stays loaded after a request
+    ollama_num_ctx: int = 0  # Fixed context size for every request; 0 uses the model default
+    ollama_pin_meeting_model: bool = True  # All Ollama participants of a meeting share one model
+    ollama_shared_prefix: bool = True  # Persona prompt after the shared history (byte-identical prefix)
+    
     # Qdrant Vector DB (deployment agnostic - same config for cloud or local)
     qdrant_url: str = "http://localhost:6333"
     qdrant_api_key: str = ""  # Only needed for Qdrant Cloud
+    qdrant_collection_cache_ttl: float = 60.0  # Seconds to trust a cached collection lookup
+    qdrant_collection_negative_ttl: float = 2.0  # Same for "doesn't exist" (another process may create it)
+    vector_search_timeout: float = 5.0  # Per-collection timeout for multi-collection search
     
     # Embedding settings
     # Providers: "gemini", "openai", "cohere", "ollama"
     embedding_provider: str = "ollama"
     embedding_model: str = "nomic-embed-text"  # Default for Ollama
     embedding_dimension: int = 768  # Depends on model
+    embedding_max_retries: int = 3
+    embedding_retry_backoff: float = 0.5  # Seconds, doubled per retry
+    ollama_embed_batch_size: int = 64  # Texts per /api/embed request
+    ollama_embed_concurrency: int = 4  # Max in-flight Ollama embedding requests per provider instance
+    embedding_cache_max_bytes: int = 64 * 1024 * 1024  # Query-embedding LRU size; 0 disables
+    embedding_cache_path: str = ""  # Optional SQLite file for a persistent cache tier
+    embedding_cache_disk_max_entries: int = 100_000  # Most recently used vectors kept on disk
+    
+    # Document parsing process pool
+    parse_workers: int = 2
+    parse_max_pending: int = 8  # Parse jobs queued or running at once
+    parse_job_timeout: float = 120.0
+    parse_sections_per_job: int = 25  # PDF pages / sheets per job
+    
+    # Document indexing pipeline
+    index_batch_size: int = 64  # Upper bound; providers may require smaller batches
+    index_queue_depth: int = 2  # Batches buffered between pipeline stages
+    
+    # Document ingestion job queue
+    ingestion_db_path: str = "data/ingestion.db"
+    ingestion_spool_dir: str = "data/spool"  # Uploaded files wait here until indexed
+    ingestion_concurrency: int = 2  # Jobs processed at once per worker process
+    ingestion_max_attempts: int = 3
+    ingestion_retry_backoff: float = 5.0  # Seconds, doubled per attempt (jittered)
+    ingestion_job_timeout: float = 600.0
+    ingestion_poll_interval: float = 1.0  # Seconds between polls when idle
+    ingestion_inline_worker: bool = True  # Run a worker in the API process; disable when using ingest_worker.py
+    
+    # Orphaned vector collection sweep
+    collection_gc_interval: float = 3600.0  # Seconds between sweeps; 0 disables
     
     # OpenAI (for embeddings if using OpenAI provider)
     openai_api_key: str = ""
@@ -42,6 +125,30 @@ class Settings(BaseSettings):
     # Cohere (for embeddings if using Cohere provider)
     cohere_api_key: str = ""
     
+    # Meeting context cache (per worker process)
+    meeting_cache_max_entries: int = 256
+    meeting_cache_ttl_seconds: float = 30.0  # Reload meeting row and participants after this long (new messages are checked on every read)
+    
+    # LLM context windowing
+    context_max_prompt_tokens: int = 32000  # Cap even for very large context windows (bounds TTFT)
+    context_default_length: int = 8192  # For models missing from the provider catalogue
+    context_recent_turns: int = 12  # Messages always kept verbatim
+    token_count_cache_size: int = 10000
+    token_encoding: str = ""  # tiktoken encoding override; empty picks one per model
+    context_window_tokens: int = 0  # Window reported by /context-stats; 0 uses the smallest participant window
+    
+    # Rolling meeting summary (background)
+    summary_every_messages: int = 10  # Summarize each batch of this many new messages
+    summary_max_sections: int = 8  # Older sections are folded into the overview beyond this
+    summary_section_max_tokens: int = 250
+    summary_overview_max_tokens: int = 600
+    
+    # Agent tool loop
+    max_tool_rounds: int = 3  # Tool-call rounds per turn before the model must answer
+    
+    # End-of-meeting voting
+    vote_timeout: float = 30.0  # Per-participant; a timeout counts as a 'no'
+    
     # App
     app_env: str = "development"
     cors_origins: List[str] = ["http://localhost:3000"]
@@ -1,8 +1,15 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
 from supabase import create_client, Client
 from app.core.config import settings
 
 _supabase_client: Client | None = None
 
+# Bounded pool that runs blocking PostgREST round-trips off the event loop
+_db_executor: ThreadPoolExecutor | None = None
+
 
 def get_supabase() -> Client:
     """Get or create the Supabase client singleton."""
@@ -21,3 +28,40 @@ def get_supabase_admin() -> Client:
         settings.supabase_url,
         settings.supabase_service_key or settings.supabase_key
     )
+
+
+def _get_db_executor() -> ThreadPoolExecutor:
+    """Get or create the executor used for database calls."""
+    global _db_executor
+    if _db_executor is None:
+        _db_executor = ThreadPoolExecutor(
+            max_workers=settings.db_max_concurrency,
+            thread_name_prefix="supabase",
+        )
+    return _db_executor
+
+
+async def run_query(query: Any) -> Any:
+    """
+    Execute a Supabase query builder without blocking the event loop.
+    
+    The synchronous client performs a full HTTP round-trip inside
+    `.execute()`, so the call is dispatched to a bounded thread pool.
+    At most `db_max_concurrency` queries are in flight per worker.
+    
+    Args:
+        query: A query or RPC builder (anything exposing `.execute()`)
+    
+    Returns:
+        The APIResponse returned by `.execute()`
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_db_executor(), query.execute)
+
+
+def close_db_executor() -> None:
+    """Shut down the database executor, waiting for in-flight queries."""
+    global _db_executor
+    if _db_executor is not None:
+        _db_executor.shutdown(wait=True)
+        _db_executor = None
@@ -0,0 +1,83 @@
+"""
+Shared HTTP client pool for LLM and embedding providers.
+One long-lived httpx.AsyncClient per upstream host, so completions,
+streams and embedding batches reuse keep-alive (and HTTP/2) connections.
+"""
+
+from urllib.parse import urlsplit
+import httpx
+
+from app.core.config import settings
+
+# Clients keyed by upstream origin (scheme://host:port)
+_clients: dict[str, httpx.AsyncClient] = {}
+
+
+def _origin(base_url: str) -> str:
+    """Normalize a base URL to its scheme://host[:port] origin."""
+    parts = urlsplit(base_url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional `h2` package (httpx[http2])."""
+    if not settings.http2_enabled:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _create_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=_http2_available(),
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry,
+        ),
+        timeout=httpx.Timeout(settings.http_default_timeout, connect=settings.http_connect_timeout),
+    )
+
+
+def get_http_client(base_url: str) -> httpx.AsyncClient:
+    """
+    Get the shared client for an upstream host, creating it on first use.
+    
+    Callers must not close the returned client; pass per-request timeouts
+    via the `timeout=` argument instead.
+    """
+    origin = _origin(base_url)
+    client = _clients.get(origin)
+    
+    if client is None or client.is_closed:
+        client = _create_client()
+        _clients[origin] = client
+    
+    return client
+
+
+def init_http_clients() -> None:
+    """Create clients for the configured upstreams at application startup."""
+    upstreams = [
+        settings.openrouter_base_url,
+        settings.ollama_base_url,
+        "https://generativelanguage.googleapis.com",
+    ]
+    if settings.openai_api_key:
+        upstreams.append("https://api.openai.com")
+    if settings.cohere_api_key:
+        upstreams.append("https://api.cohere.ai")
+    
+    for base_url in upstreams:
+        get_http_client(base_url)
+
+
+async def close_http_clients() -> None:
+    """Close all shared clients and their connection pools."""
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.aclose()
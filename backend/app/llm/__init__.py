@@ -6,25 +6,19 @@ from app.llm.base import (
     ToolCall,
     StreamEvent,
     StreamEventType,
+    ModelCapabilities,
 )
 from app.llm.openrouter import OpenRouterProvider
 from app.llm.ollama import OllamaProvider
 from app.llm.gemini import GeminiProvider
-from app.core.config import settings
+from app.llm.limiter import RequestLimiter, request_owner
+from app.llm.registry import ProviderRegistry, get_provider_registry
+from app.llm.router import ProviderHealth, ProviderRoute, get_provider_health
 
 
 def get_provider(provider_name: str = None, model: str = None) -> LLMProvider:
-    """Factory function to get the appropriate LLM provider."""
-    provider_name = provider_name or settings.default_llm_provider
-    
-    if provider_name == "openrouter":
-        return OpenRouterProvider(model=model)
-    elif provider_name == "ollama":
-        return OllamaProvider(model=model)
-    elif provider_name == "gemini":
-        return GeminiProvider(model=model)
-    else:
-        raise ValueError(f"Unknown provider: {provider_name}")
+    """Get the shared provider instance for a provider/model (empty values use the defaults)."""
+    return get_provider_registry().get(provider_name, model)
 
 
 __all__ = [
@@ -35,8 +29,16 @@ __all__ = [
     "ToolCall",
     "StreamEvent",
     "StreamEventType",
+    "ModelCapabilities",
     "OpenRouterProvider",
     "OllamaProvider",
     "GeminiProvider",
+    "RequestLimiter",
+    "request_owner",
+    "ProviderRegistry",
+    "get_provider_registry",
+    "ProviderHealth",
+    "ProviderRoute",
+    "get_provider_health",
     "get_provider",
 ]
@@ -1,7 +1,37 @@
 from abc import ABC, abstractmethod
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import dataclass
 from pydantic import BaseModel
 from typing import List, Optional, Any, AsyncGenerator, Literal
 from enum import Enum
+import asyncio
+import random
+
+import httpx
+
+from app.core.config import settings
+from app.llm.limiter import RequestLimiter, parse_retry_after
+
+# Status codes worth retrying (rate limiting and transient server errors)
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class ProviderHTTPError(Exception):
+    """Error status from an upstream LLM API."""
+    
+    def __init__(self, message: str, status_code: int, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+    
+    @classmethod
+    def from_response(cls, prefix: str, response: httpx.Response, body: str) -> "ProviderHTTPError":
+        """Build from an error response ("<prefix> <status>: <body>")."""
+        return cls(
+            f"{prefix} {response.status_code}: {body}",
+            status_code=response.status_code,
+            retry_after=parse_retry_after(response.headers.get("retry-after")),
+        )
 
 
 class ToolDefinition(BaseModel):
@@ -24,6 +54,9 @@ class LLMMessage(BaseModel):
     content: Optional[str] = None
     tool_calls: Optional[List[ToolCall]] = None
     tool_call_id: Optional[str] = None  # For tool response messages
+    # Marks the end of a stable prefix (this message and everything before it)
+    # that providers with prompt caching may cache across requests
+    cache_breakpoint: bool = False
 
 
 class LLMResponse(BaseModel):
@@ -31,7 +64,7 @@ class LLMResponse(BaseModel):
     content: Optional[str] = None
     tool_calls: List[ToolCall] = []
     finish_reason: str = "stop"
-    usage: dict = {}  # Token usage info
+    usage: dict = {}  # Token usage info (prompt_tokens includes cached_tokens)
 
 
 class StreamEventType(str, Enum):
@@ -41,6 +74,7 @@ class StreamEventType(str, Enum):
     TOOL_CALL = "tool_call"
     TOOL_RESULT = "tool_result"
     CITATION = "citation"
+    VOTE = "vote"
     DONE = "done"
     ERROR = "error"
 
@@ -50,6 +84,7 @@ class StreamEvent(BaseModel):
     type: StreamEventType
     content: Optional[str] = None
     # For tool calls
+    tool_call_id: Optional[str] = None
     tool_name: Optional[str] = None
     tool_arguments: Optional[dict] = None
     tool_result: Optional[str] = None
@@ -58,6 +93,11 @@ class StreamEvent(BaseModel):
     title: Optional[str] = None
     url: Optional[str] = None
     snippet: Optional[str] = None
+    # For vote events
+    participant_id: Optional[str] = None
+    participant_name: Optional[str] = None
+    vote: Optional[bool] = None
+    reason: Optional[str] = None
     # For done event
     message_id: Optional[str] = None
     usage: Optional[dict] = None
@@ -65,10 +105,38 @@ class StreamEvent(BaseModel):
     model_config = {"use_enum_values": True}
 
 
+@dataclass(frozen=True)
+class ModelCapabilities:
+    """What a provider/model supports, from the provider catalogue."""
+    context_length: int
+    supports_tools: bool = True
+    supports_streaming: bool = True
+    # USD per 1M tokens; None falls back to the provider's own estimate
+    input_cost_per_m: Optional[float] = None
+    output_cost_per_m: Optional[float] = None
+
+
 class LLMProvider(ABC):
-    """Abstract base class for LLM providers."""
+    """
+    Abstract base class for LLM providers.
+    
+    Instances are long-lived and shared (see app.llm.registry); they must
+    not keep per-request state.
+    """
+    
+    # Set by the registry from the provider catalogue
+    capabilities: ModelCapabilities = ModelCapabilities(context_length=8192)
+    
+    # Whether the provider honours LLMMessage.cache_breakpoint; providers
+    # that cache report the cache hits as usage["cached_tokens"]
+    supports_prompt_caching: bool = False
+    # Whether contexts should keep everything but a trailing persona message
+    # identical across participants (servers with a local KV cache)
+    prefers_shared_prefix: bool = False
+    
+    # Limiters a request must pass, in order (set by the registry)
+    limiters: List[RequestLimiter] = []
     
-    @abstractmethod
     async def complete(
         self,
         messages: List[LLMMessage],
@@ -79,6 +147,9 @@ class LLMProvider(ABC):
         """
         Generate a completion from the LLM.
         
+        Waits for the provider's rate limiters and retries rate-limited
+        or transient failures with backoff (see _retry_delay).
+        
         Args:
             messages: Conversation history
             tools: Available tools for the LLM to call
@@ -88,7 +159,17 @@ class LLMProvider(ABC):
         Returns:
             LLMResponse with content and/or tool calls
         """
-        pass
+        attempt = 0
+        while True:
+            async with self._slot():
+                try:
+                    return await self._complete(messages, tools, temperature, max_tokens)
+                except Exception as e:
+                    delay = self._retry_delay(e, attempt)
+                    if delay is None:
+                        raise
+            attempt += 1
+            await asyncio.sleep(delay)
     
     async def stream(
         self,
@@ -100,10 +181,95 @@ class LLMProvider(ABC):
         """
         Stream a completion from the LLM.
         
-        Default implementation falls back to complete() and yields chunks.
+        Rate limited like complete(). A failed request is only retried if
+        it failed before yielding any event; an upstream error status that
+        can't be retried is yielded as an ERROR event.
+        """
+        attempt = 0
+        while True:
+            yielded = False
+            async with self._slot():
+                try:
+                    async for event in self._stream(messages, tools, temperature, max_tokens):
+                        yielded = True
+                        yield event
+                    return
+                except Exception as e:
+                    delay = None if yielded else self._retry_delay(e, attempt)
+                    if delay is None:
+                        if isinstance(e, ProviderHTTPError) and not yielded:
+                            yield StreamEvent(type=StreamEventType.ERROR, content=str(e))
+                            return
+                        raise
+            attempt += 1
+            await asyncio.sleep(delay)
+    
+    @asynccontextmanager
+    async def _slot(self):
+        """Hold a slot in each of the provider's limiters."""
+        async with AsyncExitStack() as stack:
+            for limiter in self.limiters:
+                await stack.enter_async_context(limiter.slot(getattr(self, "model", None)))
+            yield
+    
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """
+        Seconds to wait before retrying a failed request, or None to give up.
+        
+        Retries 429/5xx responses and connection errors up to
+        llm_max_retries times with jittered exponential backoff. A
+        Retry-After header sets the delay instead and pauses the limiters,
+        so queued requests wait too rather than piling on.
+        """
+        if attempt >= settings.llm_max_retries:
+            return None
+        
+        retry_after = None
+        if isinstance(error, ProviderHTTPError):
+            if error.status_code not in RETRYABLE_STATUS_CODES:
+                return None
+            retry_after = error.retry_after
+        elif isinstance(error, httpx.HTTPStatusError):
+            if error.response.status_code not in RETRYABLE_STATUS_CODES:
+                return None
+            retry_after = parse_retry_after(error.response.headers.get("retry-after"))
+        elif not isinstance(error, httpx.TransportError):
+            return None
+        
+        if retry_after is not None:
+            delay = min(retry_after, settings.llm_retry_max_delay)
+            for limiter in self.limiters:
+                limiter.pause(delay)
+        else:
+            delay = min(settings.llm_retry_backoff * (2 ** attempt), settings.llm_retry_max_delay)
+        
+        return delay * random.uniform(1.0, 1.25)
+    
+    @abstractmethod
+    async def _complete(
+        self,
+        messages: List[LLMMessage],
+        tools: Optional[List[ToolDefinition]],
+        temperature: float,
+        max_tokens: int,
+    ) -> LLMResponse:
+        """Make one completion request (see complete())."""
+        pass
+    
+    async def _stream(
+        self,
+        messages: List[LLMMessage],
+        tools: Optional[List[ToolDefinition]],
+        temperature: float,
+        max_tokens: int,
+    ) -> AsyncGenerator[StreamEvent, None]:
+        """
+        Make one streaming request (see stream()).
+        
+        Default implementation falls back to _complete() and yields chunks.
         Providers can override for true streaming.
         """
-        response = await self.complete(messages, tools, temperature, max_tokens)
+        response = await self._complete(messages, tools, temperature, max_tokens)
         
         # Yield content as a single chunk
         if response.content:
@@ -113,6 +279,7 @@ class LLMProvider(ABC):
         for tc in response.tool_calls:
             yield StreamEvent(
                 type=StreamEventType.TOOL_CALL,
+                tool_call_id=tc.id,
                 tool_name=tc.name,
                 tool_arguments=tc.arguments
             )
@@ -124,3 +291,21 @@ class LLMProvider(ABC):
     def estimate_cost(self, usage: dict) -> float:
         """Estimate the cost of a completion based on token usage."""
         pass
+    
+    async def health_check(self) -> None:
+        """
+        Check that the provider is reachable and configured.
+        
+        Raises on failure. The default does nothing; providers override it
+        with a cheap authenticated request.
+        """
+        pass
+    
+    async def warm_up(self) -> None:
+        """
+        Prepare for the first real request (called at application startup).
+        
+        The default runs the health check, which also opens a pooled
+        connection to the upstream.
+        """
+        await self.health_check()
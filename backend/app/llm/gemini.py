@@ -2,35 +2,181 @@
 Gemini LLM Provider - Google's Gemini API adapter.
 """
 
-import httpx
-from typing import List, Optional
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import asyncio
+import hashlib
 import json
+import time
 
 from app.llm.base import (
     LLMProvider,
+    ProviderHTTPError,
     LLMMessage,
     LLMResponse,
     ToolDefinition,
     ToolCall,
 )
 from app.core.config import settings
+from app.core.http import get_http_client
+
+
+def _digest(*parts) -> str:
+    """Stable hash of JSON-serializable request parts."""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+
+@dataclass
+class CachedPrefix:
+    """A cachedContents entry holding the first `prefix_len` contents of a request."""
+    name: str
+    prefix_len: int
+    prefix_digest: str
+    prefix_chars: int
+    expires_at: float
+
+
+class GeminiContextCache:
+    """
+    Process-wide registry of Gemini cachedContents entries.
+
+    Entries are grouped by (model, system instruction, tools), which the
+    cache must contain. A request reuses the longest live entry whose
+    contents are a prefix of its own. A new entry for the request's last
+    breakpoint is created in the background once the uncached part of the
+    prefix has grown by gemini_cache_min_tokens, so creating caches never
+    delays a response.
+    """
+
+    # Entries kept per group (older ones simply expire upstream)
+    MAX_ENTRIES_PER_GROUP = 4
+
+    def __init__(self):
+        self._groups: Dict[str, List[CachedPrefix]] = {}
+        self._pending: Dict[str, asyncio.Task] = {}
+        self._failed_until: Dict[str, float] = {}
+
+    def prepare(
+        self,
+        provider: "GeminiProvider",
+        system_instruction: Optional[str],
+        contents: list,
+        tools: Optional[list],
+        breakpoint: int,
+    ) -> Optional[CachedPrefix]:
+        """
+        Find a cached prefix for a request, scheduling a longer one if worthwhile.
+
+        Args:
+            provider: Provider making the request (model and credentials)
+            system_instruction: The request's system instruction
+            contents: The request's full contents
+            tools: The request's converted tools
+            breakpoint: Number of contents in the stable prefix
+
+        Returns:
+            The entry to use, or None to send the request uncached
+        """
+        now = time.time()
+        group = _digest(provider.model, system_instruction, tools)
+        entries = [e for e in self._groups.get(group, []) if e.expires_at > now]
+        self._groups[group] = entries
+
+        hit = None
+        for entry in sorted(entries, key=lambda e: e.prefix_len, reverse=True):
+            # Something must follow the cached prefix in the request
+            if entry.prefix_len < len(contents) and _digest(contents[:entry.prefix_len]) == entry.prefix_digest:
+                hit = entry
+                break
+
+        prefix = contents[:breakpoint]
+        prefix_chars = len(system_instruction or "") + len(json.dumps(prefix))
+        cached_chars = hit.prefix_chars if hit else 0
+        # ~4 characters per token
+        if (
+            prefix
+            and (prefix_chars - cached_chars) // 4 >= settings.gemini_cache_min_tokens
+            and group not in self._pending
+            and self._failed_until.get(group, 0) <= now
+        ):
+            task = asyncio.create_task(
+                self._create(provider, group, system_instruction, prefix, tools, prefix_chars)
+            )
+            self._pending[group] = task
+            task.add_done_callback(lambda _: self._pending.pop(group, None))
+
+        return hit
+
+    async def _create(
+        self,
+        provider: "GeminiProvider",
+        group: str,
+        system_instruction: Optional[str],
+        prefix: list,
+        tools: Optional[list],
+        prefix_chars: int,
+    ) -> None:
+        ttl = settings.gemini_cache_ttl_seconds
+        payload = {
+            "model": f"models/{provider.model}",
+            "contents": prefix,
+            "ttl": f"{ttl}s",
+        }
+        if system_instruction:
+            payload["systemInstruction"] = {"parts": [{"text": system_instruction}]}
+        if tools:
+            payload["tools"] = tools
+
+        try:
+            client = get_http_client(provider.base_url)
+            response = await client.post(
+                f"{provider.base_url}/cachedContents?key={provider.api_key}",
+                json=payload,
+                timeout=settings.gemini_timeout,
+            )
+            if response.status_code != 200:
+                raise Exception(f"Gemini API error {response.status_code}: {response.text}")
+            name = response.json()["name"]
+        except Exception as e:
+            # e.g. models without explicit caching; don't retry every turn
+            print(f"[Gemini] Context cache creation failed: {e}")
+            self._failed_until[group] = time.time() + ttl
+            return
+
+        entries = self._groups.setdefault(group, [])
+        entries.append(CachedPrefix(
+            name=name,
+            prefix_len=len(prefix),
+            prefix_digest=_digest(prefix),
+            prefix_chars=prefix_chars,
+            # Stop using entries shortly before they expire upstream
+            expires_at=time.time() + ttl - 30,
+        ))
+        del entries[:-self.MAX_ENTRIES_PER_GROUP]
+
+
+_context_cache = GeminiContextCache()
 
 
 class GeminiProvider(LLMProvider):
     """Google Gemini API provider."""
     
+    supports_prompt_caching = True
+    
     def __init__(self, model: Optional[str] = None):
         self.model = model or settings.gemini_default_model
         self.api_key = settings.gemini_api_key
         self.base_url = "https://generativelanguage.googleapis.com/v1beta"
         
-    def _convert_messages(self, messages: List[LLMMessage]) -> tuple[str, list]:
+    def _convert_messages(self, messages: List[LLMMessage]) -> tuple[str, list, int]:
         """
         Convert internal message format to Gemini format.
-        Returns (system_instruction, contents).
+        Returns (system_instruction, contents, breakpoint), where breakpoint
+        is the number of contents up to the last cache breakpoint.
         """
         system_instruction = None
         contents = []
+        breakpoint = 0
         
         for msg in messages:
             if msg.role == "system":
@@ -64,8 +210,11 @@ class GeminiProvider(LLMProvider):
                         }
                     }]
                 })
+            
+            if msg.cache_breakpoint:
+                breakpoint = len(contents)
         
-        return system_instruction, contents
+        return system_instruction, contents, breakpoint
     
     def _convert_tools(self, tools: List[ToolDefinition]) -> list:
         """Convert tool definitions to Gemini format (uses OpenAPI-style lowercase types)."""
@@ -85,16 +234,21 @@ class GeminiProvider(LLMProvider):
         
         return [{"functionDeclarations": function_declarations}]
     
-    async def complete(
+    def _build_payload(
         self,
         messages: List[LLMMessage],
-        tools: Optional[List[ToolDefinition]] = None,
-        temperature: float = 0.7,
-        max_tokens: int = 2048,
-    ) -> LLMResponse:
-        """Generate completion via Gemini API."""
+        tools: Optional[List[ToolDefinition]],
+        temperature: float,
+        max_tokens: int,
+    ) -> dict:
+        """
+        Build a generateContent request body.
         
-        system_instruction, contents = self._convert_messages(messages)
+        When a cachedContents entry holds the request's stable prefix, the
+        body references it and carries only the remaining contents (the
+        system instruction and tools live in the cache).
+        """
+        system_instruction, contents, breakpoint = self._convert_messages(messages)
         
         # Ensure we have at least one content message
         if not contents:
@@ -107,30 +261,61 @@ class GeminiProvider(LLMProvider):
                 "maxOutputTokens": max_tokens,
             }
         }
+        converted_tools = self._convert_tools(tools) if tools else None
+        
+        if settings.prompt_cache_enabled and breakpoint:
+            cached = _context_cache.prepare(self, system_instruction, contents, converted_tools, breakpoint)
+            if cached is not None:
+                payload["cachedContent"] = cached.name
+                payload["contents"] = contents[cached.prefix_len:]
+                return payload
         
         if system_instruction:
             payload["systemInstruction"] = {
                 "parts": [{"text": system_instruction}]
             }
         
-        if tools:
-            payload["tools"] = self._convert_tools(tools)
+        if converted_tools:
+            payload["tools"] = converted_tools
+        
+        return payload
+    
+    @staticmethod
+    def _convert_usage(usage_meta: dict) -> dict:
+        """Convert usageMetadata to the common usage format."""
+        return {
+            "prompt_tokens": usage_meta.get("promptTokenCount", 0),
+            "completion_tokens": usage_meta.get("candidatesTokenCount", 0),
+            "total_tokens": usage_meta.get("totalTokenCount", 0),
+            # Explicit (cachedContents) and implicit cache hits
+            "cached_tokens": usage_meta.get("cachedContentTokenCount", 0),
+        }
+    
+    async def _complete(
+        self,
+        messages: List[LLMMessage],
+        tools: Optional[List[ToolDefinition]] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+    ) -> LLMResponse:
+        """Generate completion via Gemini API."""
+        
+        payload = self._build_payload(messages, tools, temperature, max_tokens)
         
         url = f"{self.base_url}/models/{self.model}:generateContent?key={self.api_key}"
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                url,
-                json=payload,
-                timeout=60.0
-            )
-            
-            # Better error handling
-            if response.status_code != 200:
-                error_text = response.text
-                raise Exception(f"Gemini API error {response.status_code}: {error_text}")
-            
-            data = response.json()
+        client = get_http_client(self.base_url)
+        response = await client.post(
+            url,
+            json=payload,
+            timeout=settings.gemini_timeout
+        )
+        
+        # Better error handling
+        if response.status_code != 200:
+            raise ProviderHTTPError.from_response("Gemini API error", response, response.text)
+        
+        data = response.json()
         
         # Parse response
         candidates = data.get("candidates", [])
@@ -159,12 +344,7 @@ class GeminiProvider(LLMProvider):
                 ))
         
         # Parse usage metadata
-        usage_meta = data.get("usageMetadata", {})
-        usage = {
-            "prompt_tokens": usage_meta.get("promptTokenCount", 0),
-            "completion_tokens": usage_meta.get("candidatesTokenCount", 0),
-            "total_tokens": usage_meta.get("totalTokenCount", 0)
-        }
+        usage = self._convert_usage(data.get("usageMetadata", {}))
         
         return LLMResponse(
             content=text_content if text_content else None,
@@ -173,7 +353,7 @@ class GeminiProvider(LLMProvider):
             usage=usage
         )
     
-    async def stream(
+    async def _stream(
         self,
         messages: List[LLMMessage],
         tools: Optional[List[ToolDefinition]] = None,
@@ -183,133 +363,125 @@ class GeminiProvider(LLMProvider):
         """Stream completion via Gemini API with thinking block support."""
         from app.llm.base import StreamEvent, StreamEventType
         
-        system_instruction, contents = self._convert_messages(messages)
-        
-        if not contents:
-            contents = [{"role": "user", "parts": [{"text": "Hello"}]}]
-        
-        payload = {
-            "contents": contents,
-            "generationConfig": {
-                "temperature": temperature,
-                "maxOutputTokens": max_tokens,
-            }
-        }
-        
-        if system_instruction:
-            payload["systemInstruction"] = {
-                "parts": [{"text": system_instruction}]
-            }
-        
-        if tools:
-            payload["tools"] = self._convert_tools(tools)
+        payload = self._build_payload(messages, tools, temperature, max_tokens)
         
         # Use streamGenerateContent for streaming
         url = f"{self.base_url}/models/{self.model}:streamGenerateContent?key={self.api_key}&alt=sse"
         
-        async with httpx.AsyncClient() as client:
-            async with client.stream(
-                "POST",
-                url,
-                json=payload,
-                timeout=120.0
-            ) as response:
-                if response.status_code != 200:
-                    error_text = await response.aread()
-                    yield StreamEvent(
-                        type=StreamEventType.ERROR,
-                        content=f"Gemini API error {response.status_code}: {error_text.decode()}"
-                    )
-                    return
+        client = get_http_client(self.base_url)
+        async with client.stream(
+            "POST",
+            url,
+            json=payload,
+            timeout=settings.llm_stream_timeout
+        ) as response:
+            if response.status_code != 200:
+                error_text = await response.aread()
+                raise ProviderHTTPError.from_response("Gemini API error", response, error_text.decode())
+            
+            accumulated_text = ""
+            tool_calls = []
+            usage = {}
+            
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
                 
-                accumulated_text = ""
-                tool_calls = []
-                usage = {}
+                try:
+                    data = json.loads(line[6:])
+                except json.JSONDecodeError:
+                    continue
                 
-                async for line in response.aiter_lines():
-                    if not line.startswith("data: "):
-                        continue
-                    
-                    try:
-                        data = json.loads(line[6:])
-                    except json.JSONDecodeError:
-                        continue
-                    
-                    # Extract candidates
-                    candidates = data.get("candidates", [])
-                    if not candidates:
-                        continue
-                    
-                    parts = candidates[0].get("content", {}).get("parts", [])
+                # Extract candidates
+                candidates = data.get("candidates", [])
+                if not candidates:
+                    continue
+                
+                parts = candidates[0].get("content", {}).get("parts", [])
+                
+                for part in parts:
+                    # Handle thought/thinking content (Gemini 2.5+/3 native thinking)
+                    # Check for 'thought' boolean flag or 'thought' key indicating thinking content
+                    is_thought = part.get("thought", False)
                     
-                    for part in parts:
-                        # Handle thought/thinking content (Gemini 2.5+/3 native thinking)
-                        # Check for 'thought' boolean flag or 'thought' key indicating thinking content
-                        is_thought = part.get("thought", False)
+                    if "text" in part:
+                        text = part["text"]
                         
-                        if "text" in part:
-                            text = part["text"]
+                        # If this part is marked as a thought, emit as THINKING
+                        if is_thought:
+                            yield StreamEvent(
+                                type=StreamEventType.THINKING,
+                                content=text
+                            )
+                        else:
+                            # Check for legacy <think> tags as fallback
+                            if "<think>" in text or "</think>" in text:
+                                import re
+                                think_match = re.search(r"<think>(.*?)</think>", text, re.DOTALL)
+                                if think_match:
+                                    yield StreamEvent(
+                                        type=StreamEventType.THINKING,
+                                        content=think_match.group(1).strip()
+                                    )
+                                    text = re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL)
                             
-                            # If this part is marked as a thought, emit as THINKING
-                            if is_thought:
+                            if text.strip():
                                 yield StreamEvent(
-                                    type=StreamEventType.THINKING,
+                                    type=StreamEventType.TEXT,
                                     content=text
                                 )
-                            else:
-                                # Check for legacy <think> tags as fallback
-                                if "<think>" in text or "</think>" in text:
-                                    import re
-                                    think_match = re.search(r"<think>(.*?)</think>", text, re.DOTALL)
-                                    if think_match:
-                                        yield StreamEvent(
-                                            type=StreamEventType.THINKING,
-                                            content=think_match.group(1).strip()
-                                        )
-                                        text = re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL)
-                                
-                                if text.strip():
-                                    yield StreamEvent(
-                                        type=StreamEventType.TEXT,
-                                        content=text
-                                    )
-                                    accumulated_text += text
-                        
-                        if "functionCall" in part:
-                            fc = part["functionCall"]
-                            yield StreamEvent(
-                                type=StreamEventType.TOOL_CALL,
-                                tool_name=fc.get("name", ""),
-                                tool_arguments=fc.get("args", {})
-                            )
-                            tool_calls.append(ToolCall(
-                                id=fc.get("name", ""),
-                                name=fc.get("name", ""),
-                                arguments=fc.get("args", {})
-                            ))
+                                accumulated_text += text
                     
-                    # Get usage from final chunk
-                    if "usageMetadata" in data:
-                        usage = {
-                            "prompt_tokens": data["usageMetadata"].get("promptTokenCount", 0),
-                            "completion_tokens": data["usageMetadata"].get("candidatesTokenCount", 0),
-                            "total_tokens": data["usageMetadata"].get("totalTokenCount", 0)
-                        }
+                    if "functionCall" in part:
+                        fc = part["functionCall"]
+                        yield StreamEvent(
+                            type=StreamEventType.TOOL_CALL,
+                            # Gemini matches function responses by name
+                            tool_call_id=fc.get("name", ""),
+                            tool_name=fc.get("name", ""),
+                            tool_arguments=fc.get("args", {})
+                        )
+                        tool_calls.append(ToolCall(
+                            id=fc.get("name", ""),
+                            name=fc.get("name", ""),
+                            arguments=fc.get("args", {})
+                        ))
                 
-                yield StreamEvent(type=StreamEventType.DONE, usage=usage)
+                # Get usage from final chunk
+                if "usageMetadata" in data:
+                    usage = self._convert_usage(data["usageMetadata"])
+            
+            yield StreamEvent(type=StreamEventType.DONE, usage=usage)
     
     def estimate_cost(self, usage: dict) -> float:
         """Estimate cost based on Gemini pricing."""
-        prompt_tokens = usage.get("prompt_tokens", 0)
+        cached_tokens = usage.get("cached_tokens", 0)
+        prompt_tokens = usage.get("prompt_tokens", 0) - cached_tokens
         completion_tokens = usage.get("completion_tokens", 0)
         
+        # Catalogue price when known
+        if self.capabilities.input_cost_per_m is not None and self.capabilities.output_cost_per_m is not None:
+            input_price = self.capabilities.input_cost_per_m
+            output_price = self.capabilities.output_cost_per_m
         # Gemini Flash pricing (very cheap)
-        if "flash" in self.model.lower():
-            input_cost = (prompt_tokens / 1_000_000) * 0.075
-            output_cost = (completion_tokens / 1_000_000) * 0.30
+        elif "flash" in self.model.lower():
+            input_price, output_price = 0.075, 0.30
         # Gemini Pro pricing
         else:
-            input_cost = (prompt_tokens / 1_000_000) * 1.25
-            output_cost = (completion_tokens / 1_000_000) * 5.00
+            input_price, output_price = 1.25, 5.00
+        
+        # Cached tokens are billed at 25% of the input price
+        input_cost = (prompt_tokens + cached_tokens * 0.25) / 1_000_000 * input_price
+        output_cost = (completion_tokens / 1_000_000) * output_price
         
         return input_cost + output_cost
+    
+    async def health_check(self) -> None:
+        """Verify the API key and model by fetching the model's metadata."""
+        client = get_http_client(self.base_url)
+        response = await client.get(
+            f"{self.base_url}/models/{self.model}?key={self.api_key}",
+            timeout=settings.gemini_timeout
+        )
+        if response.status_code != 200:
+            raise ProviderHTTPError.from_response("Gemini API error", response, response.text)
@@ -0,0 +1,184 @@
+"""
+Client-side rate limiting for LLM requests.
+Concurrency + token-bucket limiters with fair queuing across meetings, so
+bursts of turns saturate an upstream's limits without tripping them.
+"""
+
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Deque, Optional, Tuple
+import asyncio
+import time
+
+# Who a request is made for (the meeting ID); requests queue fairly per owner
+request_owner: ContextVar[Optional[str]] = ContextVar("request_owner", default=None)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class RequestLimiter:
+    """
+    Admits requests under a concurrency limit and a requests-per-minute bucket.
+
+    Waiting requests are queued per owner (request_owner) and admitted
+    round-robin across owners, so one busy meeting can't starve the others.
+    pause() stops admissions for a while (e.g. after a 429 with Retry-After).
+
+    With exclusive_models, requests for a different model wait until the
+    requests in flight have finished, so a local server doesn't swap models
+    back and forth.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int = 0,
+        requests_per_minute: float = 0,
+        exclusive_models: bool = False,
+    ):
+        self.name = name
+        self.max_concurrency = max_concurrency  # 0 = unlimited
+        self.rate = requests_per_minute / 60  # tokens per second; 0 = unlimited
+        self.capacity = max(1.0, self.rate)  # allow a one-second burst
+        self.exclusive_models = exclusive_models
+
+        self._tokens = self.capacity
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self._active = 0
+        self._active_model: Optional[str] = None
+        self._queues: "OrderedDict[str, Deque[Tuple[asyncio.Future, Optional[str]]]]" = OrderedDict()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+        # Metrics
+        self.admitted = 0
+        self.paused = 0
+        self.total_wait = 0.0
+
+    @property
+    def queued(self) -> int:
+        """Requests waiting for admission."""
+        return sum(len(q) for q in self._queues.values())
+
+    @asynccontextmanager
+    async def slot(self, model: Optional[str] = None) -> AsyncIterator[None]:
+        """Wait for admission, then hold a concurrency slot for the block."""
+        owner = request_owner.get() or ""
+        future = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(owner, deque()).append((future, model))
+        started = time.monotonic()
+        self._dispatch()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Admitted just as we were cancelled: give the slot back
+                self._release()
+            raise
+
+        self.total_wait += time.monotonic() - started
+        try:
+            yield
+        finally:
+            self._release()
+
+    def pause(self, seconds: float) -> None:
+        """Stop admitting requests for `seconds`."""
+        self.paused += 1
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def _release(self) -> None:
+        self._active -= 1
+        if self._active == 0:
+            self._active_model = None
+        self._dispatch()
+
+    def _refill(self, now: float) -> None:
+        if self.rate:
+            self._tokens = min(self.capacity, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def _schedule(self, delay: float) -> None:
+        """Retry dispatching after `delay` seconds."""
+        if self._wakeup is None:
+            def wake():
+                self._wakeup = None
+                self._dispatch()
+            self._wakeup = asyncio.get_running_loop().call_later(delay, wake)
+
+    def _dispatch(self) -> None:
+        """Admit queued requests, round-robin across owners, while limits allow."""
+        while self._queues:
+            if self.max_concurrency and self._active >= self.max_concurrency:
+                return
+
+            now = time.monotonic()
+            if now < self._paused_until:
+                self._schedule(self._paused_until - now)
+                return
+
+            self._refill(now)
+            if self.rate and self._tokens < 1:
+                self._schedule((1 - self._tokens) / self.rate)
+                return
+
+            admitted = False
+            for owner in list(self._queues):
+                queue = self._queues[owner]
+                while queue and queue[0][0].done():
+                    queue.popleft()  # cancelled while waiting
+                if not queue:
+                    del self._queues[owner]
+                    continue
+
+                future, model = queue[0]
+                if self.exclusive_models and self._active and model != self._active_model:
+                    continue
+
+                queue.popleft()
+                if queue:
+                    self._queues.move_to_end(owner)
+                else:
+                    del self._queues[owner]
+
+                if self.rate:
+                    self._tokens -= 1
+                self._active += 1
+                self._active_model = model
+                self.admitted += 1
+                future.set_result(None)
+                admitted = True
+                break
+
+            if not admitted:
+                return
+
+    def stats(self) -> dict:
+        """Queue depth and admission metrics."""
+        return {
+            "name": self.name,
+            "active": self._active,
+            "queued": self.queued,
+            "owners_waiting": len(self._queues),
+            "max_concurrency": self.max_concurrency,
+            "requests_per_minute": round(self.rate * 60, 1),
+            "paused_for": round(max(self._paused_until - time.monotonic(), 0.0), 1),
+            "admitted": self.admitted,
+            "pauses": self.paused,
+            "avg_wait_ms": round(self.total_wait / self.admitted * 1000, 1) if self.admitted else 0.0,
+        }
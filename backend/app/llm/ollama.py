@@ -1,23 +1,93 @@
-import httpx
 from typing import List, Optional
 import json
 
 from app.llm.base import (
     LLMProvider,
+    ProviderHTTPError,
     LLMMessage,
     LLMResponse,
     ToolDefinition,
     ToolCall,
 )
 from app.core.config import settings
+from app.core.http import get_http_client
 
 
 class OllamaProvider(LLMProvider):
-    """Ollama local LLM provider for running models locally."""
+    """
+    Ollama local LLM provider for running models locally.
+    
+    Requests keep the model loaded (keep_alive) and use the same options
+    every time, so Ollama neither reloads the model nor drops the KV cache
+    of the previous prompt; a prompt sharing its prefix with the previous
+    one only evaluates the new tail.
+    """
     
     def __init__(self, model: Optional[str] = None):
         self.model = model or settings.ollama_default_model
         self.base_url = settings.ollama_base_url
+    
+    @property
+    def prefers_shared_prefix(self) -> bool:
+        """Whether contexts should use the shared-prefix layout (see ContextBuilder.build)."""
+        return settings.ollama_shared_prefix
+    
+    @staticmethod
+    def _load_options() -> dict:
+        """Options the model is loaded with; every request must send the same ones."""
+        options = {}
+        # Changing num_ctx between requests reloads the model
+        if settings.ollama_num_ctx:
+            options["num_ctx"] = settings.ollama_num_ctx
+        return options
+    
+    def _build_payload(
+        self,
+        messages: List[LLMMessage],
+        tools: Optional[List[ToolDefinition]],
+        temperature: float,
+        max_tokens: int,
+        stream: bool,
+    ) -> dict:
+        """Build an /api/chat request body."""
+        options = {
+            **self._load_options(),
+            "temperature": temperature,
+            "num_predict": max_tokens,
+        }
+        
+        payload = {
+            "model": self.model,
+            "messages": self._convert_messages(messages),
+            "stream": stream,
+            "keep_alive": settings.ollama_keep_alive,
+            "options": options,
+        }
+        
+        if tools:
+            payload["tools"] = self._convert_tools(tools)
+        
+        return payload
+    
+    @staticmethod
+    def _convert_usage(data: dict) -> dict:
+        """
+        Usage from a final /api/chat response.
+        
+        prompt_eval_count only counts prompt tokens actually evaluated, so
+        it drops when the KV cache is reused; durations are reported in ms.
+        """
+        prompt_tokens = data.get("prompt_eval_count", 0)
+        completion_tokens = data.get("eval_count", 0)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_eval_count": prompt_tokens,
+            "prompt_eval_ms": round(data.get("prompt_eval_duration", 0) / 1e6, 1),
+            "eval_ms": round(data.get("eval_duration", 0) / 1e6, 1),
+            "load_ms": round(data.get("load_duration", 0) / 1e6, 1),
+        }
         
     def _convert_messages(self, messages: List[LLMMessage]) -> List[dict]:
         """Convert internal message format to Ollama format."""
@@ -59,7 +129,7 @@ class OllamaProvider(LLMProvider):
             for tool in tools
         ]
     
-    async def complete(
+    async def _complete(
         self,
         messages: List[LLMMessage],
         tools: Optional[List[ToolDefinition]] = None,
@@ -68,27 +138,16 @@ class OllamaProvider(LLMProvider):
     ) -> LLMResponse:
         """Generate completion via Ollama API."""
         
-        payload = {
-            "model": self.model,
-            "messages": self._convert_messages(messages),
-            "stream": False,
-            "options": {
-                "temperature": temperature,
-                "num_predict": max_tokens,
-            }
-        }
-        
-        if tools:
-            payload["tools"] = self._convert_tools(tools)
+        payload = self._build_payload(messages, tools, temperature, max_tokens, stream=False)
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/api/chat",
-                json=payload,
-                timeout=120.0  # Longer timeout for local models
-            )
-            response.raise_for_status()
-            data = response.json()
+        client = get_http_client(self.base_url)
+        response = await client.post(
+            f"{self.base_url}/api/chat",
+            json=payload,
+            timeout=settings.ollama_timeout
+        )
+        response.raise_for_status()
+        data = response.json()
         
         message = data.get("message", {})
         
@@ -107,22 +166,14 @@ class OllamaProvider(LLMProvider):
                     arguments=args
                 ))
         
-        # Calculate approximate token usage
-        prompt_tokens = data.get("prompt_eval_count", 0)
-        completion_tokens = data.get("eval_count", 0)
-        
         return LLMResponse(
             content=message.get("content"),
             tool_calls=tool_calls,
             finish_reason="stop",
-            usage={
-                "prompt_tokens": prompt_tokens,
-                "completion_tokens": completion_tokens,
-                "total_tokens": prompt_tokens + completion_tokens
-            }
+            usage=self._convert_usage(data)
         )
     
-    async def stream(
+    async def _stream(
         self,
         messages: List[LLMMessage],
         tools: Optional[List[ToolDefinition]] = None,
@@ -132,99 +183,102 @@ class OllamaProvider(LLMProvider):
         """Stream completion via Ollama API."""
         from app.llm.base import StreamEvent, StreamEventType
         
-        payload = {
-            "model": self.model,
-            "messages": self._convert_messages(messages),
-            "stream": True,
-            "options": {
-                "temperature": temperature,
-                "num_predict": max_tokens,
-            }
-        }
+        payload = self._build_payload(messages, tools, temperature, max_tokens, stream=True)
         
-        if tools:
-            payload["tools"] = self._convert_tools(tools)
-        
-        async with httpx.AsyncClient() as client:
-            async with client.stream(
-                "POST",
-                f"{self.base_url}/api/chat",
-                json=payload,
-                timeout=120.0
-            ) as response:
-                if response.status_code != 200:
-                    error_text = await response.aread()
-                    yield StreamEvent(
-                        type=StreamEventType.ERROR,
-                        content=f"Ollama error {response.status_code}: {error_text.decode()}"
-                    )
-                    return
+        client = get_http_client(self.base_url)
+        async with client.stream(
+            "POST",
+            f"{self.base_url}/api/chat",
+            json=payload,
+            timeout=settings.llm_stream_timeout
+        ) as response:
+            if response.status_code != 200:
+                error_text = await response.aread()
+                raise ProviderHTTPError.from_response("Ollama error", response, error_text.decode())
+            
+            accumulated_text = ""
+            tool_calls = []
+            usage = {}
+            in_thinking = False
+            thinking_buffer = ""
+            
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
                 
-                accumulated_text = ""
-                tool_calls = []
-                usage = {}
-                in_thinking = False
-                thinking_buffer = ""
+                try:
+                    data = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
                 
-                async for line in response.aiter_lines():
-                    if not line:
-                        continue
-                    
-                    try:
-                        data = json.loads(line)
-                    except json.JSONDecodeError:
+                message = data.get("message", {})
+                content = message.get("content", "")
+                
+                # Handle thinking blocks (models may use <think> tags)
+                if "<think>" in content:
+                    in_thinking = True
+                    content = content.replace("<think>", "")
+                
+                if in_thinking:
+                    if "</think>" in content:
+                        in_thinking = False
+                        parts = content.split("</think>")
+                        thinking_buffer += parts[0]
+                        yield StreamEvent(
+                            type=StreamEventType.THINKING,
+                            content=thinking_buffer.strip()
+                        )
+                        thinking_buffer = ""
+                        content = parts[1] if len(parts) > 1 else ""
+                    else:
+                        thinking_buffer += content
                         continue
-                    
-                    message = data.get("message", {})
-                    content = message.get("content", "")
-                    
-                    # Handle thinking blocks (models may use <think> tags)
-                    if "<think>" in content:
-                        in_thinking = True
-                        content = content.replace("<think>", "")
-                    
-                    if in_thinking:
-                        if "</think>" in content:
-                            in_thinking = False
-                            parts = content.split("</think>")
-                            thinking_buffer += parts[0]
-                            yield StreamEvent(
-                                type=StreamEventType.THINKING,
-                                content=thinking_buffer.strip()
-                            )
-                            thinking_buffer = ""
-                            content = parts[1] if len(parts) > 1 else ""
-                        else:
-                            thinking_buffer += content
-                            continue
-                    
-                    if content:
-                        yield StreamEvent(type=StreamEventType.TEXT, content=content)
-                        accumulated_text += content
-                    
-                    # Handle tool calls
-                    if "tool_calls" in message:
-                        for tc in message["tool_calls"]:
-                            func = tc.get("function", {})
-                            args = func.get("arguments", {})
-                            if isinstance(args, str):
-                                args = json.loads(args)
-                            yield StreamEvent(
-                                type=StreamEventType.TOOL_CALL,
-                                tool_name=func.get("name", ""),
-                                tool_arguments=args
-                            )
-                    
-                    # Check if done
-                    if data.get("done"):
-                        usage = {
-                            "prompt_tokens": data.get("prompt_eval_count", 0),
-                            "completion_tokens": data.get("eval_count", 0),
-                            "total_tokens": data.get("prompt_eval_count", 0) + data.get("eval_count", 0)
-                        }
                 
-                yield StreamEvent(type=StreamEventType.DONE, usage=usage)
+                if content:
+                    yield StreamEvent(type=StreamEventType.TEXT, content=content)
+                    accumulated_text += content
+                
+                # Handle tool calls
+                if "tool_calls" in message:
+                    for tc in message["tool_calls"]:
+                        func = tc.get("function", {})
+                        args = func.get("arguments", {})
+                        if isinstance(args, str):
+                            args = json.loads(args)
+                        yield StreamEvent(
+                            type=StreamEventType.TOOL_CALL,
+                            tool_call_id=tc.get("id") or func.get("name", ""),
+                            tool_name=func.get("name", ""),
+                            tool_arguments=args
+                        )
+                
+                # Check if done
+                if data.get("done"):
+                    usage = self._convert_usage(data)
+            
+            yield StreamEvent(type=StreamEventType.DONE, usage=usage)
     
     def estimate_cost(self, usage: dict) -> float:
         """Ollama runs locally, so cost is always 0."""
         return 0.0
+    
+    async def health_check(self) -> None:
+        """Check that the Ollama server is reachable."""
+        client = get_http_client(self.base_url)
+        response = await client.get(f"{self.base_url}/api/tags", timeout=settings.ollama_timeout)
+        response.raise_for_status()
+    
+    async def warm_up(self) -> None:
+        """Load the model into memory (an empty generate request) and keep it loaded."""
+        client = get_http_client(self.base_url)
+        response = await client.post(
+            f"{self.base_url}/api/generate",
+            json={
+                "model": self.model,
+                "keep_alive": settings.ollama_keep_alive,
+                # Load with the context size turns use, or the first turn reloads it
+                "options": self._load_options(),
+            },
+            timeout=settings.ollama_timeout
+        )
+        response.raise_for_status()
@@ -1,4 +1,3 @@
-import httpx
 from typing import List, Optional, AsyncGenerator
 import json
 
@@ -12,22 +11,43 @@ from app.llm.base import (
     StreamEventType,
 )
 from app.core.config import settings
+from app.core.http import get_http_client
+
+
+# Upstream models that take explicit cache_control breakpoints through
+# OpenRouter (OpenAI, DeepSeek and others cache prefixes automatically)
+CACHE_CONTROL_MODEL_PREFIXES = ("anthropic/", "google/gemini")
 
 
 class OpenRouterProvider(LLMProvider):
     """OpenRouter API provider supporting multiple LLM backends."""
     
+    supports_prompt_caching = True
+    
     def __init__(self, model: Optional[str] = None):
         self.model = model or settings.openrouter_default_model
         self.base_url = settings.openrouter_base_url
         self.api_key = settings.openrouter_api_key
         
+    @property
+    def uses_cache_control(self) -> bool:
+        """Whether cache breakpoints are sent as cache_control markers."""
+        return settings.prompt_cache_enabled and self.model.startswith(CACHE_CONTROL_MODEL_PREFIXES)
+    
     def _convert_messages(self, messages: List[LLMMessage]) -> List[dict]:
         """Convert internal message format to OpenRouter format."""
+        cache_control = self.uses_cache_control
         converted = []
         for msg in messages:
             message_dict = {"role": msg.role, "content": msg.content or ""}
             
+            if cache_control and msg.cache_breakpoint and msg.content:
+                message_dict["content"] = [{
+                    "type": "text",
+                    "text": msg.content,
+                    "cache_control": {"type": "ephemeral"},
+                }]
+            
             if msg.tool_calls:
                 message_dict["tool_calls"] = [
                     {
@@ -48,6 +68,14 @@ class OpenRouterProvider(LLMProvider):
             converted.append(message_dict)
         return converted
     
+    @staticmethod
+    def _convert_usage(usage: dict) -> dict:
+        """Copy OpenRouter usage, adding cached prompt tokens as cached_tokens."""
+        usage = dict(usage or {})
+        details = usage.get("prompt_tokens_details") or {}
+        usage["cached_tokens"] = details.get("cached_tokens", 0) or 0
+        return usage
+    
     def _convert_tools(self, tools: List[ToolDefinition]) -> List[dict]:
         """Convert tool definitions to OpenRouter format."""
         return [
@@ -62,7 +90,7 @@ class OpenRouterProvider(LLMProvider):
             for tool in tools
         ]
     
-    async def complete(
+    async def _complete(
         self,
         messages: List[LLMMessage],
         tools: Optional[List[ToolDefinition]] = None,
@@ -83,20 +111,21 @@ class OpenRouterProvider(LLMProvider):
             "messages": self._convert_messages(messages),
             "temperature": temperature,
             "max_tokens": max_tokens,
+            "usage": {"include": True},  # Reports cached prompt tokens
         }
         
         if tools:
             payload["tools"] = self._convert_tools(tools)
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=60.0
-            )
-            response.raise_for_status()
-            data = response.json()
+        client = get_http_client(self.base_url)
+        response = await client.post(
+            f"{self.base_url}/chat/completions",
+            headers=headers,
+            json=payload,
+            timeout=settings.openrouter_timeout
+        )
+        response.raise_for_status()
+        data = response.json()
         
         choice = data["choices"][0]
         message = choice["message"]
@@ -115,25 +144,42 @@ class OpenRouterProvider(LLMProvider):
             content=message.get("content"),
             tool_calls=tool_calls,
             finish_reason=choice.get("finish_reason", "stop"),
-            usage=data.get("usage", {})
+            usage=self._convert_usage(data.get("usage", {}))
         )
     
     def estimate_cost(self, usage: dict) -> float:
-        """Estimate cost based on token usage (approximate)."""
-        # Rough estimates - varies by model
-        input_tokens = usage.get("prompt_tokens", 0)
+        """Estimate cost from the catalogue price of the model (approximate)."""
+        cached_tokens = usage.get("cached_tokens", 0)
+        input_tokens = usage.get("prompt_tokens", 0) - cached_tokens
         output_tokens = usage.get("completion_tokens", 0)
         
-        # Approximate costs per 1M tokens (Claude Sonnet pricing via OpenRouter)
-        input_cost_per_m = 3.0
-        output_cost_per_m = 15.0
+        # Costs per 1M tokens; models missing from the catalogue are
+        # estimated at Claude Sonnet pricing
+        input_cost_per_m = self.capabilities.input_cost_per_m
+        if input_cost_per_m is None:
+            input_cost_per_m = 3.0
+        output_cost_per_m = self.capabilities.output_cost_per_m
+        if output_cost_per_m is None:
+            output_cost_per_m = 15.0
+        cached_cost_per_m = input_cost_per_m * 0.1  # Cache reads are billed at ~10% of input
         
         cost = (input_tokens * input_cost_per_m / 1_000_000) + \
+               (cached_tokens * cached_cost_per_m / 1_000_000) + \
                (output_tokens * output_cost_per_m / 1_000_000)
         
         return round(cost, 6)
     
-    async def stream(
+    async def health_check(self) -> None:
+        """Verify the API key against OpenRouter's key endpoint."""
+        client = get_http_client(self.base_url)
+        response = await client.get(
+            f"{self.base_url}/key",
+            headers={"Authorization": f"Bearer {self.api_key}"},
+            timeout=settings.openrouter_timeout
+        )
+        response.raise_for_status()
+    
+    async def _stream(
         self,
         messages: List[LLMMessage],
         tools: Optional[List[ToolDefinition]] = None,
@@ -157,6 +203,7 @@ class OpenRouterProvider(LLMProvider):
             "temperature": temperature,
             "max_tokens": max_tokens,
             "stream": True,  # Enable streaming
+            "usage": {"include": True},  # Reports cached prompt tokens
         }
         
         if tools:
@@ -166,97 +213,98 @@ class OpenRouterProvider(LLMProvider):
         pending_tool_calls: dict[int, dict] = {}
         usage_data = {}
         
-        async with httpx.AsyncClient() as client:
-            async with client.stream(
-                "POST",
-                f"{self.base_url}/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=120.0
-            ) as response:
-                response.raise_for_status()
-                
-                async for line in response.aiter_lines():
-                    if not line.strip():
+        client = get_http_client(self.base_url)
+        async with client.stream(
+            "POST",
+            f"{self.base_url}/chat/completions",
+            headers=headers,
+            json=payload,
+            timeout=settings.llm_stream_timeout
+        ) as response:
+            response.raise_for_status()
+            
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                    
+                # SSE format: "data: {...}"
+                if line.startswith("data: "):
+                    data_str = line[6:]  # Remove "data: " prefix
+                    
+                    if data_str.strip() == "[DONE]":
+                        # Stream complete
+                        yield StreamEvent(
+                            type=StreamEventType.DONE,
+                            usage=usage_data
+                        )
+                        break
+                    
+                    try:
+                        data = json.loads(data_str)
+                    except json.JSONDecodeError:
+                        continue
+                    
+                    # Handle usage info if present
+                    if data.get("usage"):
+                        usage_data = self._convert_usage(data["usage"])
+                    
+                    if not data.get("choices"):
                         continue
                         
-                    # SSE format: "data: {...}"
-                    if line.startswith("data: "):
-                        data_str = line[6:]  # Remove "data: " prefix
-                        
-                        if data_str.strip() == "[DONE]":
-                            # Stream complete
-                            yield StreamEvent(
-                                type=StreamEventType.DONE,
-                                usage=usage_data
-                            )
-                            break
-                        
-                        try:
-                            data = json.loads(data_str)
-                        except json.JSONDecodeError:
-                            continue
-                        
-                        # Handle usage info if present
-                        if "usage" in data:
-                            usage_data = data["usage"]
-                        
-                        if not data.get("choices"):
-                            continue
+                    choice = data["choices"][0]
+                    delta = choice.get("delta", {})
+                    
+                    # Handle reasoning/thinking content (extended thinking models)
+                    # OpenRouter sends this as delta.reasoning_content or delta.thinking
+                    reasoning = delta.get("reasoning_content") or delta.get("thinking") or delta.get("reasoning")
+                    if reasoning:
+                        yield StreamEvent(
+                            type=StreamEventType.THINKING,
+                            content=reasoning
+                        )
+                    
+                    # Handle regular content
+                    if delta.get("content"):
+                        yield StreamEvent(
+                            type=StreamEventType.TEXT,
+                            content=delta["content"]
+                        )
+                    
+                    # Handle tool calls (streamed incrementally)
+                    if delta.get("tool_calls"):
+                        for tc in delta["tool_calls"]:
+                            idx = tc.get("index", 0)
+                            
+                            if idx not in pending_tool_calls:
+                                pending_tool_calls[idx] = {
+                                    "id": tc.get("id", ""),
+                                    "name": "",
+                                    "arguments": ""
+                                }
+                            
+                            # Accumulate function info
+                            if "function" in tc:
+                                if tc["function"].get("name"):
+                                    pending_tool_calls[idx]["name"] = tc["function"]["name"]
+                                if tc["function"].get("arguments"):
+                                    pending_tool_calls[idx]["arguments"] += tc["function"]["arguments"]
+                    
+                    # Check for finish reason - emit accumulated tool calls
+                    finish_reason = choice.get("finish_reason")
+                    if finish_reason == "tool_calls" and pending_tool_calls:
+                        for idx, tc_data in pending_tool_calls.items():
+                            try:
+                                args = json.loads(tc_data["arguments"]) if tc_data["arguments"] else {}
+                            except json.JSONDecodeError:
+                                args = {}
                             
-                        choice = data["choices"][0]
-                        delta = choice.get("delta", {})
-                        
-                        # Handle reasoning/thinking content (extended thinking models)
-                        # OpenRouter sends this as delta.reasoning_content or delta.thinking
-                        reasoning = delta.get("reasoning_content") or delta.get("thinking") or delta.get("reasoning")
-                        if reasoning:
-                            yield StreamEvent(
-                                type=StreamEventType.THINKING,
-                                content=reasoning
-                            )
-                        
-                        # Handle regular content
-                        if delta.get("content"):
                             yield StreamEvent(
-                                type=StreamEventType.TEXT,
-                                content=delta["content"]
+                                type=StreamEventType.TOOL_CALL,
+                                tool_call_id=tc_data["id"] or f"call_{idx}",
+                                tool_name=tc_data["name"],
+                                tool_arguments=args
                             )
-                        
-                        # Handle tool calls (streamed incrementally)
-                        if delta.get("tool_calls"):
-                            for tc in delta["tool_calls"]:
-                                idx = tc.get("index", 0)
-                                
-                                if idx not in pending_tool_calls:
-                                    pending_tool_calls[idx] = {
-                                        "id": tc.get("id", ""),
-                                        "name": "",
-                                        "arguments": ""
-                                    }
-                                
-                                # Accumulate function info
-                                if "function" in tc:
-                                    if tc["function"].get("name"):
-                                        pending_tool_calls[idx]["name"] = tc["function"]["name"]
-                                    if tc["function"].get("arguments"):
-                                        pending_tool_calls[idx]["arguments"] += tc["function"]["arguments"]
-                        
-                        # Check for finish reason - emit accumulated tool calls
-                        finish_reason = choice.get("finish_reason")
-                        if finish_reason == "tool_calls" and pending_tool_calls:
-                            for idx, tc_data in pending_tool_calls.items():
-                                try:
-                                    args = json.loads(tc_data["arguments"]) if tc_data["arguments"] else {}
-                                except json.JSONDecodeError:
-                                    args = {}
-                                
-                                yield StreamEvent(
-                                    type=StreamEventType.TOOL_CALL,
-                                    tool_name=tc_data["name"],
-                                    tool_arguments=args
-                                )
-                            pending_tool_calls.clear()
+                        pending_tool_calls.clear()
         
         # Ensure we always yield done if not already done
         if not usage_data:
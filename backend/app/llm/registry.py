@@ -0,0 +1,191 @@
+"""
+LLM provider registry.
+Hands out one long-lived provider instance per (provider, model), with the
+model's capabilities from the provider catalogue attached, and runs the
+providers' warm-up and health-check hooks.
+"""
+
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import time
+
+from app.core.config import settings
+from app.llm.base import LLMProvider, ModelCapabilities
+from app.llm.gemini import GeminiProvider
+from app.llm.limiter import RequestLimiter
+from app.llm.ollama import OllamaProvider
+from app.llm.openrouter import OpenRouterProvider
+from app.models.settings_schemas import ProviderInfo, DEFAULT_PROVIDERS
+
+PROVIDER_CLASSES = {
+    "openrouter": OpenRouterProvider,
+    "ollama": OllamaProvider,
+    "gemini": GeminiProvider,
+}
+
+# Settings holding each provider's default model
+DEFAULT_MODEL_SETTINGS = {
+    "openrouter": "openrouter_default_model",
+    "ollama": "ollama_default_model",
+    "gemini": "gemini_default_model",
+}
+
+
+class ProviderRegistry:
+    """
+    Registry of provider instances keyed by (provider, model).
+
+    Instances share the process-wide HTTP client pool (app.core.http) and
+    are created on first use, so settings are read once per model. Each
+    instance is rate limited by its model's limiter (if configured) and
+    its provider's limiter, which all models of the provider share.
+    """
+
+    def __init__(self, catalogue: List[ProviderInfo]):
+        self._catalogue = {info.id: info for info in catalogue}
+        self._providers: Dict[Tuple[str, str], LLMProvider] = {}
+        self._limiters: Dict[str, RequestLimiter] = {}
+
+    def resolve(self, provider_name: Optional[str] = None, model: Optional[str] = None) -> Tuple[str, str]:
+        """Registry key for a provider/model; empty values resolve to the configured defaults."""
+        provider_name = provider_name or settings.default_llm_provider
+        if provider_name not in PROVIDER_CLASSES:
+            raise ValueError(f"Unknown provider: {provider_name}")
+        return provider_name, model or getattr(settings, DEFAULT_MODEL_SETTINGS[provider_name])
+
+    @staticmethod
+    def is_configured(provider_name: str) -> bool:
+        """Whether a provider has the credentials it needs (Ollama needs none)."""
+        if provider_name == "openrouter":
+            return bool(settings.openrouter_api_key)
+        if provider_name == "gemini":
+            return bool(settings.gemini_api_key)
+        return provider_name in PROVIDER_CLASSES
+
+    def capabilities(self, provider_name: Optional[str] = None, model: Optional[str] = None) -> ModelCapabilities:
+        """
+        Capabilities of a provider/model from the catalogue.
+
+        Models missing from the catalogue get settings.context_default_length
+        and no known pricing.
+        """
+        provider_name, model = self.resolve(provider_name, model)
+        info = self._catalogue.get(provider_name)
+        for model_info in info.models if info else []:
+            if model_info.id == model:
+                return ModelCapabilities(
+                    context_length=model_info.context_length,
+                    supports_tools=model_info.supports_tools,
+                    supports_streaming=model_info.supports_streaming,
+                    input_cost_per_m=model_info.input_cost_per_m,
+                    output_cost_per_m=model_info.output_cost_per_m,
+                )
+        return ModelCapabilities(context_length=settings.context_default_length)
+
+    def get(self, provider_name: Optional[str] = None, model: Optional[str] = None) -> LLMProvider:
+        """Get the shared provider instance for a provider/model, creating it on first use."""
+        key = self.resolve(provider_name, model)
+        provider = self._providers.get(key)
+        if provider is None:
+            provider = PROVIDER_CLASSES[key[0]](model=key[1])
+            provider.capabilities = self.capabilities(*key)
+            provider.limiters = self._limiters_for(*key)
+            self._providers[key] = provider
+        return provider
+
+    def _limiters_for(self, provider_name: str, model: str) -> List[RequestLimiter]:
+        """Model limiter (when configured) followed by the shared provider limiter."""
+        limiters = []
+        if settings.llm_model_concurrency or settings.llm_model_rpm:
+            limiters.append(self._limiter(
+                f"{provider_name}/{model}",
+                settings.llm_model_concurrency,
+                settings.llm_model_rpm,
+            ))
+        limiters.append(self._limiter(
+            provider_name,
+            settings.llm_provider_concurrency.get(provider_name, 0),
+            settings.llm_provider_rpm.get(provider_name, 0),
+            exclusive_models=provider_name == "ollama" and settings.ollama_exclusive_model,
+        ))
+        return limiters
+
+    def _limiter(self, name: str, max_concurrency: int, rpm: float, exclusive_models: bool = False) -> RequestLimiter:
+        limiter = self._limiters.get(name)
+        if limiter is None:
+            limiter = RequestLimiter(name, max_concurrency, rpm, exclusive_models)
+            self._limiters[name] = limiter
+        return limiter
+
+    def queue_stats(self) -> List[dict]:
+        """Queue depth and admission metrics of every limiter."""
+        return [limiter.stats() for limiter in self._limiters.values()]
+
+    def instances(self) -> Dict[Tuple[str, str], LLMProvider]:
+        """Provider instances created so far."""
+        return dict(self._providers)
+
+    @staticmethod
+    async def _run_hook(key: Tuple[str, str], provider: LLMProvider, hook: str) -> dict:
+        """Run a provider hook with a timeout, reporting the outcome instead of raising."""
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(getattr(provider, hook)(), timeout=settings.provider_check_timeout)
+            error = None
+        except asyncio.TimeoutError:
+            error = f"timed out after {settings.provider_check_timeout:.0f}s"
+        except Exception as e:
+            error = str(e) or repr(e)
+        return {
+            "provider": key[0],
+            "model": key[1],
+            "ok": error is None,
+            "error": error,
+            "ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    async def warm_up(self, targets: List[Tuple[Optional[str], Optional[str]]]) -> List[dict]:
+        """
+        Create and warm up providers concurrently.
+
+        Args:
+            targets: (provider, model) pairs; empty values use the defaults
+
+        Returns:
+            One result dict per provider (ok, error, ms)
+        """
+        keys = list(dict.fromkeys(self.resolve(p, m) for p, m in targets))
+        results = await asyncio.gather(*(self._run_hook(key, self.get(*key), "warm_up") for key in keys))
+        for result in results:
+            status = "ready" if result["ok"] else f"failed: {result['error']}"
+            print(f"[Providers] {result['provider']}/{result['model']} {status} ({result['ms']}ms)")
+        return results
+
+    async def health(self) -> List[dict]:
+        """Health-check every provider instance in use (the default one if none yet)."""
+        if not self._providers:
+            self.get()
+        return await asyncio.gather(
+            *(self._run_hook(key, provider, "health_check") for key, provider in self._providers.items())
+        )
+
+
+def startup_targets() -> List[Tuple[str, Optional[str]]]:
+    """Providers warmed at startup: the default one and any others with an API key configured."""
+    targets = [(settings.default_llm_provider, None)]
+    for provider_name in ("openrouter", "gemini"):
+        if ProviderRegistry.is_configured(provider_name):
+            targets.append((provider_name, None))
+    return targets
+
+
+# Singleton instance
+_provider_registry: ProviderRegistry | None = None
+
+
+def get_provider_registry() -> ProviderRegistry:
+    """Get or create the process-wide provider registry."""
+    global _provider_registry
+    if _provider_registry is None:
+        _provider_registry = ProviderRegistry(DEFAULT_PROVIDERS)
+    return _provider_registry
@@ -0,0 +1,334 @@
+"""
+Provider routing for turns.
+Runs a request against an ordered chain of providers: on failure before
+the first event the next one takes over, and with hedging enabled a slow
+first token starts the next provider in parallel (the loser is cancelled).
+Per-provider health scores from recent latency and errors move unhealthy
+providers to the end of the chain.
+"""
+
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+import asyncio
+import time
+
+from app.core.config import settings
+from app.llm.base import (
+    LLMMessage,
+    LLMProvider,
+    LLMResponse,
+    ModelCapabilities,
+    StreamEvent,
+    StreamEventType,
+    ToolDefinition,
+)
+
+ProviderKey = Tuple[str, str]
+
+# Marks the end of an attempt's output
+_END = object()
+
+
+def parse_target(target: str) -> Tuple[str, Optional[str]]:
+    """Split a "provider" or "provider:model" chain entry (Ollama models contain ':' too)."""
+    provider_name, _, model = target.partition(":")
+    return provider_name.strip(), model.strip() or None
+
+
+@dataclass
+class HealthStats:
+    """EWMA of a provider's first-token latency and error rate."""
+    latency_ms: Optional[float] = None
+    error_rate: float = 0.0
+    samples: int = 0
+    updated_at: float = field(default_factory=time.monotonic)
+
+    def score(self) -> float:
+        """1.0 for fast and reliable; lower with errors and latency above llm_slow_ttft_ms."""
+        if time.monotonic() - self.updated_at > settings.llm_health_reset_seconds:
+            return 1.0  # Stale: give it another chance
+        score = 1.0 - self.error_rate
+        if self.latency_ms:
+            score *= min(1.0, settings.llm_slow_ttft_ms / self.latency_ms)
+        return score
+
+
+class ProviderHealth:
+    """Health scores per (provider, model), shared by all routes of the process."""
+
+    def __init__(self):
+        self._stats: Dict[ProviderKey, HealthStats] = {}
+
+    def record(self, key: ProviderKey, latency_ms: Optional[float] = None, error: bool = False) -> None:
+        """
+        Add a request outcome.
+
+        Args:
+            key: (provider, model)
+            latency_ms: Time to the first event (or until the request was abandoned)
+            error: Whether the request failed
+        """
+        alpha = settings.llm_health_alpha
+        stats = self._stats.setdefault(key, HealthStats())
+        stats.error_rate += alpha * ((1.0 if error else 0.0) - stats.error_rate)
+        if latency_ms is not None:
+            if stats.latency_ms is None:
+                stats.latency_ms = latency_ms
+            else:
+                stats.latency_ms += alpha * (latency_ms - stats.latency_ms)
+        stats.samples += 1
+        stats.updated_at = time.monotonic()
+
+    def score(self, key: ProviderKey) -> float:
+        stats = self._stats.get(key)
+        return stats.score() if stats else 1.0
+
+    def snapshot(self) -> List[dict]:
+        """Current health of every provider that has served requests."""
+        return [
+            {
+                "provider": key[0],
+                "model": key[1],
+                "score": round(stats.score(), 3),
+                "latency_ms": round(stats.latency_ms, 1) if stats.latency_ms is not None else None,
+                "error_rate": round(stats.error_rate, 3),
+                "samples": stats.samples,
+            }
+            for key, stats in self._stats.items()
+        ]
+
+
+@dataclass
+class _Attempt:
+    """One provider's request within a route call."""
+    key: ProviderKey
+    provider: LLMProvider
+    hedge: bool
+    started: float = field(default_factory=time.perf_counter)
+    task: Optional[asyncio.Task] = None
+
+    @property
+    def label(self) -> str:
+        return f"{self.key[0]}/{self.key[1]}"
+
+    @property
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+
+class ProviderRoute:
+    """
+    A participant's ordered provider chain, used in place of a single provider.
+
+    Exposes the parts of the LLMProvider interface turns use. Capabilities
+    follow the first (preferred) provider, except context_length, which is
+    the smallest window in the chain; the shared-prefix context layout
+    is only used when every provider in the chain prefers it, since the
+    context is built once for whichever provider answers. estimate_cost
+    and served_by refer to the provider that answered the last request.
+    Routes are built per turn, so that state is not shared.
+    """
+
+    def __init__(self, targets: List[Tuple[ProviderKey, LLMProvider]], health: ProviderHealth):
+        self.health = health
+        # Healthy providers first, keeping the configured order otherwise
+        self.targets = sorted(targets, key=lambda t: health.score(t[0]) < settings.llm_min_health_score)
+        self.served: Optional[_Attempt] = None
+        self.failed: List[str] = []
+
+    @property
+    def primary(self) -> LLMProvider:
+        return self.targets[0][1]
+
+    @property
+    def capabilities(self) -> ModelCapabilities:
+        return self.primary.capabilities
+
+    @property
+    def context_length(self) -> int:
+        """Smallest context window in the chain, so the context fits whichever provider answers."""
+        return min(provider.capabilities.context_length for _, provider in self.targets)
+
+    @property
+    def prefers_shared_prefix(self) -> bool:
+        # A trailing persona system message would replace other providers' system instruction
+        return all(provider.prefers_shared_prefix for _, provider in self.targets)
+
+    def estimate_cost(self, usage: dict) -> float:
+        provider = self.served.provider if self.served else self.primary
+        return provider.estimate_cost(usage)
+
+    def round_info(self) -> dict:
+        """Routing details of the last request, for turn metrics."""
+        if len(self.targets) == 1:
+            return {}
+        info = {"served_by": self.served.label if self.served else None}
+        if self.served and self.served.hedge:
+            info["hedged"] = True
+        if self.failed:
+            info["failed"] = list(self.failed)
+        return info
+
+    async def complete(
+        self,
+        messages: List[LLMMessage],
+        tools: Optional[List[ToolDefinition]] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+    ) -> LLMResponse:
+        """Complete with the first provider that succeeds (no hedging)."""
+        async def request(provider: LLMProvider) -> AsyncIterator[LLMResponse]:
+            yield await provider.complete(messages, self._tools_for(provider, tools), temperature, max_tokens)
+
+        async with aclosing(self._race(request, hedge_after=None)) as results:
+            async for response in results:
+                if isinstance(response, StreamEvent):
+                    raise RuntimeError(response.content)
+                return response
+
+    async def stream(
+        self,
+        messages: List[LLMMessage],
+        tools: Optional[List[ToolDefinition]] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+    ) -> AsyncIterator[StreamEvent]:
+        """
+        Stream from the first provider to produce an event.
+
+        With llm_hedge_after_ms set, the next provider is started when no
+        event has arrived in time, up to llm_max_hedges extra requests.
+        """
+        def request(provider: LLMProvider) -> AsyncIterator[StreamEvent]:
+            return provider.stream(messages, self._tools_for(provider, tools), temperature, max_tokens)
+
+        hedge_after = settings.llm_hedge_after_ms / 1000 if settings.llm_hedge_after_ms > 0 else None
+        async with aclosing(self._race(request, hedge_after)) as events:
+            async for event in events:
+                yield event
+
+    @staticmethod
+    def _tools_for(provider: LLMProvider, tools: Optional[List[ToolDefinition]]) -> Optional[List[ToolDefinition]]:
+        return tools if provider.capabilities.supports_tools else None
+
+    async def _race(
+        self,
+        request: Callable[[LLMProvider], AsyncIterator],
+        hedge_after: Optional[float],
+    ) -> AsyncIterator:
+        """
+        Run request() along the chain and relay the winning attempt's items.
+
+        An attempt fails if it raises, yields an ERROR event or ends before
+        its first item; the next provider is started unless another attempt
+        is still running. The first attempt to produce an item wins and the
+        others are cancelled. If every provider fails, the last error is
+        yielded as an ERROR event.
+        """
+        output: asyncio.Queue = asyncio.Queue()
+        pending = iter(self.targets)
+        attempts: List[_Attempt] = []
+        hedges = 0
+        last_error = "No provider available"
+        self.served = None
+        self.failed = []
+
+        async def pump(attempt: _Attempt) -> None:
+            try:
+                async for item in request(attempt.provider):
+                    output.put_nowait((attempt, item))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                output.put_nowait((attempt, e))
+            output.put_nowait((attempt, _END))
+
+        def start_next(hedge: bool) -> bool:
+            target = next(pending, None)
+            if target is None:
+                return False
+            attempt = _Attempt(key=target[0], provider=target[1], hedge=hedge)
+            attempt.task = asyncio.create_task(pump(attempt))
+            attempts.append(attempt)
+            return True
+
+        try:
+            start_next(hedge=False)
+            winner = None
+            first = None
+            while winner is None:
+                if not attempts and not start_next(hedge=False):
+                    yield StreamEvent(type=StreamEventType.ERROR, content=last_error)
+                    return
+
+                can_hedge = hedge_after is not None and hedges < settings.llm_max_hedges
+                try:
+                    attempt, item = await asyncio.wait_for(output.get(), hedge_after if can_hedge else None)
+                except asyncio.TimeoutError:
+                    if start_next(hedge=True):
+                        hedges += 1
+                        print(f"[Router] No first token after {hedge_after * 1000:.0f}ms, hedging with {attempts[-1].label}")
+                    else:
+                        hedges = settings.llm_max_hedges  # Chain exhausted
+                    continue
+
+                if attempt not in attempts:
+                    continue  # Leftover from a failed attempt
+
+                if item is _END or isinstance(item, Exception) or (
+                    isinstance(item, StreamEvent) and item.type == StreamEventType.ERROR
+                ):
+                    error = "empty response" if item is _END else (
+                        item.content if isinstance(item, StreamEvent) else (str(item) or repr(item))
+                    )
+                    last_error = f"{attempt.label}: {error}"
+                    print(f"[Router] {last_error}")
+                    self.health.record(attempt.key, error=True)
+                    self.failed.append(attempt.label)
+                    attempts.remove(attempt)
+                    attempt.task.cancel()
+                    continue
+
+                winner, first = attempt, item
+
+            self.served = winner
+            self.health.record(winner.key, latency_ms=winner.elapsed_ms)
+            for attempt in attempts:
+                if attempt is not winner:
+                    # Lost the race: at least this slow, but not an error
+                    self.health.record(attempt.key, latency_ms=attempt.elapsed_ms)
+                    attempt.task.cancel()
+            attempts[:] = [winner]
+
+            yield first
+            while True:
+                attempt, item = await output.get()
+                if attempt is not winner:
+                    continue
+                if item is _END:
+                    return
+                if isinstance(item, Exception) or (
+                    isinstance(item, StreamEvent) and item.type == StreamEventType.ERROR
+                ):
+                    # Failed mid-response: too late to switch providers
+                    self.health.record(winner.key, error=True)
+                    content = item.content if isinstance(item, StreamEvent) else str(item)
+                    yield StreamEvent(type=StreamEventType.ERROR, content=f"{winner.label}: {content}")
+                    return
+                yield item
+        finally:
+            for attempt in attempts:
+                attempt.task.cancel()
+
+
+# Singleton instance
+_provider_health: ProviderHealth | None = None
+
+
+def get_provider_health() -> ProviderHealth:
+    """Get or create the process-wide provider health tracker."""
+    global _provider_health
+    if _provider_health is None:
+        _provider_health = ProviderHealth()
+    return _provider_health
@@ -18,6 +18,8 @@ from app.models.schemas import (
     MeetingCreate,
     Meeting,
     MeetingWithParticipants,
+    SummarySection,
+    RollingSummary,
     # Disagreements
     DisagreementBase,
     DisagreementCreate,
@@ -87,6 +89,8 @@ __all__ = [
     "MeetingCreate",
     "Meeting",
     "MeetingWithParticipants",
+    "SummarySection",
+    "RollingSummary",
     "DisagreementBase",
     "DisagreementCreate",
     "Disagreement",
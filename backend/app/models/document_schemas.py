@@ -54,6 +54,21 @@ class DocumentUploadResponse(BaseModel):
     message: str
 
 
+class IngestionJobStatus(BaseModel):
+    """Ingestion queue state and timings for a document."""
+    job_id: str
+    document_id: str
+    status: str  # queued, running, done, failed, cancelled
+    attempts: int
+    file_size_bytes: int
+    enqueued_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    queued_seconds: Optional[float] = None
+    processing_seconds: Optional[float] = None
+    last_error: Optional[str] = None
+
+
 class DocumentSearchRequest(BaseModel):
     """Request body for document search."""
     query: str = Field(..., min_length=1, max_length=1000)
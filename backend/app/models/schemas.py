@@ -34,6 +34,7 @@ class ProviderConfig(BaseModel):
     provider: str = ""  # Empty = use DEFAULT_LLM_PROVIDER from settings
     model: str = ""     # Empty = use provider's default model from settings
     temperature: float = 0.7
+    fallbacks: List[str] = []  # "provider" or "provider:model"; empty = LLM_FALLBACK_CHAIN from settings
 
 
 class AIParticipantBase(BaseModel):
@@ -96,6 +97,7 @@ class Message(MessageBase):
     tool_artifacts: Optional[dict] = None
     thinking_content: Optional[str] = None  # AI thinking/reasoning content
     estimated_cost: float = 0.0
+    token_count: int = 0  # Content + thinking tokens, counted when saved
     created_at: datetime
 
     class Config:
@@ -116,12 +118,45 @@ class MeetingCreate(MeetingBase):
     persona_ids: Optional[List[str]] = None  # If provided, use these personas instead of defaults
 
 
+class SummarySection(BaseModel):
+    """Summary of a contiguous range of messages [start, end)."""
+    start: int
+    end: int
+    text: str
+
+
+class RollingSummary(BaseModel):
+    """
+    Hierarchical running summary of a meeting.
+    
+    Recent messages are summarized in sections; when there are too many
+    sections the oldest are folded into a single overview.
+    """
+    overview: str = ""
+    overview_end: int = 0  # Messages [0, overview_end) are covered by the overview
+    sections: List[SummarySection] = Field(default_factory=list)
+    
+    @property
+    def message_count(self) -> int:
+        """Number of messages (from the start of the meeting) covered."""
+        return self.sections[-1].end if self.sections else self.overview_end
+    
+    def render(self) -> str:
+        """Overview followed by section summaries, oldest first."""
+        parts = [self.overview] if self.overview else []
+        parts.extend(s.text for s in self.sections)
+        return "\n\n".join(parts)
+
+
 class Meeting(MeetingBase):
     """Full meeting model with ID."""
     id: str
     user_id: Optional[str] = None
     status: MeetingStatus = MeetingStatus.ACTIVE
     total_cost: float = 0.0
+    message_tokens: int = 0  # Running sum of messages.token_count
+    message_count: int = 0
+    rolling_summary: Optional[RollingSummary] = None
     created_at: datetime
 
     class Config:
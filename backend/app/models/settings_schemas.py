@@ -15,6 +15,9 @@ class ProviderModelInfo(BaseModel):
     context_length: int = 4096
     supports_tools: bool = True
     supports_streaming: bool = True
+    # List prices in USD per 1M tokens; None when unknown
+    input_cost_per_m: Optional[float] = None
+    output_cost_per_m: Optional[float] = None
 
 
 class ProviderInfo(BaseModel):
@@ -81,18 +84,18 @@ class ProvidersListResponse(BaseModel):
 # ============== Default Provider Data ==============
 
 OPENROUTER_MODELS = [
-    ProviderModelInfo(id="anthropic/claude-sonnet-4-20250514", name="Claude Sonnet 4", context_length=200000, supports_tools=True),
-    ProviderModelInfo(id="anthropic/claude-3.5-sonnet", name="Claude 3.5 Sonnet", context_length=200000, supports_tools=True),
-    ProviderModelInfo(id="openai/gpt-4o", name="GPT-4o", context_length=128000, supports_tools=True),
-    ProviderModelInfo(id="openai/gpt-4o-mini", name="GPT-4o Mini", context_length=128000, supports_tools=True),
-    ProviderModelInfo(id="google/gemini-2.0-flash-001", name="Gemini 2.0 Flash", context_length=1000000, supports_tools=True),
+    ProviderModelInfo(id="anthropic/claude-sonnet-4-20250514", name="Claude Sonnet 4", context_length=200000, supports_tools=True, input_cost_per_m=3.0, output_cost_per_m=15.0),
+    ProviderModelInfo(id="anthropic/claude-3.5-sonnet", name="Claude 3.5 Sonnet", context_length=200000, supports_tools=True, input_cost_per_m=3.0, output_cost_per_m=15.0),
+    ProviderModelInfo(id="openai/gpt-4o", name="GPT-4o", context_length=128000, supports_tools=True, input_cost_per_m=2.5, output_cost_per_m=10.0),
+    ProviderModelInfo(id="openai/gpt-4o-mini", name="GPT-4o Mini", context_length=128000, supports_tools=True, input_cost_per_m=0.15, output_cost_per_m=0.6),
+    ProviderModelInfo(id="google/gemini-2.0-flash-001", name="Gemini 2.0 Flash", context_length=1000000, supports_tools=True, input_cost_per_m=0.1, output_cost_per_m=0.4),
     ProviderModelInfo(id="deepseek/deepseek-r1", name="DeepSeek R1", context_length=64000, supports_tools=True),
 ]
 
 GEMINI_MODELS = [
-    ProviderModelInfo(id="gemini-2.0-flash", name="Gemini 2.0 Flash", context_length=1000000, supports_tools=True),
-    ProviderModelInfo(id="gemini-1.5-flash", name="Gemini 1.5 Flash", context_length=1000000, supports_tools=True),
-    ProviderModelInfo(id="gemini-1.5-pro", name="Gemini 1.5 Pro", context_length=2000000, supports_tools=True),
+    ProviderModelInfo(id="gemini-2.0-flash", name="Gemini 2.0 Flash", context_length=1000000, supports_tools=True, input_cost_per_m=0.1, output_cost_per_m=0.4),
+    ProviderModelInfo(id="gemini-1.5-flash", name="Gemini 1.5 Flash", context_length=1000000, supports_tools=True, input_cost_per_m=0.075, output_cost_per_m=0.3),
+    ProviderModelInfo(id="gemini-1.5-pro", name="Gemini 1.5 Pro", context_length=2000000, supports_tools=True, input_cost_per_m=1.25, output_cost_per_m=5.0),
     ProviderModelInfo(id="gemini-2.5-pro-preview-05-06", name="Gemini 2.5 Pro Preview", context_length=1000000, supports_tools=True),
 ]
 
@@ -0,0 +1,138 @@
+"""
+Vector collection cleanup.
+Removes a deleted meeting's Qdrant collection and pending uploads in the
+background, and periodically sweeps collections whose owner row is gone.
+"""
+
+from typing import Dict, List, Set
+import asyncio
+import os
+import re
+
+from app.core.config import settings
+from app.core.database import get_supabase_admin, run_query
+from app.services.ingestion_queue import get_ingestion_queue
+from app.services.vector_store import get_vector_store, VectorStoreManager
+
+# Collection name pattern -> table holding the owning row
+COLLECTION_OWNERS = {
+    re.compile(r"^meeting_(?P<id>[0-9a-f-]{36})_shared$"): "meetings",
+    re.compile(r"^persona_(?P<id>[0-9a-f-]{36})_knowledge$"): "personas",
+    re.compile(r"^stack_(?P<id>[0-9a-f-]{36})_knowledge$"): "knowledge_stacks",
+}
+
+# IDs per existence query (keeps the PostgREST URL short)
+ID_BATCH_SIZE = 100
+
+# Cleanup tasks in flight (referenced so they aren't garbage collected)
+_cleanup_tasks: Set[asyncio.Task] = set()
+
+
+async def cleanup_meeting_storage(meeting_id: str) -> None:
+    """
+    Drop a deleted meeting's shared collection and its queued uploads.
+
+    Document rows go with the meeting (ON DELETE CASCADE). An upload that
+    is already being indexed may recreate the collection; the periodic
+    sweep removes it afterwards.
+    """
+    collection_name = VectorStoreManager.meeting_collection_name(meeting_id)
+
+    try:
+        spool_paths = await get_ingestion_queue().cancel_for_collection(collection_name)
+        for path in spool_paths:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+        await get_vector_store().delete_collection(collection_name)
+    except Exception as e:
+        print(f"[CollectionGC] Cleanup for meeting {meeting_id} failed: {e!r}")
+
+
+def schedule_meeting_cleanup(meeting_id: str) -> None:
+    """Run cleanup_meeting_storage in the background."""
+    task = asyncio.create_task(cleanup_meeting_storage(meeting_id))
+    _cleanup_tasks.add(task)
+    task.add_done_callback(_cleanup_tasks.discard)
+
+
+async def _existing_ids(db, table: str, ids: List[str]) -> Set[str]:
+    """Subset of ids that still have a row in table."""
+    found = set()
+    for i in range(0, len(ids), ID_BATCH_SIZE):
+        result = await run_query(
+            db.table(table).select("id").in_("id", ids[i:i + ID_BATCH_SIZE])
+        )
+        found.update(row["id"] for row in result.data)
+    return found
+
+
+async def collect_orphaned_collections() -> List[str]:
+    """
+    Delete collections whose meeting, persona or knowledge stack no longer exists.
+
+    Collections with names outside the known patterns are never touched.
+    Owner rows are read with the service role key, since rows hidden by
+    RLS would look deleted. If that key is not configured, an owner query
+    fails, or a table with collections returns no owners at all, nothing
+    is deleted.
+
+    Returns:
+        Names of the deleted collections
+    """
+    if not settings.supabase_service_key:
+        print("[CollectionGC] SUPABASE_SERVICE_KEY not set, skipping sweep")
+        return []
+
+    vector_store = get_vector_store()
+    response = await vector_store.client.get_collections()
+
+    # table -> {owner id: collection name}
+    owned: Dict[str, Dict[str, str]] = {}
+    for collection in response.collections:
+        for pattern, table in COLLECTION_OWNERS.items():
+            match = pattern.match(collection.name)
+            if match:
+                owned.setdefault(table, {})[match.group("id")] = collection.name
+                break
+
+    # Check every table before deleting anything
+    db = get_supabase_admin()
+    orphaned = []
+    for table, collections in owned.items():
+        try:
+            existing = await _existing_ids(db, table, list(collections))
+        except Exception as e:
+            print(f"[CollectionGC] Reading {table} failed, skipping sweep: {e!r}")
+            return []
+        if not existing:
+            print(f"[CollectionGC] No {table} rows found for {len(collections)} collections, skipping sweep")
+            return []
+        orphaned.extend(name for owner_id, name in collections.items() if owner_id not in existing)
+
+    deleted = []
+    for collection_name in orphaned:
+        if await vector_store.delete_collection(collection_name):
+            deleted.append(collection_name)
+
+    if deleted:
+        print(f"[CollectionGC] Deleted {len(deleted)} orphaned collections")
+    return deleted
+
+
+async def run_collection_gc(interval: float) -> None:
+    """Sweep orphaned collections every `interval` seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await collect_orphaned_collections()
+        except Exception as e:
+            print(f"[CollectionGC] Sweep failed: {e!r}")
+
+
+async def close_collection_gc() -> None:
+    """Wait for scheduled meeting cleanups to finish."""
+    if _cleanup_tasks:
+        await asyncio.gather(*_cleanup_tasks, return_exceptions=True)
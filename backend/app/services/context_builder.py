@@ -0,0 +1,191 @@
+"""
+Token-budgeted context builder for AI turns.
+Keeps the system prompt, agenda and recent turns verbatim and replaces
+older history with the meeting's rolling summary once the budget is exceeded.
+"""
+
+from typing import List, Optional, Tuple
+
+from app.core.config import settings
+from app.llm import LLMMessage
+from app.models import AIParticipant, Message, SenderType, RollingSummary
+from app.services.tokens import count_tokens, get_context_length, get_token_cache
+
+# Opens the shared-prefix layout, where the persona prompt comes last
+SHARED_PREFIX_HEADER = (
+    "This is a meeting between a user and several AI advisors. The discussion "
+    "so far follows; your own role and instructions are given after it."
+)
+
+
+class ContextBuilder:
+    """
+    Builds per-participant LLM context within a token budget.
+
+    Older history is represented by the rolling summary pieces (overview
+    and section summaries) maintained by MeetingSummarizer. Messages not
+    yet covered by a summary and not fitting verbatim are replaced by an
+    omission marker, so building context never waits on an LLM call.
+    """
+
+    def __init__(self, max_prompt_tokens: int, recent_turns: int):
+        self.max_prompt_tokens = max_prompt_tokens
+        self.recent_turns = recent_turns
+        self.token_cache = get_token_cache()
+
+    def budget_for(
+        self,
+        participant: AIParticipant,
+        context_length: Optional[int] = None,
+        output_tokens: int = 2048,
+    ) -> int:
+        """Prompt token budget from a context length (default: the participant's model's)."""
+        if context_length is None:
+            config = participant.provider_config
+            context_length = get_context_length(config.provider or None, config.model or None)
+        return max(min(context_length - output_tokens, self.max_prompt_tokens), 0)
+
+    @staticmethod
+    def _to_llm_message(participant: Optional[AIParticipant], msg: Message) -> Optional[LLMMessage]:
+        """
+        Render a chat message from the participant's point of view.
+
+        Without a participant every AI message is rendered as another
+        speaker's, so the result is the same for all participants.
+        """
+        if msg.sender_type == SenderType.USER:
+            return LLMMessage(role="user", content=f"User: {msg.content}")
+        elif msg.sender_type == SenderType.AI:
+            if participant is not None and msg.sender_id == participant.id:
+                # This AI's own previous messages
+                return LLMMessage(role="assistant", content=msg.content)
+            # Other AI's messages (include in user context)
+            return LLMMessage(role="user", content=f"AI [{msg.sender_name}]: {msg.content}")
+        elif msg.sender_type == SenderType.SYSTEM:
+            return LLMMessage(role="user", content=f"System: {msg.content}")
+        return None
+
+    @staticmethod
+    def _summary_pieces(summary: Optional[RollingSummary]) -> List[Tuple[int, int, str, int]]:
+        """(start, end, text, tokens) for each summary piece, oldest first."""
+        if summary is None:
+            return []
+        pieces = []
+        if summary.overview:
+            pieces.append((0, summary.overview_end, summary.overview, count_tokens(summary.overview)))
+        for section in summary.sections:
+            pieces.append((section.start, section.end, section.text, count_tokens(section.text)))
+        return pieces
+
+    def build(
+        self,
+        participant: AIParticipant,
+        messages: List[Message],
+        agenda: str,
+        summary: Optional[RollingSummary] = None,
+        shared_prefix: bool = False,
+        context_length: Optional[int] = None,
+    ) -> List[LLMMessage]:
+        """
+        Build the LLM context for a participant's turn.
+
+        Args:
+            participant: The AI participant taking the turn
+            messages: Full chat history, oldest first
+            agenda: Meeting agenda
+            summary: The meeting's rolling summary, if any
+            shared_prefix: Lay the context out so that everything except a
+                trailing persona message is identical for all participants
+                (lets a local server reuse its KV cache between speakers)
+            context_length: Context window to budget for, e.g. the smallest
+                in the turn's provider chain (default: the participant's model's)
+
+        Returns:
+            System message followed by (summarized) history, plus the
+            persona message in shared-prefix layout. The leading system
+            message is a prompt cache breakpoint; so is the last history
+            message while the history is sent unwindowed (it only grows, so
+            each turn's prefix extends the previous one).
+        """
+        if shared_prefix:
+            system_content = SHARED_PREFIX_HEADER
+            if agenda:
+                system_content += f"\n\nMEETING AGENDA:\n{agenda}"
+            tail = [LLMMessage(role="system", content=participant.system_prompt)]
+            viewer = None
+        else:
+            system_content = participant.system_prompt
+            if agenda:
+                system_content += f"\n\nMEETING AGENDA:\n{agenda}"
+            tail = []
+            viewer = participant
+        system = LLMMessage(role="system", content=system_content, cache_breakpoint=True)
+
+        budget = self.budget_for(participant, context_length) - count_tokens(system_content)
+        budget -= sum(count_tokens(m.content) for m in tail)
+        counts = [self.token_cache.message_tokens(m) for m in messages]
+
+        # Whole history fits: no windowing needed
+        if sum(counts) <= budget:
+            history = [self._to_llm_message(viewer, m) for m in messages]
+            history = [m for m in history if m is not None]
+            if history:
+                history[-1].cache_breakpoint = True
+            return [system] + history + tail
+
+        # Recent turns are always verbatim (trimmed only if they alone exceed the budget)
+        start = max(len(messages) - self.recent_turns, 0)
+        used = sum(counts[start:])
+        while used > budget and start < len(messages) - 1:
+            used -= counts[start]
+            start += 1
+
+        # Fill remaining budget with older messages verbatim, newest first,
+        # keeping room for the summary of the rest
+        pieces = self._summary_pieces(summary)
+        summary_reserve = min(sum(p[3] for p in pieces), max(budget - used, 0) // 2)
+        while start > 0 and used + counts[start - 1] <= budget - summary_reserve:
+            start -= 1
+            used += counts[start]
+
+        # Everything before `start` is represented by summary pieces (newest kept first)
+        summary_parts = []
+        covered = 0
+        remaining = budget - used
+        for piece_start, piece_end, text, tokens in reversed(pieces):
+            if piece_start >= start or tokens > remaining:
+                continue
+            summary_parts.append(text)
+            covered += min(piece_end, start) - piece_start
+            remaining -= tokens
+        omitted = start - covered
+
+        context = [system]
+        if summary_parts or omitted:
+            lines = ["Summary of earlier discussion:"]
+            if omitted:
+                lines.append(f"[{omitted} earlier messages omitted]")
+            lines.extend(reversed(summary_parts))
+            context.append(LLMMessage(role="user", content="System: " + "\n\n".join(lines)))
+
+        for msg in messages[start:]:
+            llm_message = self._to_llm_message(viewer, msg)
+            if llm_message is not None:
+                context.append(llm_message)
+
+        return context + tail
+
+
+# Singleton instance
+_context_builder: ContextBuilder | None = None
+
+
+def get_context_builder() -> ContextBuilder:
+    """Get or create the process-wide context builder."""
+    global _context_builder
+    if _context_builder is None:
+        _context_builder = ContextBuilder(
+            max_prompt_tokens=settings.context_max_prompt_tokens,
+            recent_turns=settings.context_recent_turns,
+        )
+    return _context_builder
@@ -4,7 +4,7 @@ Supports PDF, DOCX, XLSX, CSV, TXT, and MD formats.
 """
 
 from dataclasses import dataclass
-from typing import List, BinaryIO
+from typing import List, BinaryIO, Iterator
 import io
 
 from langchain_text_splitters import RecursiveCharacterTextSplitter
@@ -64,14 +64,65 @@ class DocumentProcessor:
         Returns:
             Extracted text content
         """
-        # Normalize file type
+        return self._get_parser(file_type)(self._read_bytes(file_content))
+    
+    def iter_sections(
+        self,
+        file_content: BinaryIO | bytes,
+        file_type: str,
+        start: int = 0,
+        stop: int | None = None
+    ) -> Iterator[str]:
+        """
+        Lazily extract text one section at a time.
+        
+        PDFs yield one section per page and spreadsheets one per sheet;
+        other formats yield their whole text as a single section.
+        `start`/`stop` select a range of sections (see count_sections),
+        so a large file can be parsed in independent slices.
+        """
         file_type = file_type.lower().lstrip(".")
+        content_bytes = self._read_bytes(file_content)
+        
+        section_parsers = {
+            "pdf": self._iter_pdf_pages,
+            "xlsx": self._iter_xlsx_sheets,
+            "xls": self._iter_xlsx_sheets,
+        }
+        
+        if file_type in section_parsers:
+            yield from section_parsers[file_type](content_bytes, start, stop)
+        elif start == 0 and stop != 0:
+            yield self._get_parser(file_type)(content_bytes)
+    
+    def count_sections(self, file_content: BinaryIO | bytes, file_type: str) -> int:
+        """Number of sections iter_sections can yield for a file."""
+        file_type = file_type.lower().lstrip(".")
+        content_bytes = self._read_bytes(file_content)
+        
+        if file_type == "pdf":
+            from pypdf import PdfReader
+            return len(PdfReader(io.BytesIO(content_bytes)).pages)
         
-        # Ensure we have bytes
+        if file_type in ("xlsx", "xls"):
+            from openpyxl import load_workbook
+            return len(load_workbook(io.BytesIO(content_bytes), read_only=True).sheetnames)
+        
+        # Validate the type so unsupported files fail fast
+        self._get_parser(file_type)
+        return 1
+    
+    @staticmethod
+    def _read_bytes(file_content: BinaryIO | bytes) -> bytes:
+        """Ensure we have bytes."""
         if hasattr(file_content, "read"):
-            content_bytes = file_content.read()
-        else:
-            content_bytes = file_content
+            return file_content.read()
+        return file_content
+    
+    def _get_parser(self, file_type: str):
+        """Look up the whole-file parser for a file type."""
+        # Normalize file type
+        file_type = file_type.lower().lstrip(".")
         
         parsers = {
             "pdf": self._parse_pdf,
@@ -88,21 +139,22 @@ class DocumentProcessor:
         if not parser:
             raise ValueError(f"Unsupported file type: {file_type}. Supported: {list(parsers.keys())}")
         
-        return parser(content_bytes)
+        return parser
     
     def _parse_pdf(self, content: bytes) -> str:
         """Parse PDF file using pypdf."""
+        return "\n\n".join(self._iter_pdf_pages(content))
+    
+    def _iter_pdf_pages(self, content: bytes, start: int = 0, stop: int | None = None) -> Iterator[str]:
+        """Yield the text of each non-empty PDF page in [start, stop)."""
         from pypdf import PdfReader
         
         reader = PdfReader(io.BytesIO(content))
-        text_parts = []
         
-        for page in reader.pages:
+        for page in reader.pages[start:stop]:
             page_text = page.extract_text()
             if page_text:
-                text_parts.append(page_text)
-        
-        return "\n\n".join(text_parts)
+                yield page_text
     
     def _parse_docx(self, content: bytes) -> str:
         """Parse DOCX file using python-docx."""
@@ -126,21 +178,24 @@ class DocumentProcessor:
     
     def _parse_xlsx(self, content: bytes) -> str:
         """Parse XLSX/XLS file using openpyxl."""
+        return "\n".join(self._iter_xlsx_sheets(content))
+    
+    def _iter_xlsx_sheets(self, content: bytes, start: int = 0, stop: int | None = None) -> Iterator[str]:
+        """Yield the text of each worksheet in [start, stop)."""
         from openpyxl import load_workbook
         
-        wb = load_workbook(io.BytesIO(content), data_only=True)
-        text_parts = []
+        wb = load_workbook(io.BytesIO(content), data_only=True, read_only=True)
         
-        for sheet_name in wb.sheetnames:
+        for sheet_name in wb.sheetnames[start:stop]:
             sheet = wb[sheet_name]
-            text_parts.append(f"## Sheet: {sheet_name}")
+            text_parts = [f"## Sheet: {sheet_name}"]
             
             for row in sheet.iter_rows():
                 row_values = [str(cell.value) for cell in row if cell.value is not None]
                 if row_values:
                     text_parts.append(" | ".join(row_values))
-        
-        return "\n".join(text_parts)
+            
+            yield "\n".join(text_parts)
     
     def _parse_csv(self, content: bytes) -> str:
         """Parse CSV file."""
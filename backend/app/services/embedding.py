@@ -5,14 +5,24 @@ Supports multiple providers: Gemini, OpenAI, Cohere, and Ollama.
 
 from abc import ABC, abstractmethod
 from typing import List
+import asyncio
+
 import httpx
 
 from app.core.config import settings
+from app.core.http import get_http_client
+
+
+# Status codes worth retrying (rate limiting and transient server errors)
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
 
 
 class EmbeddingProvider(ABC):
     """Abstract base class for embedding providers."""
     
+    # Largest number of texts the upstream accepts in one embedding request
+    max_batch_size: int = 96
+    
     @property
     @abstractmethod
     def dimension(self) -> int:
@@ -28,6 +38,11 @@ class EmbeddingProvider(ABC):
     async def embed_batch(self, texts: List[str]) -> List[List[float]]:
         """Generate embeddings for multiple texts."""
         pass
+    
+    def batches(self, texts: List[str]) -> List[List[str]]:
+        """Split texts into request-sized batches for this provider."""
+        size = self.max_batch_size
+        return [texts[i:i + size] for i in range(0, len(texts), size)]
 
 
 class GeminiEmbedding(EmbeddingProvider):
@@ -39,6 +54,9 @@ class GeminiEmbedding(EmbeddingProvider):
         "embedding-001": 768,
     }
     
+    # batchEmbedContents accepts at most 100 requests
+    max_batch_size = 100
+    
     def __init__(self, model: str = "text-embedding-004"):
         self.model = model
         self.api_key = settings.gemini_api_key
@@ -56,19 +74,25 @@ class GeminiEmbedding(EmbeddingProvider):
         return result[0]
     
     async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        embeddings = []
+        for batch in self.batches(texts):
+            embeddings.extend(await self._embed_request(batch))
+        return embeddings
+    
+    async def _embed_request(self, texts: List[str]) -> List[List[float]]:
         url = f"{self.base_url}/models/{self.model}:batchEmbedContents"
         
         requests = [{"model": f"models/{self.model}", "content": {"parts": [{"text": t}]}} for t in texts]
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                url,
-                params={"key": self.api_key},
-                json={"requests": requests},
-                timeout=60.0
-            )
-            response.raise_for_status()
-            data = response.json()
+        client = get_http_client(self.base_url)
+        response = await client.post(
+            url,
+            params={"key": self.api_key},
+            json={"requests": requests},
+            timeout=settings.embedding_timeout
+        )
+        response.raise_for_status()
+        data = response.json()
         
         return [emb["values"] for emb in data["embeddings"]]
 
@@ -82,6 +106,9 @@ class OpenAIEmbedding(EmbeddingProvider):
         "text-embedding-ada-002": 1536,
     }
     
+    # API allows 2048 inputs but also caps total tokens per request (~300k)
+    max_batch_size = 512
+    
     def __init__(self, model: str = "text-embedding-3-small"):
         self.model = model
         self.api_key = settings.openai_api_key
@@ -99,17 +126,23 @@ class OpenAIEmbedding(EmbeddingProvider):
         return result[0]
     
     async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        embeddings = []
+        for batch in self.batches(texts):
+            embeddings.extend(await self._embed_request(batch))
+        return embeddings
+    
+    async def _embed_request(self, texts: List[str]) -> List[List[float]]:
         url = f"{self.base_url}/embeddings"
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                url,
-                headers={"Authorization": f"Bearer {self.api_key}"},
-                json={"model": self.model, "input": texts},
-                timeout=60.0
-            )
-            response.raise_for_status()
-            data = response.json()
+        client = get_http_client(self.base_url)
+        response = await client.post(
+            url,
+            headers={"Authorization": f"Bearer {self.api_key}"},
+            json={"model": self.model, "input": texts},
+            timeout=settings.embedding_timeout
+        )
+        response.raise_for_status()
+        data = response.json()
         
         # Sort by index to ensure correct order
         embeddings = sorted(data["data"], key=lambda x: x["index"])
@@ -126,6 +159,9 @@ class CohereEmbedding(EmbeddingProvider):
         "embed-multilingual-light-v3.0": 384,
     }
     
+    # /embed accepts at most 96 texts per call
+    max_batch_size = 96
+    
     def __init__(self, model: str = "embed-english-v3.0"):
         self.model = model
         self.api_key = settings.cohere_api_key
@@ -143,22 +179,28 @@ class CohereEmbedding(EmbeddingProvider):
         return result[0]
     
     async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        embeddings = []
+        for batch in self.batches(texts):
+            embeddings.extend(await self._embed_request(batch))
+        return embeddings
+    
+    async def _embed_request(self, texts: List[str]) -> List[List[float]]:
         url = f"{self.base_url}/embed"
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                url,
-                headers={"Authorization": f"Bearer {self.api_key}"},
-                json={
-                    "model": self.model,
-                    "texts": texts,
-                    "input_type": "search_document",  # or "search_query" for queries
-                    "truncate": "END"
-                },
-                timeout=60.0
-            )
-            response.raise_for_status()
-            data = response.json()
+        client = get_http_client(self.base_url)
+        response = await client.post(
+            url,
+            headers={"Authorization": f"Bearer {self.api_key}"},
+            json={
+                "model": self.model,
+                "texts": texts,
+                "input_type": "search_document",  # or "search_query" for queries
+                "truncate": "END"
+            },
+            timeout=settings.embedding_timeout
+        )
+        response.raise_for_status()
+        data = response.json()
         
         return data["embeddings"]
 
@@ -178,33 +220,104 @@ class OllamaEmbedding(EmbeddingProvider):
     def __init__(self, model: str = "nomic-embed-text"):
         self.model = model
         self.base_url = settings.ollama_base_url
+        self.max_batch_size = settings.ollama_embed_batch_size
+        self.concurrency = settings.ollama_embed_concurrency
+        # Shared by all calls on this instance, so concurrent batches are bounded together
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        # None = not probed yet; False = server predates the /api/embed endpoint
+        self._batch_endpoint: bool | None = None
     
     @property
     def dimension(self) -> int:
         return self.MODEL_DIMENSIONS.get(self.model, settings.embedding_dimension)
     
-    async def embed_text(self, text: str) -> List[float]:
-        url = f"{self.base_url}/api/embeddings"
+    async def _post_with_retry(self, path: str, payload: dict) -> httpx.Response:
+        """
+        POST to Ollama, retrying transient failures with exponential backoff.
+        
+        Each request holds one of the instance's `ollama_embed_concurrency`
+        slots (not held during backoff).
+        """
+        client = get_http_client(self.base_url)
+        attempts = settings.embedding_max_retries + 1
+        
+        for attempt in range(attempts):
+            last_attempt = attempt == attempts - 1
+            try:
+                async with self._semaphore:
+                    response = await client.post(
+                        f"{self.base_url}{path}",
+                        json=payload,
+                        timeout=settings.embedding_timeout
+                    )
+            except httpx.TransportError:
+                if last_attempt:
+                    raise
+            else:
+                if response.status_code not in RETRYABLE_STATUS_CODES or last_attempt:
+                    return response
+            
+            await asyncio.sleep(settings.embedding_retry_backoff * (2 ** attempt))
+    
+    async def _embed_single(self, text: str) -> List[float]:
+        """Embed one text with the legacy /api/embeddings endpoint."""
+        response = await self._post_with_retry(
+            "/api/embeddings",
+            {"model": self.model, "prompt": text}
+        )
+        response.raise_for_status()
+        return response.json()["embedding"]
+    
+    async def _embed_many(self, texts: List[str]) -> List[List[float]] | None:
+        """
+        Embed a batch with the /api/embed endpoint.
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                url,
-                json={"model": self.model, "prompt": text},
-                timeout=60.0
-            )
-            response.raise_for_status()
-            data = response.json()
+        Returns None if the server does not support batch embedding.
+        """
+        response = await self._post_with_retry(
+            "/api/embed",
+            {"model": self.model, "input": texts}
+        )
+        if response.status_code == 404 and self._batch_endpoint is None:
+            # Older Ollama (< 0.3) only has /api/embeddings. A 404 for an
+            # unknown model also lands here, so only trust it before the
+            # endpoint has ever succeeded.
+            self._batch_endpoint = False
+            return None
         
-        return data["embedding"]
+        response.raise_for_status()
+        self._batch_endpoint = True
+        return response.json()["embeddings"]
+    
+    async def embed_text(self, text: str) -> List[float]:
+        result = await self.embed_batch([text])
+        return result[0]
     
     async def embed_batch(self, texts: List[str]) -> List[List[float]]:
-        # Ollama doesn't have native batch support, so we do sequential calls
-        # Could be optimized with asyncio.gather for parallel execution
-        embeddings = []
-        for text in texts:
-            emb = await self.embed_text(text)
-            embeddings.append(emb)
-        return embeddings
+        """
+        Embed texts, preserving order.
+        
+        Uses the batch /api/embed endpoint where available; otherwise falls
+        back to concurrent /api/embeddings calls. Either way at most
+        `ollama_embed_concurrency` requests are in flight across all calls
+        on this instance.
+        """
+        if not texts:
+            return []
+        
+        if self._batch_endpoint is not False:
+            batches = self.batches(texts)
+            
+            # Probe with the first batch so an unsupported server costs one request
+            first = await self._embed_many(batches[0])
+            if first is not None:
+                rest = await asyncio.gather(*(self._embed_many(b) for b in batches[1:]))
+                embeddings = list(first)
+                for batch_embeddings in rest:
+                    embeddings.extend(batch_embeddings)
+                return embeddings
+        
+        return list(await asyncio.gather(*(self._embed_single(t) for t in texts)))
 
 
 def get_embedding_provider(
@@ -219,7 +332,8 @@ def get_embedding_provider(
         model: Model name. Defaults to settings.
     
     Returns:
-        EmbeddingProvider instance
+        EmbeddingProvider instance (wrapped by the query-embedding cache
+        when EMBEDDING_CACHE_MAX_BYTES > 0)
     """
     provider = provider or settings.embedding_provider
     model = model or settings.embedding_model
@@ -234,4 +348,11 @@ def get_embedding_provider(
     if provider not in providers:
         raise ValueError(f"Unknown embedding provider: {provider}. Supported: {list(providers.keys())}")
     
-    return providers[provider](model=model)
+    instance = providers[provider](model=model)
+    
+    # Wrap with the query-embedding cache unless disabled
+    if settings.embedding_cache_max_bytes > 0:
+        from app.services.embedding_cache import CachedEmbeddingProvider, get_embedding_cache
+        return CachedEmbeddingProvider(instance, get_embedding_cache())
+    
+    return instance
@@ -0,0 +1,208 @@
+"""
+Query-embedding cache.
+Wraps any EmbeddingProvider so repeated queries skip the remote round-trip.
+"""
+
+from array import array
+from collections import OrderedDict
+from typing import List, Optional
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+
+from app.core.config import settings
+from app.services.embedding import EmbeddingProvider
+
+# Approximate per-entry bookkeeping overhead (key, OrderedDict node, array header)
+_ENTRY_OVERHEAD_BYTES = 160
+
+# Disk writes between prunes of the SQLite tier
+_DISK_PRUNE_INTERVAL = 1000
+
+
+class EmbeddingCache:
+    """
+    Byte-bounded LRU of float32 vectors with an optional SQLite tier.
+
+    Vectors are stored as array('f'), i.e. 4 bytes per dimension instead of
+    a list of Python floats. When a disk path is configured, every vector
+    is also written to SQLite so the cache survives restarts; the disk tier
+    keeps the `disk_max_entries` most recently used vectors.
+    """
+
+    def __init__(self, max_bytes: int, disk_path: str = "", disk_max_entries: int = 100_000):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries: "OrderedDict[str, array]" = OrderedDict()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_pruned = 0
+
+        self.disk_max_entries = disk_max_entries
+        self._disk_writes = 0
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        if disk_path:
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_used REAL NOT NULL DEFAULT 0)"
+            )
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(embeddings)")}
+            if "last_used" not in columns:
+                # Files written before the disk tier was bounded
+                self._db.execute("ALTER TABLE embeddings ADD COLUMN last_used REAL NOT NULL DEFAULT 0")
+            self._db.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+            self._db.commit()
+            self._prune_disk()
+
+    @staticmethod
+    def make_key(provider: str, model: str, text: str) -> str:
+        """Key on provider, model and whitespace-normalized text."""
+        normalized = " ".join(text.split())
+        return hashlib.sha256(f"{provider}\x00{model}\x00{normalized}".encode()).hexdigest()
+
+    def _get_memory(self, key: str) -> Optional[array]:
+        vector = self._entries.get(key)
+        if vector is not None:
+            self._entries.move_to_end(key)
+        return vector
+
+    def _put_memory(self, key: str, vector: array) -> None:
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return
+
+        self._entries[key] = vector
+        self.current_bytes += vector.itemsize * len(vector) + _ENTRY_OVERHEAD_BYTES
+
+        while self.current_bytes > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self.current_bytes -= evicted.itemsize * len(evicted) + _ENTRY_OVERHEAD_BYTES
+
+    def _get_disk(self, key: str) -> Optional[array]:
+        with self._db_lock:
+            row = self._db.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._db.execute("UPDATE embeddings SET last_used = ? WHERE key = ?", (time.time(), key))
+                self._db.commit()
+        if row is None:
+            return None
+        vector = array("f")
+        vector.frombytes(row[0])
+        return vector
+
+    def _put_disk(self, key: str, vector: array) -> None:
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                (key, vector.tobytes(), time.time()),
+            )
+            self._db.commit()
+            self._disk_writes += 1
+        if self._disk_writes % _DISK_PRUNE_INTERVAL == 0:
+            self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        """Delete the least recently used vectors beyond disk_max_entries."""
+        with self._db_lock:
+            cursor = self._db.execute(
+                "DELETE FROM embeddings WHERE key IN ("
+                "SELECT key FROM embeddings ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.disk_max_entries,),
+            )
+            self._db.commit()
+        self.disk_pruned += max(cursor.rowcount, 0)
+
+    async def get(self, key: str) -> Optional[List[float]]:
+        """Look up a vector in memory, then on disk."""
+        vector = self._get_memory(key)
+        if vector is not None:
+            self.hits += 1
+            return vector.tolist()
+
+        if self._db is not None:
+            vector = await asyncio.to_thread(self._get_disk, key)
+            if vector is not None:
+                self.disk_hits += 1
+                self._put_memory(key, vector)
+                return vector.tolist()
+
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, embedding: List[float]) -> None:
+        """Store a vector in memory and, if enabled, on disk."""
+        vector = array("f", embedding)
+        self._put_memory(key, vector)
+        if self._db is not None:
+            await asyncio.to_thread(self._put_disk, key, vector)
+
+    def stats(self) -> dict:
+        """Hit/miss metrics for the cache."""
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "disk_enabled": self._db is not None,
+            "disk_max_entries": self.disk_max_entries,
+            "disk_pruned": self.disk_pruned,
+        }
+
+
+class CachedEmbeddingProvider(EmbeddingProvider):
+    """
+    EmbeddingProvider wrapper that caches single-text (query) embeddings.
+
+    Batch calls are document indexing traffic and pass straight through,
+    so they don't evict hot query vectors.
+    """
+
+    def __init__(self, provider: EmbeddingProvider, cache: EmbeddingCache):
+        self.provider = provider
+        self.cache = cache
+        self.max_batch_size = provider.max_batch_size
+        self._provider_name = type(provider).__name__
+        self._model = getattr(provider, "model", "")
+
+    @property
+    def dimension(self) -> int:
+        return self.provider.dimension
+
+    async def embed_text(self, text: str) -> List[float]:
+        key = self.cache.make_key(self._provider_name, self._model, text)
+
+        embedding = await self.cache.get(key)
+        if embedding is None:
+            embedding = await self.provider.embed_text(text)
+            await self.cache.put(key, embedding)
+
+        return embedding
+
+    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        return await self.provider.embed_batch(texts)
+
+
+# Singleton instance
+_embedding_cache: EmbeddingCache | None = None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Get or create the process-wide embedding cache."""
+    global _embedding_cache
+    if _embedding_cache is None:
+        _embedding_cache = EmbeddingCache(
+            max_bytes=settings.embedding_cache_max_bytes,
+            disk_path=settings.embedding_cache_path,
+            disk_max_entries=settings.embedding_cache_disk_max_entries,
+        )
+    return _embedding_cache
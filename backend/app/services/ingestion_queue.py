@@ -0,0 +1,310 @@
+"""
+Durable document ingestion queue backed by SQLite.
+Jobs survive restarts and can be consumed by the API process or by a
+separate worker (see ingest_worker.py).
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional
+import asyncio
+import os
+import random
+import sqlite3
+import time
+import uuid
+
+from app.core.config import settings
+
+
+@dataclass
+class IngestionJob:
+    """A queued document ingestion job."""
+    id: str
+    document_id: str
+    spool_path: str
+    file_name: str
+    file_type: str
+    file_size: int
+    collection_name: str
+    status: str  # queued, running, done, failed
+    attempts: int
+    next_attempt_at: float
+    enqueued_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    last_error: Optional[str] = None
+
+    @property
+    def queued_seconds(self) -> Optional[float]:
+        """Time from enqueue to the latest start."""
+        if self.started_at is None:
+            return None
+        return self.started_at - self.enqueued_at
+
+    @property
+    def processing_seconds(self) -> Optional[float]:
+        """Duration of the latest attempt."""
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ingestion_jobs (
+    id TEXT PRIMARY KEY,
+    document_id TEXT NOT NULL,
+    spool_path TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    file_type TEXT NOT NULL,
+    file_size INTEGER NOT NULL,
+    collection_name TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    enqueued_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_ingestion_jobs_claim
+    ON ingestion_jobs(status, next_attempt_at, file_size);
+CREATE INDEX IF NOT EXISTS idx_ingestion_jobs_document_id
+    ON ingestion_jobs(document_id);
+"""
+
+_COLUMNS = (
+    "id, document_id, spool_path, file_name, file_type, file_size, collection_name, "
+    "status, attempts, next_attempt_at, enqueued_at, started_at, finished_at, last_error"
+)
+
+
+class IngestionQueue:
+    """
+    SQLite-backed job queue.
+
+    Smaller files are claimed first so a burst of large uploads doesn't
+    starve quick ones. Claims use an IMMEDIATE transaction, so several
+    worker processes can share one database file.
+    All public methods are async and run SQLite calls in a thread.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30.0, isolation_level=None)
+
+    # ============== Sync implementations ==============
+
+    def _enqueue(self, job: IngestionJob) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT INTO ingestion_jobs ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job.id, job.document_id, job.spool_path, job.file_name, job.file_type,
+                    job.file_size, job.collection_name, job.status, job.attempts,
+                    job.next_attempt_at, job.enqueued_at, job.started_at, job.finished_at,
+                    job.last_error,
+                ),
+            )
+
+    def _claim(self) -> Optional[IngestionJob]:
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                f"SELECT {_COLUMNS} FROM ingestion_jobs "
+                "WHERE status = 'queued' AND next_attempt_at <= ? "
+                "ORDER BY file_size, enqueued_at LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+
+            conn.execute(
+                "UPDATE ingestion_jobs SET status = 'running', attempts = attempts + 1, "
+                "started_at = ?, finished_at = NULL WHERE id = ?",
+                (now, row[0]),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        job = IngestionJob(*row)
+        job.status = "running"
+        job.attempts += 1
+        job.started_at = now
+        job.finished_at = None
+        return job
+
+    def _finish(self, job_id: str, status: str, error: Optional[str], retry_at: Optional[float]) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE ingestion_jobs SET status = ?, last_error = ?, finished_at = ?, "
+                "next_attempt_at = COALESCE(?, next_attempt_at) WHERE id = ?",
+                (status, error, time.time(), retry_at, job_id),
+            )
+
+    def _release(self, job_id: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE ingestion_jobs SET status = 'queued', attempts = MAX(attempts - 1, 0), "
+                "next_attempt_at = ? WHERE id = ? AND status = 'running'",
+                (time.time(), job_id),
+            )
+
+    def _requeue_stale(self, older_than: float) -> int:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE ingestion_jobs SET status = 'queued', next_attempt_at = ? "
+                "WHERE status = 'running' AND started_at < ?",
+                (time.time(), older_than),
+            )
+            return cursor.rowcount
+
+    def _get_for_document(self, document_id: str) -> Optional[IngestionJob]:
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT {_COLUMNS} FROM ingestion_jobs WHERE document_id = ? "
+                "ORDER BY enqueued_at DESC LIMIT 1",
+                (document_id,),
+            ).fetchone()
+        return IngestionJob(*row) if row else None
+
+    def _cancel_queued(self, column: str, value: str) -> List[str]:
+        """Cancel queued jobs where column = value, returning their spool paths."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                f"SELECT spool_path FROM ingestion_jobs WHERE {column} = ? AND status = 'queued'",
+                (value,),
+            ).fetchall()
+            conn.execute(
+                "UPDATE ingestion_jobs SET status = 'cancelled', finished_at = ? "
+                f"WHERE {column} = ? AND status = 'queued'",
+                (time.time(), value),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return [row[0] for row in rows]
+
+    def _counts(self) -> dict:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT status, COUNT(*) FROM ingestion_jobs GROUP BY status"
+            ).fetchall()
+        return dict(rows)
+
+    # ============== Async API ==============
+
+    async def enqueue(
+        self,
+        document_id: str,
+        spool_path: str,
+        file_name: str,
+        file_type: str,
+        file_size: int,
+        collection_name: str,
+    ) -> IngestionJob:
+        """Add a job for a spooled upload."""
+        now = time.time()
+        job = IngestionJob(
+            id=str(uuid.uuid4()),
+            document_id=document_id,
+            spool_path=spool_path,
+            file_name=file_name,
+            file_type=file_type,
+            file_size=file_size,
+            collection_name=collection_name,
+            status="queued",
+            attempts=0,
+            next_attempt_at=now,
+            enqueued_at=now,
+        )
+        await asyncio.to_thread(self._enqueue, job)
+        return job
+
+    async def claim(self) -> Optional[IngestionJob]:
+        """Atomically take the next runnable job (smallest file first)."""
+        return await asyncio.to_thread(self._claim)
+
+    async def complete(self, job: IngestionJob) -> None:
+        """Mark a job as done."""
+        await asyncio.to_thread(self._finish, job.id, "done", None, None)
+
+    async def fail(self, job: IngestionJob, error: str) -> bool:
+        """
+        Record a failed attempt.
+
+        Returns True if the job was rescheduled with jittered exponential
+        backoff, False if it ran out of attempts and is now failed.
+        """
+        if job.attempts < settings.ingestion_max_attempts:
+            delay = settings.ingestion_retry_backoff * (2 ** (job.attempts - 1))
+            retry_at = time.time() + delay * random.uniform(0.5, 1.5)
+            await asyncio.to_thread(self._finish, job.id, "queued", error, retry_at)
+            return True
+
+        await asyncio.to_thread(self._finish, job.id, "failed", error, None)
+        return False
+
+    async def release(self, job: IngestionJob) -> None:
+        """Return an interrupted job to the queue without counting the attempt."""
+        await asyncio.to_thread(self._release, job.id)
+
+    async def requeue_stale(self) -> int:
+        """Return jobs left 'running' by a crashed worker to the queue."""
+        older_than = time.time() - settings.ingestion_job_timeout * 2
+        return await asyncio.to_thread(self._requeue_stale, older_than)
+
+    async def get_for_document(self, document_id: str) -> Optional[IngestionJob]:
+        """Latest job for a document, if any."""
+        return await asyncio.to_thread(self._get_for_document, document_id)
+
+    async def cancel_for_collection(self, collection_name: str) -> List[str]:
+        """
+        Cancel queued jobs targeting a collection (e.g. of a deleted meeting).
+
+        Returns the spool paths of the cancelled jobs; jobs already running
+        are left to finish.
+        """
+        return await asyncio.to_thread(self._cancel_queued, "collection_name", collection_name)
+
+    async def cancel_for_document(self, document_id: str) -> List[str]:
+        """
+        Cancel queued jobs for a document (e.g. one being deleted).
+
+        Returns the spool paths of the cancelled jobs; a job already running
+        finds the document gone when it finishes and drops its vectors.
+        """
+        return await asyncio.to_thread(self._cancel_queued, "document_id", document_id)
+
+    async def counts(self) -> dict:
+        """Number of jobs per status."""
+        return await asyncio.to_thread(self._counts)
+
+
+# Singleton instance
+_ingestion_queue: IngestionQueue | None = None
+
+
+def get_ingestion_queue() -> IngestionQueue:
+    """Get or create the ingestion queue."""
+    global _ingestion_queue
+    if _ingestion_queue is None:
+        _ingestion_queue = IngestionQueue(settings.ingestion_db_path)
+    return _ingestion_queue
@@ -0,0 +1,181 @@
+"""
+Ingestion worker - consumes the durable ingestion queue.
+Runs inside the API process (ingestion_inline_worker) or standalone via
+ingest_worker.py.
+"""
+
+from typing import Dict
+import asyncio
+import os
+
+from app.core.config import settings
+from app.core.database import get_supabase, run_query
+from app.services.ingestion_queue import IngestionJob, IngestionQueue, get_ingestion_queue
+from app.services.parsing_pool import get_parsing_pool
+from app.services.vector_store import get_vector_store
+
+
+async def index_document_job(job: IngestionJob) -> int:
+    """
+    Parse, chunk, embed and index a spooled upload.
+
+    Raises on failure so the queue can retry; the caller decides when the
+    document is marked failed.
+
+    Returns:
+        Number of chunks indexed
+    """
+    db = get_supabase()
+    vector_store = get_vector_store()
+    parsing_pool = get_parsing_pool()
+
+    async def report_progress(indexed: int):
+        await run_query(db.table("documents").update({
+            "chunk_count": indexed,
+        }).eq("id", job.document_id))
+
+    # Parse and chunk in the process pool; embed and upsert as a streaming pipeline
+    chunks = parsing_pool.iter_chunks(
+        path=job.spool_path,
+        file_name=job.file_name,
+        file_type=job.file_type,
+        additional_metadata={"document_id": job.document_id},
+    )
+
+    chunk_count = await vector_store.index_chunks(
+        collection_name=job.collection_name,
+        document_id=job.document_id,
+        chunks=chunks,
+        on_progress=report_progress,
+    )
+
+    if not chunk_count:
+        raise ValueError("No text content extracted from document")
+
+    result = await run_query(db.table("documents").update({
+        "status": "indexed",
+        "chunk_count": chunk_count,
+        "error_message": None,
+    }).eq("id", job.document_id))
+
+    if not result.data:
+        # Deleted while it was being indexed: don't leave orphaned points
+        await vector_store.delete_document(collection_name=job.collection_name, document_id=job.document_id)
+
+    return chunk_count
+
+
+class IngestionWorker:
+    """
+    Polls the queue and processes up to `concurrency` jobs at once.
+
+    Failed jobs are retried with backoff by the queue; once attempts are
+    exhausted the document is marked failed. Spool files are removed when
+    a job reaches a final state.
+    """
+
+    def __init__(
+        self,
+        queue: IngestionQueue,
+        concurrency: int,
+        job_timeout: float,
+        poll_interval: float,
+    ):
+        self.queue = queue
+        self.job_timeout = job_timeout
+        self.poll_interval = poll_interval
+        self._slots = asyncio.Semaphore(concurrency)
+        self._running: Dict[asyncio.Task, IngestionJob] = {}
+        self._stopping = asyncio.Event()
+
+    async def run(self) -> None:
+        """Process jobs until stop() is called."""
+        requeued = await self.queue.requeue_stale()
+        if requeued:
+            print(f"Ingestion worker: requeued {requeued} stale job(s)")
+
+        while not self._stopping.is_set():
+            await self._slots.acquire()
+            if self._stopping.is_set():
+                self._slots.release()
+                break
+
+            try:
+                job = await self.queue.claim()
+            except Exception as e:
+                print(f"Ingestion worker: failed to claim job: {e}")
+                job = None
+
+            if job is None:
+                self._slots.release()
+                await self._sleep()
+                continue
+
+            task = asyncio.create_task(self._process(job))
+            self._running[task] = job
+            task.add_done_callback(lambda t: self._running.pop(t, None))
+
+    async def _sleep(self) -> None:
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _process(self, job: IngestionJob) -> None:
+        try:
+            chunk_count = await asyncio.wait_for(index_document_job(job), timeout=self.job_timeout)
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            if isinstance(e, asyncio.TimeoutError):
+                error = f"Ingestion timed out after {self.job_timeout:.0f}s"
+            await self._handle_failure(job, error)
+        else:
+            await self.queue.complete(job)
+            self._remove_spool(job)
+            print(
+                f"Ingestion job {job.id} done: {chunk_count} chunks, "
+                f"queued {job.queued_seconds:.1f}s, attempt {job.attempts}"
+            )
+        finally:
+            self._slots.release()
+
+    async def _handle_failure(self, job: IngestionJob, error: str) -> None:
+        will_retry = await self.queue.fail(job, error)
+        if will_retry:
+            print(f"Ingestion job {job.id} attempt {job.attempts} failed, will retry: {error}")
+            return
+
+        print(f"Ingestion job {job.id} failed: {error}")
+        self._remove_spool(job)
+        db = get_supabase()
+        await run_query(db.table("documents").update({
+            "status": "failed",
+            "error_message": error,
+        }).eq("id", job.document_id))
+
+    @staticmethod
+    def _remove_spool(job: IngestionJob) -> None:
+        try:
+            os.unlink(job.spool_path)
+        except FileNotFoundError:
+            pass
+
+    async def stop(self) -> None:
+        """Stop polling, cancel in-flight jobs and put them back on the queue."""
+        self._stopping.set()
+        running = dict(self._running)
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+        for job in running.values():
+            await self.queue.release(job)
+
+
+def create_ingestion_worker() -> IngestionWorker:
+    """Build a worker from settings."""
+    return IngestionWorker(
+        queue=get_ingestion_queue(),
+        concurrency=settings.ingestion_concurrency,
+        job_timeout=settings.ingestion_job_timeout,
+        poll_interval=settings.ingestion_poll_interval,
+    )
@@ -0,0 +1,123 @@
+"""
+Meeting context cache - keeps participants and message history in process.
+Avoids reloading and re-validating the full meeting on every turn.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import List, Optional
+import time
+
+from app.core.config import settings
+from app.models import (
+    Meeting,
+    MeetingWithParticipants,
+    AIParticipant,
+    Message,
+)
+
+
+@dataclass
+class MeetingContext:
+    """Cached state for a single meeting."""
+    meeting: Meeting
+    participants: List[AIParticipant]
+    messages: List[Message] = field(default_factory=list)
+    message_ids: set = field(default_factory=set)
+    refreshed_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def last_created_at(self):
+        """Timestamp of the newest cached message, if any."""
+        return self.messages[-1].created_at if self.messages else None
+
+    def add_messages(self, messages: List[Message]) -> None:
+        """Append messages not already in the log, keeping created_at order."""
+        new = [m for m in messages if m.id not in self.message_ids]
+        if not new:
+            return
+
+        needs_sort = bool(self.messages) and new[0].created_at < self.messages[-1].created_at
+        self.messages.extend(new)
+        self.message_ids.update(m.id for m in new)
+        if needs_sort:
+            self.messages.sort(key=lambda m: m.created_at)
+
+    def to_meeting(self) -> MeetingWithParticipants:
+        """Build a meeting snapshot (lists are copied, models are shared)."""
+        return MeetingWithParticipants(
+            **self.meeting.model_dump(),
+            participants=list(self.participants),
+            messages=list(self.messages),
+        )
+
+
+class MeetingContextCache:
+    """
+    LRU + TTL cache of MeetingContext entries.
+
+    Entries older than the TTL are still returned so callers can refresh
+    them incrementally (only messages newer than the last one seen). The
+    TTL governs the meeting row and participants; callers check for new
+    messages on every read.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, MeetingContext]" = OrderedDict()
+
+    def get(self, meeting_id: str) -> Optional[MeetingContext]:
+        """Return the cached context and mark it as recently used."""
+        context = self._entries.get(meeting_id)
+        if context is not None:
+            self._entries.move_to_end(meeting_id)
+        return context
+
+    def is_fresh(self, context: MeetingContext) -> bool:
+        """Whether the context is within its TTL."""
+        return time.monotonic() - context.refreshed_at < self.ttl_seconds
+
+    def put(self, meeting_id: str, context: MeetingContext) -> None:
+        """Insert or replace a context, evicting least recently used entries."""
+        self._entries[meeting_id] = context
+        self._entries.move_to_end(meeting_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def append_message(self, meeting_id: str, message: Message) -> None:
+        """Append a newly saved message to a cached meeting."""
+        context = self._entries.get(meeting_id)
+        if context is not None:
+            context.add_messages([message])
+
+    def add_participant(self, meeting_id: str, participant: AIParticipant) -> None:
+        """Add a newly created participant to a cached meeting."""
+        context = self._entries.get(meeting_id)
+        if context is not None and all(p.id != participant.id for p in context.participants):
+            context.participants.append(participant)
+
+    def update_meeting(self, meeting_id: str, **fields) -> None:
+        """Apply field updates to a cached meeting row."""
+        context = self._entries.get(meeting_id)
+        if context is not None:
+            context.meeting = context.meeting.model_copy(update=fields)
+
+    def invalidate(self, meeting_id: str) -> None:
+        """Drop a meeting from the cache."""
+        self._entries.pop(meeting_id, None)
+
+
+# Singleton instance
+_meeting_cache: MeetingContextCache | None = None
+
+
+def get_meeting_cache() -> MeetingContextCache:
+    """Get or create the process-wide meeting context cache."""
+    global _meeting_cache
+    if _meeting_cache is None:
+        _meeting_cache = MeetingContextCache(
+            max_entries=settings.meeting_cache_max_entries,
+            ttl_seconds=settings.meeting_cache_ttl_seconds,
+        )
+    return _meeting_cache
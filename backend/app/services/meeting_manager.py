@@ -4,9 +4,10 @@ Meeting manager service - handles meeting lifecycle and persistence.
 
 from typing import Optional, List
 from datetime import datetime
+import time
 import uuid
 
-from app.core.database import get_supabase
+from app.core.database import get_supabase, run_query
 from app.models import (
     Meeting,
     MeetingCreate,
@@ -16,12 +17,16 @@ from app.models import (
     Message,
     MessageCreate,
     Disagreement,
-    DisagreementCreate,
     Consensus,
-    ConsensusCreate,
     SenderType,
+    RollingSummary,
 )
 from app.services.prompts import DEFAULT_ROSTER, get_full_prompt
+from app.services.collection_gc import schedule_meeting_cleanup
+from app.services.meeting_cache import MeetingContext, get_meeting_cache
+from app.services.meeting_summarizer import get_meeting_summarizer
+from app.services.tokens import count_tokens, meeting_encoding
+from app.services.unit_of_work import TurnUnitOfWork
 
 
 class MeetingManager:
@@ -29,6 +34,8 @@ class MeetingManager:
     
     def __init__(self):
         self.db = get_supabase()
+        self.cache = get_meeting_cache()
+        self.summarizer = get_meeting_summarizer()
     
     async def create_meeting(
         self,
@@ -51,56 +58,52 @@ class MeetingManager:
             "created_at": now,
         }
         
-        result = self.db.table("meetings").insert(meeting_data).execute()
+        result = await run_query(self.db.table("meetings").insert(meeting_data))
         
-        # Add AI participants
-        participants = []
+        # Build all AI participants, then insert them in one multi-row insert
+        participant_creates = []
         
         # If persona_ids provided, fetch those personas from DB
         if data.persona_ids and len(data.persona_ids) > 0:
-            # Fetch personas from database
-            personas_result = self.db.table("personas") \
-                .select("*") \
-                .in_("id", data.persona_ids) \
-                .execute()
+            # Personas with their active prompt embedded (one request)
+            personas_result = await run_query(
+                self.db.table("personas")
+                .select("*, prompt_versions(content)")
+                .in_("id", data.persona_ids)
+                .eq("prompt_versions.is_active", True)
+            )
             
-            for persona_data in personas_result.data:
-                # Fetch active prompt for this persona
-                active_prompt = ""
-                prompts_result = self.db.table("prompt_versions") \
-                    .select("content") \
-                    .eq("persona_id", persona_data["id"]) \
-                    .eq("is_active", True) \
-                    .limit(1) \
-                    .execute()
-                
-                if prompts_result.data:
-                    active_prompt = prompts_result.data[0].get("content", "")
+            # Keep the requested roster order
+            order = {persona_id: i for i, persona_id in enumerate(data.persona_ids)}
+            persona_rows = sorted(personas_result.data, key=lambda p: order.get(p["id"], len(order)))
+            
+            for persona_data in persona_rows:
+                prompts = persona_data.get("prompt_versions") or []
+                active_prompt = prompts[0].get("content", "") if prompts else ""
                 
-                participant = await self.add_participant(
-                    AIParticipantCreate(
-                        meeting_id=meeting_id,
-                        name=persona_data["name"],
-                        role=persona_data.get("subtitle") or "AI Assistant",
-                        system_prompt=get_full_prompt(active_prompt),
-                        color=persona_data["color"],
-                        persona_id=persona_data["id"],
-                    )
-                )
-                participants.append(participant)
+                participant_creates.append(AIParticipantCreate(
+                    meeting_id=meeting_id,
+                    name=persona_data["name"],
+                    role=persona_data.get("subtitle") or "AI Assistant",
+                    system_prompt=get_full_prompt(active_prompt),
+                    color=persona_data["color"],
+                    persona_id=persona_data["id"],
+                ))
         elif add_default_roster:
             # Use default roster if no persona_ids provided
             for persona in DEFAULT_ROSTER:
-                participant = await self.add_participant(
-                    AIParticipantCreate(
-                        meeting_id=meeting_id,
-                        name=persona["name"],
-                        role=persona["role"],
-                        system_prompt=get_full_prompt(persona["system_prompt"]),
-                        color=persona["color"],
-                    )
-                )
-                participants.append(participant)
+                participant_creates.append(AIParticipantCreate(
+                    meeting_id=meeting_id,
+                    name=persona["name"],
+                    role=persona["role"],
+                    system_prompt=get_full_prompt(persona["system_prompt"]),
+                    color=persona["color"],
+                ))
+        
+        participants = await self._insert_participants(participant_creates)
+        
+        meeting = Meeting(**result.data[0])
+        self.cache.put(meeting_id, MeetingContext(meeting=meeting, participants=list(participants)))
         
         return MeetingWithParticipants(
             **result.data[0],
@@ -109,41 +112,120 @@ class MeetingManager:
         )
     
     async def get_meeting(self, meeting_id: str) -> Optional[MeetingWithParticipants]:
-        """Get a meeting with all its participants and messages."""
+        """
+        Get a meeting with all its participants and messages.
+        
+        Served from the in-process context cache. Messages newer than the
+        last cached one are always fetched (other workers may have saved
+        some); the meeting row and participants are only reloaded once the
+        entry is past its TTL. Only a cold miss loads the full history.
+        """
+        
+        context = self.cache.get(meeting_id)
+        if context is None:
+            context = await self._load_meeting_context(meeting_id)
+            if context is None:
+                return None
+            self.cache.put(meeting_id, context)
+        elif not self.cache.is_fresh(context):
+            if not await self._refresh_meeting_context(context):
+                self.cache.invalidate(meeting_id)
+                return None
+        else:
+            context.add_messages(await self._fetch_messages(meeting_id, since=context.last_created_at))
+        
+        return context.to_meeting()
+    
+    async def get_meeting_overview(self, meeting_id: str) -> Optional[MeetingWithParticipants]:
+        """
+        Get a meeting with its participants but without messages.
+        
+        Uses the cached context when there is one; otherwise fetches only
+        the meeting row and participants, never the transcript.
+        """
+        
+        context = self.cache.get(meeting_id)
+        if context is not None and self.cache.is_fresh(context):
+            return MeetingWithParticipants(
+                **context.meeting.model_dump(),
+                participants=list(context.participants),
+            )
+        
+        meeting = await self._fetch_meeting_row(meeting_id)
+        if meeting is None:
+            return None
         
-        # Fetch meeting
-        meeting_result = self.db.table("meetings") \
-            .select("*") \
-            .eq("id", meeting_id) \
-            .execute()
+        return MeetingWithParticipants(
+            **meeting.model_dump(),
+            participants=await self._fetch_participants(meeting_id),
+        )
+    
+    async def _fetch_meeting_row(self, meeting_id: str) -> Optional[Meeting]:
+        """Fetch the meeting row itself."""
+        
+        meeting_result = await run_query(
+            self.db.table("meetings")
+            .select("*")
+            .eq("id", meeting_id)
+        )
         
         if not meeting_result.data:
             return None
         
-        meeting_data = meeting_result.data[0]
+        return Meeting(**meeting_result.data[0])
+    
+    async def _fetch_participants(self, meeting_id: str) -> List[AIParticipant]:
+        """Fetch all AI participants of a meeting."""
         
-        # Fetch participants
-        participants_result = self.db.table("ai_participants") \
-            .select("*") \
-            .eq("meeting_id", meeting_id) \
-            .execute()
+        participants_result = await run_query(
+            self.db.table("ai_participants")
+            .select("*")
+            .eq("meeting_id", meeting_id)
+        )
         
-        participants = [AIParticipant(**p) for p in participants_result.data]
+        return [AIParticipant(**p) for p in participants_result.data]
+    
+    async def _fetch_messages(self, meeting_id: str, since: Optional[datetime] = None) -> List[Message]:
+        """Fetch messages in created_at order, optionally only those at or after `since`."""
         
-        # Fetch messages
-        messages_result = self.db.table("messages") \
+        query = self.db.table("messages") \
             .select("*") \
-            .eq("meeting_id", meeting_id) \
-            .order("created_at") \
-            .execute()
+            .eq("meeting_id", meeting_id)
         
-        messages = [Message(**m) for m in messages_result.data]
+        if since is not None:
+            query = query.gte("created_at", since.isoformat())
         
-        return MeetingWithParticipants(
-            **meeting_data,
-            participants=participants,
-            messages=messages
+        messages_result = await run_query(query.order("created_at"))
+        
+        return [Message(**m) for m in messages_result.data]
+    
+    async def _load_meeting_context(self, meeting_id: str) -> Optional[MeetingContext]:
+        """Load a meeting's full context from the database."""
+        
+        meeting = await self._fetch_meeting_row(meeting_id)
+        if meeting is None:
+            return None
+        
+        context = MeetingContext(
+            meeting=meeting,
+            participants=await self._fetch_participants(meeting_id),
         )
+        context.add_messages(await self._fetch_messages(meeting_id))
+        return context
+    
+    async def _refresh_meeting_context(self, context: MeetingContext) -> bool:
+        """Revalidate a stale context, fetching only messages newer than the last seen one."""
+        
+        meeting_id = context.meeting.id
+        meeting = await self._fetch_meeting_row(meeting_id)
+        if meeting is None:
+            return False
+        
+        context.meeting = meeting
+        context.participants = await self._fetch_participants(meeting_id)
+        context.add_messages(await self._fetch_messages(meeting_id, since=context.last_created_at))
+        context.refreshed_at = time.monotonic()
+        return True
     
     async def list_meetings(self, user_id: Optional[str] = None) -> List[Meeting]:
         """List all meetings, optionally filtered by user."""
@@ -153,18 +235,15 @@ class MeetingManager:
         if user_id:
             query = query.eq("user_id", user_id)
         
-        result = query.order("created_at", desc=True).execute()
+        result = await run_query(query.order("created_at", desc=True))
         
         return [Meeting(**m) for m in result.data]
     
-    async def add_participant(self, data: AIParticipantCreate) -> AIParticipant:
-        """Add an AI participant to a meeting."""
-        
-        participant_id = str(uuid.uuid4())
-        now = datetime.utcnow().isoformat()
-        
-        participant_data = {
-            "id": participant_id,
+    @staticmethod
+    def _participant_row(data: AIParticipantCreate) -> dict:
+        """Build an ai_participants table row for new participant data."""
+        return {
+            "id": str(uuid.uuid4()),
             "meeting_id": data.meeting_id,
             "name": data.name,
             "role": data.role,
@@ -172,21 +251,46 @@ class MeetingManager:
             "provider_config": data.provider_config.model_dump(),
             "color": data.color,
             "persona_id": data.persona_id,
-            "created_at": now,
+            "created_at": datetime.utcnow().isoformat(),
         }
+    
+    async def _insert_participants(self, data: List[AIParticipantCreate]) -> List[AIParticipant]:
+        """Insert several participants with a single multi-row insert."""
+        if not data:
+            return []
         
-        result = self.db.table("ai_participants").insert(participant_data).execute()
+        result = await run_query(
+            self.db.table("ai_participants").insert([self._participant_row(d) for d in data])
+        )
+        
+        participants = [AIParticipant(**row) for row in result.data]
+        for participant in participants:
+            self.cache.add_participant(participant.meeting_id, participant)
         
-        return AIParticipant(**result.data[0])
+        return participants
     
-    async def save_message(self, data: MessageCreate) -> Message:
-        """Save a message to the database."""
+    async def add_participant(self, data: AIParticipantCreate) -> AIParticipant:
+        """Add an AI participant to a meeting."""
         
-        message_id = str(uuid.uuid4())
-        now = datetime.utcnow().isoformat()
+        result = await run_query(self.db.table("ai_participants").insert(self._participant_row(data)))
         
-        message_data = {
-            "id": message_id,
+        participant = AIParticipant(**result.data[0])
+        self.cache.add_participant(data.meeting_id, participant)
+        
+        return participant
+    
+    def _message_row(self, data: MessageCreate) -> dict:
+        """
+        Build a messages table row for new message data.
+        
+        The token count uses the meeting's tokenizer when its participants
+        are cached; a database trigger adds it to the meeting's totals.
+        """
+        context = self.cache.get(data.meeting_id)
+        encoding = meeting_encoding(context.participants if context else [])
+        
+        return {
+            "id": str(uuid.uuid4()),
             "meeting_id": data.meeting_id,
             "sender_type": data.sender_type.value,
             "sender_id": data.sender_id,
@@ -196,124 +300,128 @@ class MeetingManager:
             "tool_artifacts": data.tool_artifacts,
             "thinking_content": data.thinking_content,
             "estimated_cost": data.estimated_cost,
-            "created_at": now,
+            "token_count": count_tokens(data.content, encoding) + count_tokens(data.thinking_content, encoding),
+            "created_at": datetime.utcnow().isoformat(),
         }
+    
+    def _on_message_saved(self, message: Message) -> None:
+        """Keep the cached context in step without a reload."""
+        self.cache.append_message(message.meeting_id, message)
+        context = self.cache.get(message.meeting_id)
+        if context is not None:
+            self.cache.update_meeting(
+                message.meeting_id,
+                total_cost=context.meeting.total_cost + message.estimated_cost,
+                message_tokens=context.meeting.message_tokens + message.token_count,
+                message_count=context.meeting.message_count + 1,
+            )
+        
+        # Extend the rolling summary in the background every few messages
+        self.summarizer.notify(self, message.meeting_id)
+    
+    async def save_message(self, data: MessageCreate) -> Message:
+        """Save a message to the database."""
         
-        result = self.db.table("messages").insert(message_data).execute()
+        result = await run_query(self.db.table("messages").insert(self._message_row(data)))
         
         # Update meeting total cost
         if data.estimated_cost > 0:
-            self.db.rpc(
+            await run_query(self.db.rpc(
                 "increment_meeting_cost",
                 {"meeting_id": data.meeting_id, "cost_delta": data.estimated_cost}
-            ).execute()
+            ))
+        
+        message = Message(**result.data[0])
+        self._on_message_saved(message)
         
-        return Message(**result.data[0])
+        return message
     
-    async def save_disagreement(self, data: DisagreementCreate) -> Disagreement:
-        """Save a disagreement to the database."""
+    async def commit_turn(self, uow: TurnUnitOfWork, data: MessageCreate) -> Message:
+        """
+        Write an AI turn in one round-trip.
         
-        disagreement_id = str(uuid.uuid4())
-        now = datetime.utcnow().isoformat()
+        The message, the disagreements and consensus buffered in the unit
+        of work, and the meeting cost increment are written atomically by
+        the record_ai_turn database function.
+        """
         
-        disagreement_data = {
-            "id": disagreement_id,
-            "meeting_id": data.meeting_id,
-            "source_ai_id": data.source_ai_id,
-            "target_name": data.target_name,
-            "topic": data.topic,
-            "reasoning": data.reasoning,
-            "severity": data.severity,
-            "status": "open",
-            "created_at": now,
-        }
+        result = await run_query(self.db.rpc("record_ai_turn", {
+            "p_message": self._message_row(data),
+            "p_disagreements": uow.disagreement_rows(),
+            "p_consensus": uow.consensus_rows(),
+        }))
         
-        result = self.db.table("disagreements").insert(disagreement_data).execute()
+        message = Message(**result.data[0])
+        self._on_message_saved(message)
         
-        return Disagreement(**result.data[0])
+        return message
     
-    async def save_consensus(self, data: ConsensusCreate) -> Consensus:
-        """Save a consensus to the database."""
-        
-        consensus_id = str(uuid.uuid4())
-        now = datetime.utcnow().isoformat()
+    async def update_rolling_summary(self, meeting_id: str, summary: RollingSummary) -> None:
+        """Persist a meeting's rolling summary."""
         
-        consensus_data = {
-            "id": consensus_id,
-            "meeting_id": data.meeting_id,
-            "participants": data.participants,
-            "topic": data.topic,
-            "strength": data.strength,
-            "created_at": now,
-        }
-        
-        result = self.db.table("consensus").insert(consensus_data).execute()
-        
-        return Consensus(**result.data[0])
+        await run_query(
+            self.db.table("meetings")
+            .update({"rolling_summary": summary.model_dump()})
+            .eq("id", meeting_id)
+        )
+        self.cache.update_meeting(meeting_id, rolling_summary=summary)
     
     async def get_disagreements(self, meeting_id: str) -> List[Disagreement]:
         """Get all disagreements for a meeting."""
         
-        result = self.db.table("disagreements") \
-            .select("*") \
-            .eq("meeting_id", meeting_id) \
-            .order("created_at") \
-            .execute()
+        result = await run_query(
+            self.db.table("disagreements")
+            .select("*")
+            .eq("meeting_id", meeting_id)
+            .order("created_at")
+        )
         
         return [Disagreement(**d) for d in result.data]
     
     async def get_consensus_list(self, meeting_id: str) -> List[Consensus]:
         """Get all consensus entries for a meeting."""
         
-        result = self.db.table("consensus") \
-            .select("*") \
-            .eq("meeting_id", meeting_id) \
-            .order("created_at") \
-            .execute()
+        result = await run_query(
+            self.db.table("consensus")
+            .select("*")
+            .eq("meeting_id", meeting_id)
+            .order("created_at")
+        )
         
         return [Consensus(**c) for c in result.data]
 
     async def update_meeting_status(self, meeting_id: str, status: str) -> bool:
         """Update a meeting's status."""
         
-        result = self.db.table("meetings") \
-            .update({"status": status}) \
-            .eq("id", meeting_id) \
-            .execute()
+        result = await run_query(
+            self.db.table("meetings")
+            .update({"status": status})
+            .eq("id", meeting_id)
+        )
+        
+        if result.data:
+            self.cache.update_meeting(meeting_id, status=status)
         
         return len(result.data) > 0
 
     async def delete_meeting(self, meeting_id: str) -> bool:
-        """Delete a meeting and all its related data."""
-        
-        # Delete messages first (foreign key constraint)
-        self.db.table("messages") \
-            .delete() \
-            .eq("meeting_id", meeting_id) \
-            .execute()
-        
-        # Delete disagreements
-        self.db.table("disagreements") \
-            .delete() \
-            .eq("meeting_id", meeting_id) \
-            .execute()
-        
-        # Delete consensus
-        self.db.table("consensus") \
-            .delete() \
-            .eq("meeting_id", meeting_id) \
-            .execute()
-        
-        # Delete participants
-        self.db.table("ai_participants") \
-            .delete() \
-            .eq("meeting_id", meeting_id) \
-            .execute()
-        
-        # Finally delete the meeting
-        result = self.db.table("meetings") \
-            .delete() \
-            .eq("id", meeting_id) \
-            .execute()
+        """
+        Delete a meeting and all its related data.
+        
+        Participants, messages, disagreements, consensus and documents are
+        removed by ON DELETE CASCADE in the same statement. The meeting's
+        vector collection and queued uploads are cleaned up in the background.
+        """
+        
+        self.cache.invalidate(meeting_id)
+        
+        result = await run_query(
+            self.db.table("meetings")
+            .delete()
+            .eq("id", meeting_id)
+        )
+        
+        if result.data:
+            schedule_meeting_cleanup(meeting_id)
         
         return len(result.data) > 0
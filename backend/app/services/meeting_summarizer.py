@@ -0,0 +1,196 @@
+"""
+Rolling meeting summarizer.
+Keeps a hierarchical running summary per meeting, updated in the background
+every few messages, so the executive summary and context compaction never
+need to re-read the whole transcript.
+"""
+
+from typing import Dict, List
+import asyncio
+
+from app.core.config import settings
+from app.llm import get_provider, request_owner, LLMMessage, LLMProvider
+from app.models import Message, MeetingWithParticipants, RollingSummary, SummarySection
+
+SECTION_PROMPT = """You are maintaining running notes for a meeting.
+
+MEETING AGENDA:
+{agenda}
+
+NOTES SO FAR (for context only, do not repeat them):
+{previous}
+
+NEW TRANSCRIPT:
+{transcript}
+
+Summarize only the new transcript in under {max_words} words. Keep who argued what,
+key facts and numbers, decisions, and open disagreements. Output only the summary."""
+
+OVERVIEW_PROMPT = """Merge these consecutive meeting notes into one overview of under {max_words} words.
+Keep who argued what, key facts and numbers, decisions, and open disagreements.
+Output only the overview.
+
+{notes}"""
+
+
+def format_transcript(messages: List[Message]) -> str:
+    """Render messages as a plain 'Speaker: text' transcript."""
+    return "\n\n".join(f"{m.sender_name}: {m.content}" for m in messages)
+
+
+def get_summary_provider(meeting: MeetingWithParticipants) -> LLMProvider:
+    """Provider used for meeting-level summaries (the first participant's)."""
+    if meeting.participants:
+        config = meeting.participants[0].provider_config
+        return get_provider(config.provider or None, config.model or None)
+    return get_provider()
+
+
+class MeetingSummarizer:
+    """
+    Maintains RollingSummary state for meetings.
+
+    After every `every_messages` new messages a section summary is added.
+    When there are more than `max_sections` sections, the oldest half is
+    folded into the overview. At most one update runs per meeting.
+    """
+
+    def __init__(
+        self,
+        every_messages: int,
+        max_sections: int,
+        section_max_tokens: int,
+        overview_max_tokens: int,
+    ):
+        self.every_messages = every_messages
+        self.max_sections = max_sections
+        self.section_max_tokens = section_max_tokens
+        self.overview_max_tokens = overview_max_tokens
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def notify(self, manager, meeting_id: str) -> None:
+        """
+        Schedule a background update if enough new messages have arrived.
+
+        Uses the manager's cached meeting context; uncached meetings are
+        picked up on their next notify or catch_up.
+        """
+        if meeting_id in self._tasks:
+            return
+
+        context = manager.cache.get(meeting_id)
+        if context is None:
+            return
+
+        summary = context.meeting.rolling_summary
+        covered = summary.message_count if summary else 0
+        if len(context.messages) - covered < self.every_messages:
+            return
+
+        task = asyncio.create_task(self._run(manager, meeting_id))
+        self._tasks[meeting_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(meeting_id, None))
+
+    async def _run(self, manager, meeting_id: str) -> None:
+        try:
+            meeting = await manager.get_meeting(meeting_id)
+            if meeting:
+                await self._update(manager, meeting)
+        except Exception as e:
+            print(f"Rolling summary update failed for meeting {meeting_id}: {e}")
+
+    async def catch_up(self, manager, meeting: MeetingWithParticipants) -> RollingSummary:
+        """
+        Bring a meeting's summary up to date (used when the meeting ends).
+
+        Waits for any in-flight update first. Fewer than `every_messages`
+        trailing messages may remain uncovered; callers include them verbatim.
+        """
+        task = self._tasks.get(meeting.id)
+        if task is not None:
+            await asyncio.gather(task, return_exceptions=True)
+            meeting = await manager.get_meeting(meeting.id) or meeting
+
+        try:
+            return await self._update(manager, meeting)
+        except Exception as e:
+            # Fall back to what is already summarized; the rest is included verbatim
+            print(f"Rolling summary catch-up failed for meeting {meeting.id}: {e}")
+            return meeting.rolling_summary or RollingSummary()
+
+    async def _update(self, manager, meeting: MeetingWithParticipants) -> RollingSummary:
+        request_owner.set(meeting.id)
+        summary = (meeting.rolling_summary or RollingSummary()).model_copy(deep=True)
+        messages = meeting.messages
+        if len(messages) - summary.message_count < self.every_messages:
+            return summary
+
+        provider = get_summary_provider(meeting)
+        while len(messages) - summary.message_count >= self.every_messages:
+            start = summary.message_count
+            end = start + self.every_messages
+            text = await self._summarize_section(provider, meeting.agenda, summary, messages[start:end])
+            summary.sections.append(SummarySection(start=start, end=end, text=text))
+
+            if len(summary.sections) > self.max_sections:
+                await self._fold_sections(provider, summary)
+
+        await manager.update_rolling_summary(meeting.id, summary)
+        return summary
+
+    async def _summarize_section(
+        self,
+        provider: LLMProvider,
+        agenda: str,
+        summary: RollingSummary,
+        messages: List[Message],
+    ) -> str:
+        prompt = SECTION_PROMPT.format(
+            agenda=agenda or "(none)",
+            previous=summary.render() or "(none)",
+            transcript=format_transcript(messages),
+            max_words=int(self.section_max_tokens * 0.75),
+        )
+        response = await provider.complete(
+            messages=[LLMMessage(role="user", content=prompt)],
+            tools=[],
+            temperature=0.2,
+            max_tokens=self.section_max_tokens,
+        )
+        return (response.content or "").strip()
+
+    async def _fold_sections(self, provider: LLMProvider, summary: RollingSummary) -> None:
+        """Merge the overview and the oldest half of the sections into a new overview."""
+        fold = summary.sections[:len(summary.sections) // 2]
+        notes = [summary.overview] if summary.overview else []
+        notes.extend(s.text for s in fold)
+
+        response = await provider.complete(
+            messages=[LLMMessage(role="user", content=OVERVIEW_PROMPT.format(
+                notes="\n\n".join(notes),
+                max_words=int(self.overview_max_tokens * 0.75),
+            ))],
+            tools=[],
+            temperature=0.2,
+            max_tokens=self.overview_max_tokens,
+        )
+        summary.overview = (response.content or "").strip()
+        summary.overview_end = fold[-1].end
+        summary.sections = summary.sections[len(fold):]
+
+
+# Singleton instance
+_meeting_summarizer: MeetingSummarizer | None = None
+
+
+def get_meeting_summarizer() -> MeetingSummarizer:
+    """Get or create the process-wide meeting summarizer."""
+    global _meeting_summarizer
+    if _meeting_summarizer is None:
+        _meeting_summarizer = MeetingSummarizer(
+            every_messages=settings.summary_every_messages,
+            max_sections=settings.summary_max_sections,
+            section_max_tokens=settings.summary_section_max_tokens,
+            overview_max_tokens=settings.summary_overview_max_tokens,
+        )
+    return _meeting_summarizer
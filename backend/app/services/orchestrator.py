@@ -3,10 +3,26 @@ Orchestrator service - handles AI turn-taking and response generation.
 """
 
 from typing import List, Optional
-from app.llm import get_provider, LLMMessage, LLMResponse, ToolCall
+import asyncio
+import time
+
+from app.core.config import settings
+from app.core.database import get_supabase, run_query
+from app.llm import (
+    get_provider,
+    get_provider_health,
+    get_provider_registry,
+    request_owner,
+    LLMMessage,
+    LLMProvider,
+    LLMResponse,
+    ProviderRoute,
+    ToolCall,
+)
+from app.llm.router import parse_target
 from app.models import (
     AIParticipant,
-    Message,
+    MeetingWithParticipants,
     MessageCreate,
     SenderType,
     DisagreementCreate,
@@ -15,8 +31,69 @@ from app.models import (
     Consensus,
     TurnResponse,
 )
+from app.services.context_builder import get_context_builder
 from app.services.meeting_manager import MeetingManager
 from app.services.tools import get_default_tools
+from app.services.unit_of_work import TurnUnitOfWork
+
+
+def get_participant_provider(
+    participant: AIParticipant,
+    participants: List[AIParticipant],
+) -> LLMProvider:
+    """
+    LLM provider for a participant (empty config values use the global defaults).
+    
+    With OLLAMA_PIN_MEETING_MODEL, every Ollama participant of a meeting
+    uses the first Ollama participant's model, so turns never swap models
+    and the server's KV cache survives between speakers.
+    """
+    return get_provider(*_participant_target(participant, participants))
+
+
+def _participant_target(
+    participant: AIParticipant,
+    participants: List[AIParticipant],
+) -> tuple[str, Optional[str]]:
+    """(provider, model) of a participant, with the meeting's Ollama model pinned."""
+    def resolve(p: AIParticipant) -> tuple[str, Optional[str]]:
+        return p.provider_config.provider or settings.default_llm_provider, p.provider_config.model or None
+    
+    provider_name, model = resolve(participant)
+    if provider_name == "ollama" and settings.ollama_pin_meeting_model:
+        for other in participants:
+            other_provider, other_model = resolve(other)
+            if other_provider == "ollama":
+                model = other_model
+                break
+    
+    return provider_name, model
+
+
+def get_participant_route(
+    participant: AIParticipant,
+    participants: List[AIParticipant],
+) -> ProviderRoute:
+    """
+    Provider chain for a participant's turn.
+    
+    The participant's own provider comes first, followed by its
+    provider_config.fallbacks (or LLM_FALLBACK_CHAIN). Duplicates and
+    providers without credentials are skipped.
+    """
+    registry = get_provider_registry()
+    key = registry.resolve(*_participant_target(participant, participants))
+    targets = [(key, registry.get(*key))]
+    
+    for target in participant.provider_config.fallbacks or settings.llm_fallback_chain:
+        provider_name, model = parse_target(target)
+        if not registry.is_configured(provider_name):
+            continue
+        key = registry.resolve(provider_name, model)
+        if all(key != existing for existing, _ in targets):
+            targets.append((key, registry.get(*key)))
+    
+    return ProviderRoute(targets, get_provider_health())
 
 
 class Orchestrator:
@@ -24,7 +101,7 @@ class Orchestrator:
     Handles the AI turn-taking and response generation loop.
     
     Responsibilities:
-    1. Assemble context (system prompt + chat history)
+    1. Assemble context (system prompt + token-budgeted chat history)
     2. Make LLM inference call
     3. Handle tool calls (disagreements, consensus)
     4. Stream/return final response
@@ -32,67 +109,39 @@ class Orchestrator:
     
     def __init__(self, meeting_manager: MeetingManager):
         self.meeting_manager = meeting_manager
+        self.context_builder = get_context_builder()
     
     def _build_context(
         self,
         participant: AIParticipant,
-        messages: List[Message],
-        agenda: str
+        meeting: MeetingWithParticipants,
+        provider: ProviderRoute,
     ) -> List[LLMMessage]:
-        """Build the LLM message context from system prompt and chat history."""
-        
-        context = []
-        
-        # System message with persona
-        system_content = participant.system_prompt
-        if agenda:
-            system_content += f"\n\nMEETING AGENDA:\n{agenda}"
-        
-        context.append(LLMMessage(role="system", content=system_content))
-        
-        # Convert chat history to LLM messages
-        for msg in messages:
-            if msg.sender_type == SenderType.USER:
-                context.append(LLMMessage(
-                    role="user",
-                    content=f"User: {msg.content}"
-                ))
-            elif msg.sender_type == SenderType.AI:
-                # Other AI messages appear as "assistant" context
-                if msg.sender_id == participant.id:
-                    # This AI's own previous messages
-                    context.append(LLMMessage(
-                        role="assistant",
-                        content=msg.content
-                    ))
-                else:
-                    # Other AI's messages (include in user context)
-                    context.append(LLMMessage(
-                        role="user",
-                        content=f"AI [{msg.sender_name}]: {msg.content}"
-                    ))
-            elif msg.sender_type == SenderType.SYSTEM:
-                context.append(LLMMessage(
-                    role="user",
-                    content=f"System: {msg.content}"
-                ))
-        
-        return context
+        """Build the token-budgeted LLM context from system prompt and chat history."""
+        return self.context_builder.build(
+            participant=participant,
+            messages=meeting.messages,
+            agenda=meeting.agenda,
+            summary=meeting.rolling_summary,
+            shared_prefix=provider.prefers_shared_prefix,
+            context_length=provider.context_length,
+        )
     
     async def _handle_tool_call(
         self,
         tool_call: ToolCall,
         meeting_id: str,
-        participant: AIParticipant
+        participant: AIParticipant,
+        uow: TurnUnitOfWork
     ) -> tuple[str, Optional[Disagreement], Optional[Consensus]]:
-        """Execute a tool call and return the result."""
+        """Execute a tool call and return the result (writes are buffered in the unit of work)."""
         
         disagreement = None
         consensus = None
         
         if tool_call.name == "log_disagreement":
             args = tool_call.arguments
-            disagreement = await self.meeting_manager.save_disagreement(
+            disagreement = uow.add_disagreement(
                 DisagreementCreate(
                     meeting_id=meeting_id,
                     source_ai_id=participant.id,
@@ -106,7 +155,7 @@ class Orchestrator:
         
         elif tool_call.name == "log_consensus":
             args = tool_call.arguments
-            consensus = await self.meeting_manager.save_consensus(
+            consensus = uow.add_consensus(
                 ConsensusCreate(
                     meeting_id=meeting_id,
                     participants=args["participants"],
@@ -139,10 +188,11 @@ class Orchestrator:
             # Search participant's assigned knowledge stacks
             if getattr(participant, "persona_id", None):
                 db = get_supabase()
-                stacks_res = db.table("persona_knowledge_stacks") \
-                               .select("stack_id") \
-                               .eq("persona_id", participant.persona_id) \
-                               .execute()
+                stacks_res = await run_query(
+                    db.table("persona_knowledge_stacks")
+                    .select("stack_id")
+                    .eq("persona_id", participant.persona_id)
+                )
                 for row in stacks_res.data:
                     stack_col = VectorStoreManager.stack_collection_name(row["stack_id"])
                     if await vector_store.collection_exists(stack_col):
@@ -175,6 +225,66 @@ class Orchestrator:
         else:
             return f"Unknown tool: {tool_call.name}", None, None
     
+    async def _run_tool(
+        self,
+        tool_call: ToolCall,
+        meeting_id: str,
+        participant: AIParticipant,
+        uow: TurnUnitOfWork
+    ) -> tuple[str, Optional[Disagreement], Optional[Consensus]]:
+        """Execute a tool call, turning failures into a result the model can read."""
+        try:
+            return await self._handle_tool_call(tool_call, meeting_id, participant, uow)
+        except Exception as e:
+            return f"Error executing {tool_call.name}: {str(e)}", None, None
+    
+    async def _run_tools(
+        self,
+        tool_calls: List[ToolCall],
+        meeting_id: str,
+        participant: AIParticipant,
+        uow: TurnUnitOfWork
+    ) -> List[tuple[str, Optional[Disagreement], Optional[Consensus]]]:
+        """Execute independent tool calls from one model response concurrently."""
+        return await asyncio.gather(*[
+            self._run_tool(tool_call, meeting_id, participant, uow)
+            for tool_call in tool_calls
+        ])
+    
+    @staticmethod
+    def _tool_round_messages(
+        content: str,
+        tool_calls: List[ToolCall],
+        results: List[tuple],
+    ) -> List[LLMMessage]:
+        """Assistant tool-call message followed by one role="tool" message per result."""
+        messages = [LLMMessage(role="assistant", content=content or None, tool_calls=tool_calls)]
+        for tool_call, (result, _, _) in zip(tool_calls, results):
+            messages.append(LLMMessage(role="tool", content=result, tool_call_id=tool_call.id))
+        return messages
+    
+    @staticmethod
+    def _add_usage(total: dict, usage: dict) -> None:
+        """Accumulate token usage across rounds."""
+        for key in ("prompt_tokens", "completion_tokens", "total_tokens", "cached_tokens"):
+            total[key] = total.get(key, 0) + (usage.get(key) or 0)
+    
+    @staticmethod
+    def _server_timings(usage: dict) -> dict:
+        """Prompt evaluation stats reported by local servers (Ollama), if any."""
+        return {
+            key: usage[key]
+            for key in ("prompt_eval_count", "prompt_eval_ms", "load_ms")
+            if key in usage
+        }
+    
+    @staticmethod
+    def _tool_artifacts(tool_results: List[dict], rounds: List[dict]) -> Optional[dict]:
+        """Tool results and per-round metrics saved with the message."""
+        if not tool_results:
+            return None
+        return {"tool_calls": tool_results, "rounds": rounds}
+    
     async def execute_turn(
         self,
         meeting_id: str,
@@ -187,9 +297,11 @@ class Orchestrator:
         1. Load meeting context
         2. Build prompts
         3. Call LLM with tools
-        4. Handle any tool calls
+        4. Run any tool calls concurrently and feed results back to the LLM,
+           for up to max_tool_rounds rounds
         5. Save and return response
         """
+        request_owner.set(meeting_id)
         
         # Load meeting data
         meeting = await self.meeting_manager.get_meeting(meeting_id)
@@ -206,43 +318,69 @@ class Orchestrator:
         if not participant:
             raise ValueError(f"Participant not found: {participant_id}")
         
-        # Get LLM provider (use global defaults if participant config is empty)
+        # Get the participant's provider chain (global defaults if its config is empty)
         provider_config = participant.provider_config
-        provider = get_provider(
-            provider_config.provider or None,  # Empty string = use default
-            provider_config.model or None       # Empty string = use default
-        )
+        provider = get_participant_route(participant, meeting.participants)
         
         # Build context
-        context = self._build_context(participant, meeting.messages, meeting.agenda)
+        context = self._build_context(participant, meeting, provider)
         
-        # Get tools
-        tools = get_default_tools()
+        # Get tools (none for models that can't call them)
+        tools = get_default_tools() if provider.capabilities.supports_tools else []
         
-        # Make LLM call
-        response = await provider.complete(
-            messages=context,
-            tools=tools,
-            temperature=provider_config.temperature
-        )
+        # Tool side effects are buffered and written with the message
+        uow = TurnUnitOfWork(meeting_id)
         
         # Track any conflicts/consensus from tool calls
         disagreements = []
         consensus_list = []
         tool_results = []
+        rounds = []
+        usage = {}
+        cost = 0.0
         
-        # Handle tool calls if any
-        if response.tool_calls:
-            for tool_call in response.tool_calls:
-                result, disagreement, consensus = await self._handle_tool_call(
-                    tool_call, meeting_id, participant
-                )
-                tool_results.append({"tool": tool_call.name, "result": result})
-                
+        for round_index in range(settings.max_tool_rounds + 1):
+            # The last round gets no tools so the model has to answer
+            round_tools = tools if round_index < settings.max_tool_rounds else None
+            
+            started = time.perf_counter()
+            response = await provider.complete(
+                messages=context,
+                tools=round_tools,
+                temperature=provider_config.temperature
+            )
+            llm_ms = (time.perf_counter() - started) * 1000
+            
+            self._add_usage(usage, response.usage)
+            cost += provider.estimate_cost(response.usage)
+            
+            round_metrics = {
+                "round": round_index,
+                "llm_ms": round(llm_ms, 1),
+                "prompt_tokens": response.usage.get("prompt_tokens", 0),
+                "cached_tokens": response.usage.get("cached_tokens", 0),
+                "completion_tokens": response.usage.get("completion_tokens", 0),
+                "tool_calls": len(response.tool_calls),
+                **self._server_timings(response.usage),
+                **provider.round_info(),
+            }
+            rounds.append(round_metrics)
+            
+            if not response.tool_calls:
+                break
+            
+            started = time.perf_counter()
+            results = await self._run_tools(response.tool_calls, meeting_id, participant, uow)
+            round_metrics["tool_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            
+            for tool_call, (result, disagreement, consensus) in zip(response.tool_calls, results):
+                tool_results.append({"tool": tool_call.name, "result": result, "round": round_index})
                 if disagreement:
                     disagreements.append(disagreement)
                 if consensus:
                     consensus_list.append(consensus)
+            
+            context = context + self._tool_round_messages(response.content, response.tool_calls, results)
         
         # Get the response content
         content = response.content or ""
@@ -250,18 +388,16 @@ class Orchestrator:
             # If only tool calls, create a summary
             content = f"[{participant.name} used tools: {', '.join(t['tool'] for t in tool_results)}]"
         
-        # Estimate cost
-        cost = provider.estimate_cost(response.usage)
-        
-        # Save the message
-        message = await self.meeting_manager.save_message(
+        # Save the message, tool side effects and cost in one round-trip
+        message = await self.meeting_manager.commit_turn(
+            uow,
             MessageCreate(
                 meeting_id=meeting_id,
                 content=content,
                 sender_type=SenderType.AI,
                 sender_id=participant.id,
                 sender_name=participant.name,
-                tool_artifacts={"tool_calls": tool_results} if tool_results else None,
+                tool_artifacts=self._tool_artifacts(tool_results, rounds),
                 estimated_cost=cost
             )
         )
@@ -280,8 +416,13 @@ class Orchestrator:
         """
         Execute an AI participant's turn with streaming.
         Yields StreamEvent objects for real-time UI updates.
+        
+        Tool calls from a round are executed concurrently once that round's
+        stream ends; their results are fed back and the model continues
+        streaming, for up to max_tool_rounds rounds.
         """
-        from app.llm import get_provider, StreamEvent, StreamEventType
+        from app.llm import StreamEvent, StreamEventType
+        request_owner.set(meeting_id)
         
         # Load meeting data
         meeting = await self.meeting_manager.get_meeting(meeting_id)
@@ -300,18 +441,18 @@ class Orchestrator:
             yield StreamEvent(type=StreamEventType.ERROR, content=f"Participant not found: {participant_id}")
             return
         
-        # Get LLM provider
+        # Get the participant's provider chain
         provider_config = participant.provider_config
-        provider = get_provider(
-            provider_config.provider or None,
-            provider_config.model or None
-        )
+        provider = get_participant_route(participant, meeting.participants)
         
         # Build context
-        context = self._build_context(participant, meeting.messages, meeting.agenda)
+        context = self._build_context(participant, meeting, provider)
         
-        # Get tools
-        tools = get_default_tools()
+        # Get tools (none for models that can't call them)
+        tools = get_default_tools() if provider.capabilities.supports_tools else []
+        
+        # Tool side effects are buffered and written with the message
+        uow = TurnUnitOfWork(meeting_id)
         
         # Track accumulated content and tool calls
         accumulated_content = ""
@@ -319,28 +460,77 @@ class Orchestrator:
         tool_calls_made = []
         disagreements = []
         consensus_list = []
+        rounds = []
         usage = {}
-        
-        # Stream the response
-        async for event in provider.stream(
-            messages=context,
-            tools=tools,
-            temperature=provider_config.temperature
-        ):
-            # Handle tool calls - execute them and yield results
-            if event.type == StreamEventType.TOOL_CALL and event.tool_name:
-                from app.llm.base import ToolCall
-                tool_call = ToolCall(
-                    id=event.tool_name,
-                    name=event.tool_name,
-                    arguments=event.tool_arguments or {}
-                )
+        cost = 0.0
+        
+        for round_index in range(settings.max_tool_rounds + 1):
+            # The last round gets no tools so the model has to answer
+            round_tools = tools if round_index < settings.max_tool_rounds else None
+            round_content = ""
+            round_tool_calls = []
+            round_usage = {}
+            first_event_ms = None
+            started = time.perf_counter()
+            
+            # Stream the response
+            async for event in provider.stream(
+                messages=context,
+                tools=round_tools,
+                temperature=provider_config.temperature
+            ):
+                if first_event_ms is None:
+                    first_event_ms = (time.perf_counter() - started) * 1000
                 
-                result, disagreement, consensus = await self._handle_tool_call(
-                    tool_call, meeting_id, participant
-                )
+                # Collect tool calls; they run together once the round's stream ends
+                if event.type == StreamEventType.TOOL_CALL and event.tool_name:
+                    round_tool_calls.append(ToolCall(
+                        id=event.tool_call_id or event.tool_name,
+                        name=event.tool_name,
+                        arguments=event.tool_arguments or {}
+                    ))
+                
+                elif event.type == StreamEventType.TEXT:
+                    round_content += event.content or ""
+                    accumulated_content += event.content or ""
+                    yield event
+                
+                elif event.type == StreamEventType.THINKING:
+                    accumulated_thinking += event.content or ""
+                    yield event
                 
-                tool_calls_made.append({"tool": event.tool_name, "result": result})
+                elif event.type == StreamEventType.DONE:
+                    round_usage = event.usage or round_usage
+                
+                elif event.type == StreamEventType.ERROR:
+                    yield event
+                    return
+            
+            self._add_usage(usage, round_usage)
+            cost += provider.estimate_cost(round_usage)
+            
+            round_metrics = {
+                "round": round_index,
+                "llm_ms": round((time.perf_counter() - started) * 1000, 1),
+                "first_event_ms": round(first_event_ms, 1) if first_event_ms is not None else None,
+                "prompt_tokens": round_usage.get("prompt_tokens", 0),
+                "cached_tokens": round_usage.get("cached_tokens", 0),
+                "completion_tokens": round_usage.get("completion_tokens", 0),
+                "tool_calls": len(round_tool_calls),
+                **self._server_timings(round_usage),
+                **provider.round_info(),
+            }
+            rounds.append(round_metrics)
+            
+            if not round_tool_calls:
+                break
+            
+            started = time.perf_counter()
+            results = await self._run_tools(round_tool_calls, meeting_id, participant, uow)
+            round_metrics["tool_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            
+            for tool_call, (result, disagreement, consensus) in zip(round_tool_calls, results):
+                tool_calls_made.append({"tool": tool_call.name, "result": result, "round": round_index})
                 
                 if disagreement:
                     disagreements.append(disagreement)
@@ -350,40 +540,27 @@ class Orchestrator:
                 # Yield tool result
                 yield StreamEvent(
                     type=StreamEventType.TOOL_RESULT,
-                    tool_name=event.tool_name,
+                    tool_call_id=tool_call.id,
+                    tool_name=tool_call.name,
                     tool_result=result
                 )
             
-            elif event.type == StreamEventType.TEXT:
-                accumulated_content += event.content or ""
-                yield event
-            
-            elif event.type == StreamEventType.THINKING:
-                accumulated_thinking += event.content or ""
-                yield event
-            
-            elif event.type == StreamEventType.DONE:
-                usage = event.usage or {}
-            
-            elif event.type == StreamEventType.ERROR:
-                yield event
-                return
+            context = context + self._tool_round_messages(round_content, round_tool_calls, results)
         
-        # Save the message
+        # Save the message, tool side effects and cost in one round-trip
         content = accumulated_content or ""
         if not content and tool_calls_made:
             content = f"[{participant.name} used tools: {', '.join(t['tool'] for t in tool_calls_made)}]"
         
-        cost = provider.estimate_cost(usage)
-        
-        message = await self.meeting_manager.save_message(
+        message = await self.meeting_manager.commit_turn(
+            uow,
             MessageCreate(
                 meeting_id=meeting_id,
                 content=content,
                 sender_type=SenderType.AI,
                 sender_id=participant.id,
                 sender_name=participant.name,
-                tool_artifacts={"tool_calls": tool_calls_made} if tool_calls_made else None,
+                tool_artifacts=self._tool_artifacts(tool_calls_made, rounds),
                 thinking_content=accumulated_thinking if accumulated_thinking else None,
                 estimated_cost=cost
             )
@@ -0,0 +1,209 @@
+"""
+Process pool for document parsing and chunking.
+Keeps pypdf/python-docx/openpyxl and the text splitter off the event loop,
+and splits large files into page/sheet ranges parsed in parallel.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import AsyncIterator, List
+import asyncio
+import multiprocessing
+
+from app.core.config import settings
+from app.services.document_processor import DocumentProcessor, DocumentChunk
+
+
+class ParsingError(Exception):
+    """A parse job failed, timed out, or its worker process crashed."""
+    pass
+
+
+# ============== Worker functions (run in child processes) ==============
+
+def _count_sections(path: str, file_type: str) -> int:
+    with open(path, "rb") as f:
+        return DocumentProcessor().count_sections(f.read(), file_type)
+
+
+def _parse_and_chunk(
+    path: str,
+    file_type: str,
+    start: int,
+    stop: int,
+    chunk_size: int,
+    chunk_overlap: int,
+) -> List[str]:
+    processor = DocumentProcessor(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    with open(path, "rb") as f:
+        content = f.read()
+
+    chunks = []
+    for section in processor.iter_sections(content, file_type, start, stop):
+        if section.strip():
+            chunks.extend(processor.text_splitter.split_text(section))
+    return chunks
+
+
+# ============== Pool ==============
+
+class ParsingPool:
+    """
+    Bounded ProcessPoolExecutor front-end for parse/chunk jobs.
+
+    At most `max_pending` jobs are accepted at once; further callers wait.
+    Only `max_workers` of them are handed to the executor at a time, so a
+    submitted job starts right away and its timeout covers running time
+    only. A job that times out has the pool's processes killed (a running
+    job can't be cancelled otherwise); jobs that were running alongside it,
+    or in a pool that crashed, are retried once on a fresh pool.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        max_pending: int,
+        job_timeout: float,
+        sections_per_job: int,
+    ):
+        self.max_workers = max_workers
+        self.job_timeout = job_timeout
+        self.sections_per_job = sections_per_job
+        self._slots = asyncio.Semaphore(max_pending)
+        self._running = asyncio.Semaphore(max_workers)
+        self._executor: ProcessPoolExecutor | None = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that runs threads (DB pool, httpx) is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def _reset_executor(self, kill: bool = False) -> None:
+        """Retire the current pool; with kill, terminate its worker processes too."""
+        executor = self._executor
+        if executor is None:
+            return
+        self._executor = None
+        if kill:
+            # Jobs still running in it fail with BrokenProcessPool
+            for process in list((getattr(executor, "_processes", None) or {}).values()):
+                process.terminate()
+        executor.shutdown(wait=False)
+
+    async def _run(self, fn, *args):
+        """Run a worker function with bounded queue depth and a timeout."""
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            for attempt in range(2):
+                async with self._running:
+                    executor = self._get_executor()
+                    try:
+                        return await asyncio.wait_for(
+                            loop.run_in_executor(executor, fn, *args),
+                            timeout=self.job_timeout,
+                        )
+                    except BrokenProcessPool:
+                        # Crashed, or killed because another job timed out
+                        if self._executor is executor:
+                            self._reset_executor()
+                        if attempt:
+                            raise ParsingError("Parser worker process crashed (file may be malformed or too large)")
+                    except asyncio.TimeoutError:
+                        if self._executor is executor:
+                            self._reset_executor(kill=True)
+                        raise ParsingError(f"Parsing timed out after {self.job_timeout:.0f}s")
+
+    async def iter_chunks(
+        self,
+        path: str,
+        file_name: str,
+        file_type: str,
+        additional_metadata: dict | None = None,
+        chunk_size: int = 500,
+        chunk_overlap: int = 50,
+    ) -> AsyncIterator[DocumentChunk]:
+        """
+        Parse and chunk a file in the pool, yielding chunks in document order.
+
+        The file is split into ranges of `sections_per_job` pages/sheets.
+        Up to `max_workers` ranges are parsed ahead of the consumer.
+
+        Args:
+            path: Path of the file on disk (workers read it directly)
+            file_name: Original file name
+            file_type: File extension
+            additional_metadata: Extra metadata for chunks
+            chunk_size: Target size of each chunk in characters
+            chunk_overlap: Overlap between chunks in characters
+        """
+        metadata = {
+            "file_name": file_name,
+            "file_type": file_type,
+            **(additional_metadata or {})
+        }
+
+        section_count = await self._run(_count_sections, path, file_type)
+        ranges = [
+            (start, min(start + self.sections_per_job, section_count))
+            for start in range(0, section_count, self.sections_per_job)
+        ]
+
+        def submit(start: int, stop: int) -> asyncio.Task:
+            return asyncio.create_task(
+                self._run(_parse_and_chunk, path, file_type, start, stop, chunk_size, chunk_overlap)
+            )
+
+        pending = [submit(*r) for r in ranges[:self.max_workers]]
+        next_range = len(pending)
+        chunk_index = 0
+
+        try:
+            while pending:
+                texts = await pending.pop(0)
+                if next_range < len(ranges):
+                    pending.append(submit(*ranges[next_range]))
+                    next_range += 1
+
+                for text in texts:
+                    yield DocumentChunk(
+                        text=text,
+                        chunk_index=chunk_index,
+                        metadata={**metadata, "chunk_index": chunk_index}
+                    )
+                    chunk_index += 1
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def shutdown(self) -> None:
+        """Shut down worker processes."""
+        self._reset_executor()
+
+
+# Singleton instance
+_parsing_pool: ParsingPool | None = None
+
+
+def get_parsing_pool() -> ParsingPool:
+    """Get or create the parsing pool."""
+    global _parsing_pool
+    if _parsing_pool is None:
+        _parsing_pool = ParsingPool(
+            max_workers=settings.parse_workers,
+            max_pending=settings.parse_max_pending,
+            job_timeout=settings.parse_job_timeout,
+            sections_per_job=settings.parse_sections_per_job,
+        )
+    return _parsing_pool
+
+
+def close_parsing_pool() -> None:
+    """Shut down the parsing pool if it was started."""
+    global _parsing_pool
+    if _parsing_pool is not None:
+        _parsing_pool.shutdown()
+        _parsing_pool = None
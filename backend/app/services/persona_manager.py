@@ -6,7 +6,7 @@ from typing import Optional, List
 from datetime import datetime
 import uuid
 
-from app.core.database import get_supabase
+from app.core.database import get_supabase, run_query
 from app.models import (
     Persona,
     PersonaCreate,
@@ -16,6 +16,9 @@ from app.models import (
     PromptVersionCreate,
 )
 
+# Persona columns plus embedded active prompt (filtered on is_active) and stack IDs
+PERSONA_SELECT = "*, prompt_versions(content, version), persona_knowledge_stacks(stack_id)"
+
 
 class PersonaManager:
     """Manages persona lifecycle and database operations."""
@@ -43,7 +46,7 @@ class PersonaManager:
             "updated_at": now,
         }
         
-        result = self.db.table("personas").insert(persona_data).execute()
+        result = await run_query(self.db.table("personas").insert(persona_data))
         persona = result.data[0]
         
         # Create initial prompt version if provided
@@ -61,7 +64,7 @@ class PersonaManager:
         stack_ids = getattr(data, 'stack_ids', [])
         if stack_ids:
             stack_inserts = [{"persona_id": persona_id, "stack_id": s_id} for s_id in stack_ids]
-            self.db.table("persona_knowledge_stacks").insert(stack_inserts).execute()
+            await run_query(self.db.table("persona_knowledge_stacks").insert(stack_inserts))
 
         return PersonaWithPrompt(
             **persona,
@@ -70,51 +73,50 @@ class PersonaManager:
             active_prompt_version=active_version,
         )
     
-    async def get_persona(self, persona_id: str) -> Optional[PersonaWithPrompt]:
-        """Get a persona with its active prompt."""
-        
-        # Fetch persona
-        result = self.db.table("personas") \
-            .select("*") \
-            .eq("id", persona_id) \
-            .execute()
-        
-        if not result.data:
-            return None
-        
-        persona = result.data[0]
-        
-        # Fetch active prompt
-        prompt_result = self.db.table("prompt_versions") \
-            .select("*") \
-            .eq("persona_id", persona_id) \
-            .eq("is_active", True) \
-            .execute()
+    @staticmethod
+    def _from_row(row: dict) -> PersonaWithPrompt:
+        """Build a PersonaWithPrompt from a row fetched with PERSONA_SELECT."""
+        prompts = row.pop("prompt_versions", None) or []
+        stacks = row.pop("persona_knowledge_stacks", None) or []
         
         active_prompt = None
         active_version = None
-        if prompt_result.data:
-            active_prompt = prompt_result.data[0]["content"]
-            active_version = prompt_result.data[0]["version"]
-            
-        # Fetch knowledge stack affiliations
-        stack_result = self.db.table("persona_knowledge_stacks") \
-            .select("stack_id") \
-            .eq("persona_id", persona_id) \
-            .execute()
-        stack_ids = [s["stack_id"] for s in stack_result.data] if stack_result.data else []
+        if prompts:
+            active_prompt = prompts[0]["content"]
+            active_version = prompts[0]["version"]
         
         return PersonaWithPrompt(
-            **persona,
-            stack_ids=stack_ids,
+            **row,
+            stack_ids=[s["stack_id"] for s in stacks],
             active_prompt=active_prompt,
             active_prompt_version=active_version,
         )
     
+    async def get_persona(self, persona_id: str) -> Optional[PersonaWithPrompt]:
+        """Get a persona with its active prompt."""
+        
+        # Persona, active prompt and stack affiliations in one request
+        result = await run_query(
+            self.db.table("personas")
+            .select(PERSONA_SELECT)
+            .eq("id", persona_id)
+            .eq("prompt_versions.is_active", True)
+        )
+        
+        if not result.data:
+            return None
+        
+        return self._from_row(result.data[0])
+    
     async def list_personas(self, user_id: Optional[str] = None, include_defaults: bool = True) -> List[PersonaWithPrompt]:
         """List all personas, optionally filtered by user."""
         
-        query = self.db.table("personas").select("*")
+        # Active prompts and stack affiliations are embedded, so this is one request
+        query = (
+            self.db.table("personas")
+            .select(PERSONA_SELECT)
+            .eq("prompt_versions.is_active", True)
+        )
         
         if user_id:
             if include_defaults:
@@ -124,38 +126,9 @@ class PersonaManager:
                 query = query.eq("user_id", user_id)
         # When no user_id is specified, return all personas (no filter needed)
         
-        result = query.order("created_at", desc=True).execute()
+        result = await run_query(query.order("created_at", desc=True))
         
-        personas = []
-        for p in result.data:
-            # Fetch active prompt for each persona
-            prompt_result = self.db.table("prompt_versions") \
-                .select("content, version") \
-                .eq("persona_id", p["id"]) \
-                .eq("is_active", True) \
-                .execute()
-            
-            active_prompt = None
-            active_version = None
-            if prompt_result.data:
-                active_prompt = prompt_result.data[0]["content"]
-                active_version = prompt_result.data[0]["version"]
-                
-            # Fetch stacks
-            stack_result = self.db.table("persona_knowledge_stacks") \
-                .select("stack_id") \
-                .eq("persona_id", p["id"]) \
-                .execute()
-            stack_ids = [s["stack_id"] for s in stack_result.data] if stack_result.data else []
-            
-            personas.append(PersonaWithPrompt(
-                **p,
-                stack_ids=stack_ids,
-                active_prompt=active_prompt,
-                active_prompt_version=active_version,
-            ))
-        
-        return personas
+        return [self._from_row(p) for p in result.data]
     
     async def update_persona(self, persona_id: str, data: PersonaUpdate) -> Optional[PersonaWithPrompt]:
         """Update persona metadata (not prompt)."""
@@ -174,25 +147,27 @@ class PersonaManager:
         
         if hasattr(data, 'stack_ids') and data.stack_ids is not None:
             # Delete old mappings
-            self.db.table("persona_knowledge_stacks") \
-                .delete() \
-                .eq("persona_id", persona_id) \
-                .execute()
+            await run_query(
+                self.db.table("persona_knowledge_stacks")
+                .delete()
+                .eq("persona_id", persona_id)
+            )
                 
             # Insert new mappings
             if data.stack_ids:
                 stack_inserts = [{"persona_id": persona_id, "stack_id": s_id} for s_id in data.stack_ids]
-                self.db.table("persona_knowledge_stacks").insert(stack_inserts).execute()
+                await run_query(self.db.table("persona_knowledge_stacks").insert(stack_inserts))
         
         if not update_data:
             return await self.get_persona(persona_id)
         
         update_data["updated_at"] = datetime.utcnow().isoformat()
         
-        self.db.table("personas") \
-            .update(update_data) \
-            .eq("id", persona_id) \
-            .execute()
+        await run_query(
+            self.db.table("personas")
+            .update(update_data)
+            .eq("id", persona_id)
+        )
         
         return await self.get_persona(persona_id)
     
@@ -200,16 +175,18 @@ class PersonaManager:
         """Delete a persona and all its prompt versions."""
         
         # Delete prompt versions first (cascade should handle this but be explicit)
-        self.db.table("prompt_versions") \
-            .delete() \
-            .eq("persona_id", persona_id) \
-            .execute()
+        await run_query(
+            self.db.table("prompt_versions")
+            .delete()
+            .eq("persona_id", persona_id)
+        )
         
         # Delete persona
-        result = self.db.table("personas") \
-            .delete() \
-            .eq("id", persona_id) \
-            .execute()
+        result = await run_query(
+            self.db.table("personas")
+            .delete()
+            .eq("id", persona_id)
+        )
         
         return len(result.data) > 0
     
@@ -219,22 +196,24 @@ class PersonaManager:
         """Create a new prompt version and set it as active."""
         
         # Get current max version
-        max_result = self.db.table("prompt_versions") \
-            .select("version") \
-            .eq("persona_id", persona_id) \
-            .order("version", desc=True) \
-            .limit(1) \
-            .execute()
+        max_result = await run_query(
+            self.db.table("prompt_versions")
+            .select("version")
+            .eq("persona_id", persona_id)
+            .order("version", desc=True)
+            .limit(1)
+        )
         
         new_version = 1
         if max_result.data:
             new_version = max_result.data[0]["version"] + 1
         
         # Deactivate all existing versions
-        self.db.table("prompt_versions") \
-            .update({"is_active": False}) \
-            .eq("persona_id", persona_id) \
-            .execute()
+        await run_query(
+            self.db.table("prompt_versions")
+            .update({"is_active": False})
+            .eq("persona_id", persona_id)
+        )
         
         # Create new version
         version_id = str(uuid.uuid4())
@@ -249,24 +228,26 @@ class PersonaManager:
             "created_at": now,
         }
         
-        result = self.db.table("prompt_versions").insert(version_data).execute()
+        result = await run_query(self.db.table("prompt_versions").insert(version_data))
         
         # Update persona's updated_at
-        self.db.table("personas") \
-            .update({"updated_at": now}) \
-            .eq("id", persona_id) \
-            .execute()
+        await run_query(
+            self.db.table("personas")
+            .update({"updated_at": now})
+            .eq("id", persona_id)
+        )
         
         return PromptVersion(**result.data[0])
     
     async def list_prompt_versions(self, persona_id: str) -> List[PromptVersion]:
         """List all prompt versions for a persona."""
         
-        result = self.db.table("prompt_versions") \
-            .select("*") \
-            .eq("persona_id", persona_id) \
-            .order("version", desc=True) \
-            .execute()
+        result = await run_query(
+            self.db.table("prompt_versions")
+            .select("*")
+            .eq("persona_id", persona_id)
+            .order("version", desc=True)
+        )
         
         return [PromptVersion(**v) for v in result.data]
     
@@ -274,23 +255,26 @@ class PersonaManager:
         """Activate a specific prompt version."""
         
         # Deactivate all versions
-        self.db.table("prompt_versions") \
-            .update({"is_active": False}) \
-            .eq("persona_id", persona_id) \
-            .execute()
+        await run_query(
+            self.db.table("prompt_versions")
+            .update({"is_active": False})
+            .eq("persona_id", persona_id)
+        )
         
         # Activate the specified version
-        result = self.db.table("prompt_versions") \
-            .update({"is_active": True}) \
-            .eq("persona_id", persona_id) \
-            .eq("version", version) \
-            .execute()
+        result = await run_query(
+            self.db.table("prompt_versions")
+            .update({"is_active": True})
+            .eq("persona_id", persona_id)
+            .eq("version", version)
+        )
         
         if result.data:
-            self.db.table("personas") \
-                .update({"updated_at": datetime.utcnow().isoformat()}) \
-                .eq("id", persona_id) \
-                .execute()
+            await run_query(
+                self.db.table("personas")
+                .update({"updated_at": datetime.utcnow().isoformat()})
+                .eq("id", persona_id)
+            )
             return True
         
         return False
@@ -0,0 +1,131 @@
+"""
+Token counting helpers.
+Counts are cached per message so long meetings are not re-tokenized every turn.
+"""
+
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Optional
+
+from app.core.config import settings
+from app.llm import get_provider_registry
+from app.models import AIParticipant, Message
+
+# Rough per-message overhead for role markers and the speaker prefix
+MESSAGE_OVERHEAD_TOKENS = 8
+
+# Model ID prefixes tokenized with o200k_base (newer OpenAI models)
+O200K_MODEL_PREFIXES = ("gpt-4o", "gpt-4.1", "gpt-5", "o1", "o3", "o4")
+DEFAULT_ENCODING = "cl100k_base"
+
+_encodings: dict = {}
+
+
+def _get_encoding(name: str = DEFAULT_ENCODING):
+    """Load a tiktoken encoding once; None if unavailable."""
+    if name not in _encodings:
+        try:
+            import tiktoken
+            _encodings[name] = tiktoken.get_encoding(name)
+        except Exception:
+            _encodings[name] = None
+    return _encodings[name]
+
+
+def encoding_for_model(model: Optional[str]) -> str:
+    """
+    tiktoken encoding name to count tokens for a model.
+    
+    settings.token_encoding overrides the choice. Models from other vendors
+    have no public tiktoken encoding; cl100k_base is a close approximation.
+    """
+    if settings.token_encoding:
+        return settings.token_encoding
+    name = (model or "").rsplit("/", 1)[-1].lower()
+    if name.startswith(O200K_MODEL_PREFIXES):
+        return "o200k_base"
+    return DEFAULT_ENCODING
+
+
+def count_tokens(text: Optional[str], encoding: str = DEFAULT_ENCODING) -> int:
+    """Count tokens in text (falls back to ~4 characters per token)."""
+    if not text:
+        return 0
+    enc = _get_encoding(encoding)
+    if enc is None:
+        return len(text) // 4 + 1
+    return len(enc.encode(text, disallowed_special=()))
+
+
+@lru_cache(maxsize=1024)
+def count_tokens_cached(text: Optional[str], encoding: str = DEFAULT_ENCODING) -> int:
+    """count_tokens memoized by text, for strings that are counted repeatedly (system prompts)."""
+    return count_tokens(text, encoding)
+
+
+class TokenCountCache:
+    """LRU of token counts keyed by message ID (messages are immutable)."""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._counts: "OrderedDict[str, int]" = OrderedDict()
+
+    def message_tokens(self, message: Message) -> int:
+        """
+        Token count of a message, including role overhead.
+
+        Uses the count stored when the message was saved (which also covers
+        thinking content, so it errs high); only older rows without one are
+        tokenized here.
+        """
+        if message.token_count:
+            return message.token_count + MESSAGE_OVERHEAD_TOKENS
+
+        count = self._counts.get(message.id)
+        if count is not None:
+            self._counts.move_to_end(message.id)
+            return count
+
+        count = count_tokens(message.content) + MESSAGE_OVERHEAD_TOKENS
+        self._counts[message.id] = count
+        while len(self._counts) > self.max_entries:
+            self._counts.popitem(last=False)
+        return count
+
+
+def get_context_length(provider: Optional[str], model: Optional[str]) -> int:
+    """
+    Context window of a provider/model from the provider catalogue.
+
+    Empty provider/model resolve to the configured defaults; unknown models
+    use settings.context_default_length.
+    """
+    try:
+        return get_provider_registry().capabilities(provider, model).context_length
+    except ValueError:
+        return settings.context_default_length
+
+
+def meeting_encoding(participants: List[AIParticipant]) -> str:
+    """Encoding used for a meeting's stored token counts (its first participant's model)."""
+    if not participants:
+        return encoding_for_model(None)
+    config = participants[0].provider_config
+    try:
+        _, model = get_provider_registry().resolve(config.provider or None, config.model or None)
+    except ValueError:
+        # Unknown or legacy provider
+        return encoding_for_model(None)
+    return encoding_for_model(model)
+
+
+# Singleton instance
+_token_cache: TokenCountCache | None = None
+
+
+def get_token_cache() -> TokenCountCache:
+    """Get or create the process-wide token count cache."""
+    global _token_cache
+    if _token_cache is None:
+        _token_cache = TokenCountCache(settings.token_count_cache_size)
+    return _token_cache
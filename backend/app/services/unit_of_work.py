@@ -0,0 +1,57 @@
+"""
+Per-turn unit of work - buffers an AI turn's writes for a single flush.
+"""
+
+from datetime import datetime
+from typing import List
+import uuid
+
+from app.models import (
+    Disagreement,
+    DisagreementCreate,
+    Consensus,
+    ConsensusCreate,
+)
+
+
+class TurnUnitOfWork:
+    """
+    Collects disagreements and consensus logged by tool calls during a turn.
+
+    Rows get their IDs and timestamps here, so tool handlers can return
+    the full models immediately. MeetingManager.commit_turn writes them
+    together with the turn's message and cost in one transaction.
+    """
+
+    def __init__(self, meeting_id: str):
+        self.meeting_id = meeting_id
+        self.disagreements: List[Disagreement] = []
+        self.consensus: List[Consensus] = []
+
+    def add_disagreement(self, data: DisagreementCreate) -> Disagreement:
+        """Buffer a disagreement."""
+        disagreement = Disagreement(
+            id=str(uuid.uuid4()),
+            created_at=datetime.utcnow(),
+            **data.model_dump(),
+        )
+        self.disagreements.append(disagreement)
+        return disagreement
+
+    def add_consensus(self, data: ConsensusCreate) -> Consensus:
+        """Buffer a consensus entry."""
+        consensus = Consensus(
+            id=str(uuid.uuid4()),
+            created_at=datetime.utcnow(),
+            **data.model_dump(),
+        )
+        self.consensus.append(consensus)
+        return consensus
+
+    def disagreement_rows(self) -> List[dict]:
+        """Disagreements as table rows."""
+        return [d.model_dump(mode="json") for d in self.disagreements]
+
+    def consensus_rows(self) -> List[dict]:
+        """Consensus entries as table rows."""
+        return [c.model_dump(mode="json") for c in self.consensus]
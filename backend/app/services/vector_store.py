@@ -3,10 +3,16 @@ Vector store service for Qdrant collection management.
 Handles document indexing, semantic search, and collection lifecycle.
 """
 
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable
 from dataclasses import dataclass
+from itertools import islice
 from typing import List, Optional
+import asyncio
+import heapq
+import time
 import uuid
 
+from qdrant_client.http.exceptions import UnexpectedResponse
 from qdrant_client.models import (
     Distance,
     VectorParams,
@@ -49,6 +55,10 @@ class VectorStoreManager:
             embedding_provider: Optional custom embedding provider. Defaults to settings.
         """
         self._embedding_provider = embedding_provider
+        # Collection registry: name -> (exists, checked_at monotonic time)
+        self._known_collections: dict[str, tuple[bool, float]] = {}
+        self.collection_cache_hits = 0
+        self.collection_cache_misses = 0
     
     @property
     def client(self):
@@ -87,21 +97,26 @@ class VectorStoreManager:
         Returns:
             True if created, False if already exists
         """
-        # Check if collection exists
-        collections = await self.client.get_collections()
-        existing_names = [c.name for c in collections.collections]
-        
-        if collection_name in existing_names:
+        if await self.collection_exists(collection_name):
             return False
         
         # Create collection with embedding dimension
-        await self.client.create_collection(
-            collection_name=collection_name,
-            vectors_config=VectorParams(
-                size=self.embedding_provider.dimension,
-                distance=Distance.COSINE,
-            ),
-        )
+        try:
+            await self.client.create_collection(
+                collection_name=collection_name,
+                vectors_config=VectorParams(
+                    size=self.embedding_provider.dimension,
+                    distance=Distance.COSINE,
+                ),
+            )
+        except Exception:
+            # Another worker may have created it since the cached check
+            if await self.client.collection_exists(collection_name):
+                self._remember_collection(collection_name, True)
+                return False
+            raise
+        
+        self._remember_collection(collection_name, True)
         return True
     
     async def delete_collection(self, collection_name: str) -> bool:
@@ -119,11 +134,58 @@ class VectorStoreManager:
             return True
         except Exception:
             return False
+        finally:
+            self._known_collections.pop(collection_name, None)
     
     async def collection_exists(self, collection_name: str) -> bool:
-        """Check if a collection exists."""
-        collections = await self.client.get_collections()
-        return collection_name in [c.name for c in collections.collections]
+        """
+        Check if a collection exists.
+        
+        Answers from the collection registry while the entry is younger than
+        QDRANT_COLLECTION_CACHE_TTL (QDRANT_COLLECTION_NEGATIVE_TTL for
+        collections that didn't exist, since the standalone ingestion worker
+        may create them); otherwise asks Qdrant for this one name. Another
+        process may delete a collection while it is cached as existing, so
+        operations that get a 404 for it drop the entry (_forget_if_missing).
+        """
+        entry = self._known_collections.get(collection_name)
+        if entry is not None:
+            exists, checked_at = entry
+            ttl = settings.qdrant_collection_cache_ttl if exists else settings.qdrant_collection_negative_ttl
+            if time.monotonic() - checked_at < ttl:
+                self.collection_cache_hits += 1
+                return exists
+        
+        self.collection_cache_misses += 1
+        exists = await self.client.collection_exists(collection_name)
+        self._remember_collection(collection_name, exists)
+        return exists
+    
+    def _remember_collection(self, collection_name: str, exists: bool) -> None:
+        """Record a collection's existence in the registry."""
+        self._known_collections[collection_name] = (exists, time.monotonic())
+    
+    def _forget_if_missing(self, collection_name: str, error: Exception) -> bool:
+        """
+        Drop a collection's registry entry if error is Qdrant's not-found response.
+        
+        Returns:
+            True if the collection no longer exists
+        """
+        if isinstance(error, UnexpectedResponse) and error.status_code == 404:
+            self._known_collections.pop(collection_name, None)
+            return True
+        return False
+    
+    def collection_cache_stats(self) -> dict:
+        """Hit/miss counters for the collection registry."""
+        lookups = self.collection_cache_hits + self.collection_cache_misses
+        return {
+            "hits": self.collection_cache_hits,
+            "misses": self.collection_cache_misses,
+            "hit_rate": round(self.collection_cache_hits / lookups, 3) if lookups else 0.0,
+            "entries": len(self._known_collections),
+        }
     
     async def index_document(
         self,
@@ -145,34 +207,125 @@ class VectorStoreManager:
         if not chunks:
             return 0
         
-        # Ensure collection exists
-        await self.create_collection(collection_name)
-        
-        # Generate embeddings for all chunks
-        texts = [chunk.text for chunk in chunks]
-        embeddings = await self.embedding_provider.embed_batch(texts)
-        
-        # Create points with metadata
-        points = []
-        for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
-            point_id = str(uuid.uuid4())
-            points.append(
-                PointStruct(
-                    id=point_id,
-                    vector=embedding,
-                    payload={
-                        "document_id": document_id,
-                        "text": chunk.text,
-                        "chunk_index": chunk.chunk_index,
-                        **chunk.metadata,
-                    },
-                )
-            )
+        return await self.index_chunks(collection_name, document_id, chunks)
+    
+    async def index_chunks(
+        self,
+        collection_name: str,
+        document_id: str,
+        chunks: Iterable[DocumentChunk] | AsyncIterable[DocumentChunk],
+        on_progress: Optional[Callable[[int], Awaitable[None]]] = None,
+    ) -> int:
+        """
+        Index a stream of chunks through a bounded embed/upsert pipeline.
         
-        # Upsert points into collection
-        await self.client.upsert(collection_name=collection_name, points=points)
+        Chunks are grouped into provider-sized batches, embedded, and upserted
+        in three stages joined by bounded queues, so upserting one batch
+        overlaps with embedding the next and only a few batches are in memory.
+        Synchronous iterables (e.g. a list of chunks) are pulled
+        in a worker thread to keep parsing off the event loop.
+        
+        Point IDs are derived from (document_id, chunk_index), so re-indexing
+        a document overwrites its points instead of duplicating them.
+        
+        Args:
+            collection_name: Target collection
+            document_id: Unique document identifier
+            chunks: Chunks to index, sync or async iterable
+            on_progress: Optional coroutine called with the running count
+                of indexed chunks after each upsert
+            
+        Returns:
+            Number of chunks indexed
+        """
+        batch_size = min(self.embedding_provider.max_batch_size, settings.index_batch_size)
+        embed_queue: asyncio.Queue = asyncio.Queue(maxsize=settings.index_queue_depth)
+        upsert_queue: asyncio.Queue = asyncio.Queue(maxsize=settings.index_queue_depth)
+        indexed = 0
+        collection_ready = False
         
-        return len(points)
+        async def produce_batches():
+            async for batch in self._iter_batches(chunks, batch_size):
+                await embed_queue.put(batch)
+            await embed_queue.put(None)
+        
+        async def embed_batches():
+            nonlocal collection_ready
+            while (batch := await embed_queue.get()) is not None:
+                if not collection_ready:
+                    await self.create_collection(collection_name)
+                    collection_ready = True
+                
+                embeddings = await self.embedding_provider.embed_batch([c.text for c in batch])
+                await upsert_queue.put([
+                    PointStruct(
+                        id=self._point_id(document_id, chunk.chunk_index),
+                        vector=embedding,
+                        payload={
+                            "document_id": document_id,
+                            "text": chunk.text,
+                            "chunk_index": chunk.chunk_index,
+                            **chunk.metadata,
+                        },
+                    )
+                    for chunk, embedding in zip(batch, embeddings)
+                ])
+            await upsert_queue.put(None)
+        
+        async def upsert_batches():
+            nonlocal indexed
+            while (points := await upsert_queue.get()) is not None:
+                try:
+                    await self.client.upsert(collection_name=collection_name, points=points)
+                except Exception as e:
+                    # Deleted elsewhere: the job's retry recreates it after a fresh check
+                    self._forget_if_missing(collection_name, e)
+                    raise
+                indexed += len(points)
+                if on_progress:
+                    await on_progress(indexed)
+        
+        tasks = [
+            asyncio.create_task(produce_batches()),
+            asyncio.create_task(embed_batches()),
+            asyncio.create_task(upsert_batches()),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # A failed stage would leave its neighbours blocked on a queue
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        
+        return indexed
+    
+    @staticmethod
+    async def _iter_batches(
+        chunks: Iterable[DocumentChunk] | AsyncIterable[DocumentChunk],
+        batch_size: int,
+    ) -> AsyncIterator[List[DocumentChunk]]:
+        """Group a sync or async chunk stream into lists of batch_size."""
+        if isinstance(chunks, AsyncIterable):
+            batch = []
+            async for chunk in chunks:
+                batch.append(chunk)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+            return
+        
+        iterator = iter(chunks)
+        while batch := await asyncio.to_thread(lambda: list(islice(iterator, batch_size))):
+            yield batch
+    
+    @staticmethod
+    def _point_id(document_id: str, chunk_index: int) -> str:
+        """Deterministic point ID for a document chunk."""
+        return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{document_id}/{chunk_index}"))
     
     async def search(
         self,
@@ -200,6 +353,16 @@ class VectorStoreManager:
         # Generate query embedding
         query_embedding = await self.embedding_provider.embed_text(query)
         
+        return await self._search_by_vector(collection_name, query_embedding, limit, document_id)
+    
+    async def _search_by_vector(
+        self,
+        collection_name: str,
+        query_embedding: List[float],
+        limit: int,
+        document_id: Optional[str] = None,
+    ) -> List[SearchResult]:
+        """Run a nearest-neighbour query with a precomputed embedding."""
         # Build filter if document_id specified
         search_filter = None
         if document_id:
@@ -213,12 +376,18 @@ class VectorStoreManager:
             )
         
         # Perform search
-        results = await self.client.search(
-            collection_name=collection_name,
-            query_vector=query_embedding,
-            limit=limit,
-            query_filter=search_filter if search_filter else None,
-        )
+        try:
+            response = await self.client.query_points(
+                collection_name=collection_name,
+                query=query_embedding,
+                limit=limit,
+                query_filter=search_filter,
+                with_payload=True,
+            )
+        except Exception as e:
+            if self._forget_if_missing(collection_name, e):
+                return []
+            raise
         
         return [
             SearchResult(
@@ -228,7 +397,7 @@ class VectorStoreManager:
                 chunk_index=r.payload.get("chunk_index", 0),
                 metadata={k: v for k, v in r.payload.items() if k not in ["text", "document_id", "chunk_index"]},
             )
-            for r in results
+            for r in response.points
         ]
     
     async def search_multiple_collections(
@@ -240,6 +409,10 @@ class VectorStoreManager:
         """
         Search across multiple collections and merge results.
         
+        The query is embedded once and all collections are queried
+        concurrently. A collection that errors or exceeds
+        VECTOR_SEARCH_TIMEOUT is skipped, so callers get partial results.
+        
         Args:
             collection_names: List of collections to search
             query: Search query text
@@ -248,15 +421,31 @@ class VectorStoreManager:
         Returns:
             Merged and re-ranked results
         """
-        all_results = []
+        exists = await asyncio.gather(*(self.collection_exists(name) for name in collection_names))
+        existing = [name for name, found in zip(collection_names, exists) if found]
+        if not existing:
+            return []
         
-        for collection_name in collection_names:
-            results = await self.search(collection_name, query, limit=limit)
-            all_results.extend(results)
+        query_embedding = await self.embedding_provider.embed_text(query)
         
-        # Sort by score and take top results
-        all_results.sort(key=lambda r: r.score, reverse=True)
-        return all_results[:limit]
+        async def search_one(collection_name: str) -> List[SearchResult]:
+            try:
+                return await asyncio.wait_for(
+                    self._search_by_vector(collection_name, query_embedding, limit),
+                    timeout=settings.vector_search_timeout,
+                )
+            except Exception as e:
+                print(f"[VectorStore] Search in {collection_name} skipped: {e!r}")
+                return []
+        
+        per_collection = await asyncio.gather(*(search_one(name) for name in existing))
+        
+        # Top-k by score across all collections
+        return heapq.nlargest(
+            limit,
+            (r for results in per_collection for r in results),
+            key=lambda r: r.score,
+        )
     
     async def delete_document(
         self,
@@ -277,17 +466,22 @@ class VectorStoreManager:
             return 0
         
         # Delete points by document_id filter
-        result = await self.client.delete(
-            collection_name=collection_name,
-            points_selector=Filter(
-                must=[
-                    FieldCondition(
-                        key="document_id",
-                        match=MatchValue(value=document_id),
-                    )
-                ]
-            ),
-        )
+        try:
+            result = await self.client.delete(
+                collection_name=collection_name,
+                points_selector=Filter(
+                    must=[
+                        FieldCondition(
+                            key="document_id",
+                            match=MatchValue(value=document_id),
+                        )
+                    ]
+                ),
+            )
+        except Exception as e:
+            if self._forget_if_missing(collection_name, e):
+                return 0
+            raise
         
         return getattr(result, "deleted_count", 0)
     
@@ -296,7 +490,12 @@ class VectorStoreManager:
         if not await self.collection_exists(collection_name):
             return {"exists": False}
         
-        info = await self.client.get_collection(collection_name=collection_name)
+        try:
+            info = await self.client.get_collection(collection_name=collection_name)
+        except Exception as e:
+            if self._forget_if_missing(collection_name, e):
+                return {"exists": False}
+            raise
         return {
             "exists": True,
             "points_count": info.points_count,
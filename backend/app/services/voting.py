@@ -0,0 +1,143 @@
+"""
+End-of-meeting voting - collects participant votes concurrently.
+"""
+
+from typing import AsyncIterator, List
+import asyncio
+import json
+
+from app.llm import LLMMessage, request_owner
+from app.models import AIParticipant, EndMeetingVote, MeetingWithParticipants
+from app.services.orchestrator import get_participant_provider
+
+VOTE_PROMPT = """You are {name}, a {role} in this meeting.
+
+The user is proposing to end this meeting. Based on the recent discussion below, please vote on whether you think the meeting should end now.
+
+RECENT DISCUSSION:
+{conversation_context}
+
+MEETING AGENDA:
+{agenda}
+
+Please respond with ONLY a JSON object in this exact format (no other text):
+{{"vote": true or false, "reason": "Your brief reason (1-2 sentences)"}}
+
+Vote TRUE if you believe the meeting has achieved its objectives or reached a natural conclusion.
+Vote FALSE if you believe there are important topics still to discuss."""
+
+
+def build_conversation_context(meeting: MeetingWithParticipants) -> str:
+    """Last 20 messages, each truncated to 200 characters."""
+    return "\n".join([
+        f"{msg.sender_name}: {msg.content[:200]}..." if len(msg.content) > 200 else f"{msg.sender_name}: {msg.content}"
+        for msg in meeting.messages[-20:]
+    ])
+
+
+def parse_vote(participant: AIParticipant, content: str) -> EndMeetingVote:
+    """Parse a JSON vote response; unparseable responses count as a 'no'."""
+    try:
+        text = content.strip()
+        # Try to extract JSON from the response
+        if "```json" in text:
+            text = text.split("```json")[1].split("```")[0].strip()
+        elif "```" in text:
+            text = text.split("```")[1].split("```")[0].strip()
+
+        vote_data = json.loads(text)
+        return EndMeetingVote(
+            participant_id=participant.id,
+            participant_name=participant.name,
+            vote=vote_data.get("vote", False),
+            reason=vote_data.get("reason", "No reason provided")
+        )
+    except (json.JSONDecodeError, KeyError, AttributeError):
+        return EndMeetingVote(
+            participant_id=participant.id,
+            participant_name=participant.name,
+            vote=False,
+            reason=f"Could not parse vote response: {content[:100]}..."
+        )
+
+
+async def request_vote(
+    participant: AIParticipant,
+    meeting: MeetingWithParticipants,
+    conversation_context: str,
+    timeout: float,
+) -> EndMeetingVote:
+    """Ask one participant for its vote; errors and timeouts count as a 'no'."""
+    request_owner.set(meeting.id)
+    try:
+        provider = get_participant_provider(participant, meeting.participants)
+        prompt = VOTE_PROMPT.format(
+            name=participant.name,
+            role=participant.role,
+            conversation_context=conversation_context,
+            agenda=meeting.agenda,
+        )
+        response = await asyncio.wait_for(
+            provider.complete(
+                messages=[LLMMessage(role="user", content=prompt)],
+                tools=[],
+                temperature=0.3,
+            ),
+            timeout=timeout,
+        )
+        return parse_vote(participant, response.content or "")
+    except asyncio.TimeoutError:
+        reason = f"No vote within {timeout:.0f}s"
+    except Exception as e:
+        reason = f"Error getting vote: {str(e)}"
+
+    return EndMeetingVote(
+        participant_id=participant.id,
+        participant_name=participant.name,
+        vote=False,
+        reason=reason
+    )
+
+
+def is_majority(votes: List[EndMeetingVote], total: int) -> bool:
+    """Whether more than half of all participants voted to end."""
+    return sum(1 for v in votes if v.vote) > total / 2
+
+
+def is_decided(votes: List[EndMeetingVote], total: int) -> bool:
+    """Whether the outcome can no longer change, whatever the remaining votes are."""
+    yes_votes = sum(1 for v in votes if v.vote)
+    remaining = total - len(votes)
+    return yes_votes > total / 2 or yes_votes + remaining <= total / 2
+
+
+async def collect_votes(
+    meeting: MeetingWithParticipants,
+    timeout: float,
+) -> AsyncIterator[EndMeetingVote]:
+    """
+    Request all votes concurrently, yielding them as they arrive.
+
+    Stops as soon as the majority is decided and cancels the calls still
+    outstanding, so those participants have no vote in the result.
+    """
+    conversation_context = build_conversation_context(meeting)
+    total = len(meeting.participants)
+    pending = {
+        asyncio.create_task(request_vote(p, meeting, conversation_context, timeout))
+        for p in meeting.participants
+    }
+    votes = []
+
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                vote = task.result()
+                votes.append(vote)
+                yield vote
+            if is_decided(votes, total):
+                break
+    finally:
+        for task in pending:
+            task.cancel()
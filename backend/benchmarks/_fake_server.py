@@ -0,0 +1,127 @@
+"""
+Local stand-in servers for the benchmarks.
+A threaded HTTP/1.1 server that answers every request with a handler
+function after an optional delay, and counts connections and requests.
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Tuple
+import json
+import os
+import sys
+import threading
+import time
+
+# Make `app` importable when a benchmark is run from anywhere
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# Settings require these; benchmarks point the clients at fake servers instead
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:9")
+os.environ.setdefault("SUPABASE_KEY", "benchmark")
+
+# handler(method, path, body) -> (status, JSON-serializable payload)
+Handler = Callable[[str, str, bytes], Tuple[int, Any]]
+
+
+class FakeServer:
+    """
+    Threaded localhost server for benchmarks (use as a context manager).
+
+    Args:
+        handler: Builds the response for a request
+        latency: Seconds each request takes (slept in the request thread)
+        connect_latency: Seconds added once per new connection, standing in
+            for TCP + TLS handshake round-trips to a remote upstream
+    """
+
+    def __init__(self, handler: Handler, latency: float = 0.0, connect_latency: float = 0.0):
+        self.handler = handler
+        self.latency = latency
+        self.connect_latency = connect_latency
+        self.connections = 0
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            self.connections = self.requests = self.max_in_flight = 0
+
+    def _request_started(self) -> None:
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def _request_finished(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def __enter__(self) -> "FakeServer":
+        fake = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                if fake.connect_latency:
+                    time.sleep(fake.connect_latency)
+
+            def _respond(self):
+                fake._request_started()
+                try:
+                    length = int(self.headers.get("Content-Length") or 0)
+                    body = self.rfile.read(length) if length else b""
+                    if fake.latency:
+                        time.sleep(fake.latency)
+                    status, payload = fake.handler(self.command, self.path, body)
+                    data = json.dumps(payload).encode()
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                finally:
+                    fake._request_finished()
+
+            do_GET = do_POST = do_PATCH = do_DELETE = _respond
+
+            def log_message(self, *args):
+                pass
+
+        class Server(ThreadingHTTPServer):
+            daemon_threads = True
+            request_queue_size = 128
+
+            def process_request(self, request, client_address):
+                with fake._lock:
+                    fake.connections += 1
+                super().process_request(request, client_address)
+
+        self._server = Server(("127.0.0.1", 0), RequestHandler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def percentile(values, pct: float) -> float:
+    """Nearest-rank percentile of a non-empty sequence."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
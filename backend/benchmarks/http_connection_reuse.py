@@ -0,0 +1,101 @@
+"""
+Connection reuse of the shared provider HTTP clients.
+
+Sends Ollama /api/chat completions to a local mock server, once with a new
+httpx.AsyncClient per call (the old behaviour) and once through
+OllamaProvider, which uses the shared pooled client from app.core.http.
+The mock adds a fixed delay per new connection to stand in for the TCP and
+TLS handshakes to a remote upstream.
+
+Usage:
+    python benchmarks/http_connection_reuse.py [--requests 200] [--concurrency 10]
+        [--connect-latency-ms 30] [--latency-ms 5]
+"""
+
+import argparse
+import asyncio
+import time
+
+from _fake_server import FakeServer, percentile
+
+import httpx
+
+from app.core.config import settings
+from app.core.http import close_http_clients
+from app.llm.base import LLMMessage
+from app.llm.ollama import OllamaProvider
+
+MESSAGES = [LLMMessage(role="user", content="Hello")]
+
+
+def ollama(method: str, path: str, body: bytes):
+    return 200, {
+        "message": {"role": "assistant", "content": "Hi"},
+        "done": True,
+        "prompt_eval_count": 5,
+        "eval_count": 1,
+    }
+
+
+async def run(mode: str, server: FakeServer, args) -> dict:
+    settings.ollama_base_url = server.url
+    provider = OllamaProvider(model="benchmark")
+    payload = provider._build_payload(MESSAGES, None, 0.7, 64, stream=False)
+
+    async def per_call_client():
+        async with httpx.AsyncClient() as client:
+            response = await client.post(f"{server.url}/api/chat", json=payload, timeout=30)
+            response.raise_for_status()
+
+    async def shared_client():
+        await provider.complete(MESSAGES, temperature=0.7, max_tokens=64)
+
+    call = per_call_client if mode == "per-call client" else shared_client
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            started = time.perf_counter()
+            await call()
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    server.reset_counters()
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(args.requests)))
+    elapsed = time.perf_counter() - started
+    await close_http_clients()
+
+    return {
+        "mode": mode,
+        "rps": args.requests / elapsed,
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99),
+        "connections": server.connections,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--connect-latency-ms", type=float, default=30)
+    parser.add_argument("--latency-ms", type=float, default=5)
+    args = parser.parse_args()
+
+    print(
+        f"{args.requests} completions, {args.concurrency} concurrent, "
+        f"{args.connect_latency_ms:g}ms per new connection, {args.latency_ms:g}ms per request"
+    )
+    print(f"{'mode':<16} {'req/s':>8} {'p50':>9} {'p99':>9} {'connections':>12}")
+    with FakeServer(ollama, latency=args.latency_ms / 1000, connect_latency=args.connect_latency_ms / 1000) as server:
+        for mode in ("per-call client", "shared client"):
+            result = asyncio.run(run(mode, server, args))
+            print(
+                f"{result['mode']:<16} {result['rps']:>8.1f} {result['p50_ms']:>7.1f}ms "
+                f"{result['p99_ms']:>7.1f}ms {result['connections']:>12}"
+            )
+
+
+if __name__ == "__main__":
+    main()
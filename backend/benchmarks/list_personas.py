@@ -0,0 +1,164 @@
+"""
+Requests and wall time to list a large persona table.
+
+A local PostgREST stand-in serves a fixture of N personas, each with an
+active prompt version and a few knowledge stack affiliations. The old
+PersonaManager.list_personas fetched the personas and then, per persona,
+its active prompt and its stacks (2N + 1 round-trips); the current one
+embeds both in the personas select (one round-trip).
+
+Usage:
+    python benchmarks/list_personas.py [--personas 200] [--stacks 3]
+        [--db-latency-ms 20]
+"""
+
+from urllib.parse import parse_qs, urlsplit
+import argparse
+import asyncio
+import time
+
+from _fake_server import FakeServer
+
+from supabase import create_client
+
+from app.core.database import close_db_executor, run_query
+from app.models import PersonaWithPrompt
+from app.services.persona_manager import PersonaManager
+
+
+def build_fixture(personas: int, stacks: int) -> dict:
+    """Persona rows plus their prompt versions and stack affiliations."""
+    now = "2026-01-01T00:00:00"
+    rows, prompts, links = [], [], []
+    for i in range(personas):
+        persona_id = f"persona-{i:05d}"
+        rows.append({
+            "id": persona_id,
+            "name": f"Persona {i}",
+            "subtitle": "Benchmark fixture",
+            "color": "#6366f1",
+            "avatar_url": None,
+            "provider_config": {"provider": "", "model": "", "temperature": 0.7, "max_tokens": 2000},
+            "is_default": i % 10 == 0,
+            "user_id": None,
+            "created_at": now,
+            "updated_at": now,
+        })
+        prompts.append({
+            "persona_id": persona_id,
+            "content": f"You are persona {i}. " * 40,
+            "version": 3,
+            "is_active": True,
+        })
+        links.extend({"persona_id": persona_id, "stack_id": f"stack-{j}"} for j in range(stacks))
+    return {"personas": rows, "prompt_versions": prompts, "persona_knowledge_stacks": links}
+
+
+def postgrest(fixture: dict):
+    """Answer the selects both list_personas versions make."""
+    def handler(method: str, path: str, body: bytes):
+        url = urlsplit(path)
+        table = url.path.rsplit("/", 1)[-1]
+        params = parse_qs(url.query)
+
+        if table == "personas":
+            if "prompt_versions" not in params.get("select", [""])[0]:
+                return 200, fixture["personas"]
+            prompts = {p["persona_id"]: p for p in fixture["prompt_versions"]}
+            stacks: dict = {}
+            for link in fixture["persona_knowledge_stacks"]:
+                stacks.setdefault(link["persona_id"], []).append({"stack_id": link["stack_id"]})
+            return 200, [
+                {
+                    **row,
+                    "prompt_versions": [
+                        {k: prompts[row["id"]][k] for k in ("content", "version")}
+                    ] if row["id"] in prompts else [],
+                    "persona_knowledge_stacks": stacks.get(row["id"], []),
+                }
+                for row in fixture["personas"]
+            ]
+
+        persona_id = params.get("persona_id", ["eq."])[0][len("eq."):]
+        return 200, [r for r in fixture.get(table, []) if r["persona_id"] == persona_id]
+
+    return handler
+
+
+async def list_personas_n_plus_one(db) -> list:
+    """The pre-embedding list_personas: one prompt and one stack query per persona."""
+    result = await run_query(db.table("personas").select("*").order("created_at", desc=True))
+
+    personas = []
+    for p in result.data:
+        prompt_result = await run_query(
+            db.table("prompt_versions")
+            .select("content, version")
+            .eq("persona_id", p["id"])
+            .eq("is_active", True)
+        )
+
+        active_prompt = None
+        active_version = None
+        if prompt_result.data:
+            active_prompt = prompt_result.data[0]["content"]
+            active_version = prompt_result.data[0]["version"]
+
+        stack_result = await run_query(
+            db.table("persona_knowledge_stacks")
+            .select("stack_id")
+            .eq("persona_id", p["id"])
+        )
+        stack_ids = [s["stack_id"] for s in stack_result.data] if stack_result.data else []
+
+        personas.append(PersonaWithPrompt(
+            **p,
+            stack_ids=stack_ids,
+            active_prompt=active_prompt,
+            active_prompt_version=active_version,
+        ))
+
+    return personas
+
+
+async def run(args) -> list:
+    fixture = build_fixture(args.personas, args.stacks)
+    results = []
+
+    with FakeServer(postgrest(fixture), latency=args.db_latency_ms / 1000) as server:
+        db = create_client(server.url, "benchmark")
+        manager = PersonaManager()
+        manager.db = db
+
+        for mode, list_personas in (
+            ("n+1", lambda: list_personas_n_plus_one(db)),
+            ("embedded", manager.list_personas),
+        ):
+            server.reset_counters()
+            started = time.perf_counter()
+            personas = await list_personas()
+            elapsed = time.perf_counter() - started
+
+            assert len(personas) == args.personas
+            assert all(p.active_prompt and len(p.stack_ids) == args.stacks for p in personas)
+            results.append({"mode": mode, "requests": server.requests, "wall_s": elapsed})
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--personas", type=int, default=200)
+    parser.add_argument("--stacks", type=int, default=3)
+    parser.add_argument("--db-latency-ms", type=float, default=20)
+    args = parser.parse_args()
+
+    print(f"{args.personas} personas x {args.stacks} stacks, {args.db_latency_ms:g}ms per query")
+    print(f"{'mode':<10} {'requests':>9} {'wall':>9}")
+    for result in asyncio.run(run(args)):
+        print(f"{result['mode']:<10} {result['requests']:>9} {result['wall_s']:>8.2f}s")
+    close_db_executor()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Ollama embedding throughput (chunks/sec) against a local fake server.
+
+Compares the old one-request-at-a-time /api/embeddings loop with
+OllamaEmbedding's concurrent /api/embeddings fallback (server without
+/api/embed) and its batched /api/embed path. The fake server takes a
+fixed time per request plus a smaller time per text.
+
+The last run issues one batch per call from several concurrent callers,
+like the indexing pipeline does, and reports the most requests the
+server saw at once, which should not exceed OLLAMA_EMBED_CONCURRENCY.
+
+Usage:
+    python benchmarks/ollama_embedding_throughput.py [--chunks 2000]
+        [--request-ms 20] [--per-text-ms 1] [--concurrency 4] [--batch-size 64]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from _fake_server import FakeServer
+
+from app.core.config import settings
+from app.core.http import close_http_clients, get_http_client
+from app.services.embedding import OllamaEmbedding
+
+DIMENSION = 16
+
+
+class FakeOllama:
+    """Embedding endpoints with request + per-text latency."""
+
+    def __init__(self, request_ms: float, per_text_ms: float):
+        self.request_s = request_ms / 1000
+        self.per_text_s = per_text_ms / 1000
+        self.batch_endpoint = True
+
+    def __call__(self, method: str, path: str, body: bytes):
+        payload = json.loads(body or b"{}")
+        if path == "/api/embed":
+            if not self.batch_endpoint:
+                return 404, {"error": "not found"}
+            texts = payload["input"]
+            time.sleep(self.request_s + self.per_text_s * len(texts))
+            return 200, {"embeddings": [[0.1] * DIMENSION for _ in texts]}
+        if path == "/api/embeddings":
+            time.sleep(self.request_s + self.per_text_s)
+            return 200, {"embedding": [0.1] * DIMENSION}
+        return 404, {"error": "not found"}
+
+
+async def sequential(texts):
+    """The old embed_batch: one /api/embeddings request after another."""
+    client = get_http_client(settings.ollama_base_url)
+    for text in texts:
+        response = await client.post(
+            f"{settings.ollama_base_url}/api/embeddings",
+            json={"model": "benchmark", "prompt": text},
+        )
+        response.raise_for_status()
+
+
+async def timed(name: str, server: FakeServer, coro_factory, chunks: int) -> None:
+    server.reset_counters()
+    started = time.perf_counter()
+    await coro_factory()
+    elapsed = time.perf_counter() - started
+    await close_http_clients()
+    print(
+        f"{name:<28} {chunks / elapsed:>10.1f} {elapsed:>8.2f}s "
+        f"{server.requests:>9} {server.max_in_flight:>10}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--request-ms", type=float, default=20)
+    parser.add_argument("--per-text-ms", type=float, default=1)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    settings.ollama_embed_concurrency = args.concurrency
+    settings.ollama_embed_batch_size = args.batch_size
+    texts = [f"chunk {i} " + "lorem ipsum " * 40 for i in range(args.chunks)]
+    fake = FakeOllama(args.request_ms, args.per_text_ms)
+
+    print(
+        f"{args.chunks} chunks, {args.request_ms:g}ms per request + {args.per_text_ms:g}ms per text, "
+        f"concurrency {args.concurrency}, batch size {args.batch_size}"
+    )
+    print(f"{'mode':<28} {'chunks/s':>10} {'time':>9} {'requests':>9} {'max in-flight':>10}")
+
+    with FakeServer(fake) as server:
+        settings.ollama_base_url = server.url
+
+        # The sequential baseline is slow; time a slice and scale up
+        sample = texts[: min(len(texts), 200)]
+        asyncio.run(timed("sequential /api/embeddings", server, lambda: sequential(sample), len(sample)))
+
+        fake.batch_endpoint = False
+        asyncio.run(timed(
+            "concurrent /api/embeddings", server,
+            lambda: OllamaEmbedding(model="benchmark").embed_batch(texts), len(texts),
+        ))
+
+        fake.batch_endpoint = True
+        asyncio.run(timed(
+            "batched /api/embed", server,
+            lambda: OllamaEmbedding(model="benchmark").embed_batch(texts), len(texts),
+        ))
+
+        async def pipeline():
+            # One batch per call from concurrent callers sharing one provider
+            provider = OllamaEmbedding(model="benchmark")
+            await asyncio.gather(*(provider.embed_batch(batch) for batch in provider.batches(texts)))
+
+        asyncio.run(timed("batched, one batch per call", server, pipeline, len(texts)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Token inter-arrival latency of concurrent streaming turns while Supabase
+queries run on the same event loop.
+
+Each simulated /turn/stream request makes the same database round-trips as
+Orchestrator.execute_turn_streaming (meeting row, participants, messages,
+then the record_ai_turn RPC) against a local PostgREST stand-in, and streams
+tokens at a fixed interval in between. Queries run either inline with the
+synchronous client (`.execute()`, the old behaviour) or through run_query.
+
+Usage:
+    python benchmarks/turn_stream_latency.py [--streams 50] [--tokens 100]
+        [--token-interval-ms 20] [--db-latency-ms 50]
+"""
+
+import argparse
+import asyncio
+import time
+
+from _fake_server import FakeServer, percentile
+
+from supabase import create_client
+
+from app.core.database import close_db_executor, run_query
+
+
+def postgrest(method: str, path: str, body: bytes):
+    return 200, []
+
+
+async def turn(db, execute, tokens: int, interval: float, gaps: list) -> None:
+    """One streaming turn: load the meeting, stream tokens, commit the message."""
+    await execute(db.table("meetings").select("*").eq("id", "m"))
+    await execute(db.table("ai_participants").select("*").eq("meeting_id", "m"))
+    await execute(db.table("messages").select("*").eq("meeting_id", "m").order("created_at"))
+
+    last = time.perf_counter()
+    for _ in range(tokens):
+        await asyncio.sleep(interval)
+        now = time.perf_counter()
+        gaps.append((now - last) * 1000)
+        last = now
+
+    await execute(db.rpc("record_ai_turn", {"p_message": {}}))
+
+
+async def run(mode: str, args) -> dict:
+    async def blocking(query):
+        return query.execute()
+
+    execute = blocking if mode == "blocking" else run_query
+
+    with FakeServer(postgrest, latency=args.db_latency_ms / 1000) as server:
+        db = create_client(server.url, "benchmark")
+        gaps: list = []
+        interval = args.token_interval_ms / 1000
+
+        # Staggered starts, so loads and commits overlap other turns' streams
+        async def staggered(i):
+            await asyncio.sleep(i * interval / 2)
+            await turn(db, execute, args.tokens, interval, gaps)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(staggered(i) for i in range(args.streams)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "mode": mode,
+        "p50_ms": percentile(gaps, 50),
+        "p99_ms": percentile(gaps, 99),
+        "max_ms": max(gaps),
+        "wall_s": elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--streams", type=int, default=50)
+    parser.add_argument("--tokens", type=int, default=100)
+    parser.add_argument("--token-interval-ms", type=float, default=20)
+    parser.add_argument("--db-latency-ms", type=float, default=50)
+    args = parser.parse_args()
+
+    print(
+        f"{args.streams} concurrent streams x {args.tokens} tokens every {args.token_interval_ms:g}ms, "
+        f"{args.db_latency_ms:g}ms per query"
+    )
+    print(f"{'mode':<10} {'p50 gap':>10} {'p99 gap':>10} {'max gap':>10} {'wall':>8}")
+    for mode in ("blocking", "run_query"):
+        result = asyncio.run(run(mode, args))
+        print(
+            f"{result['mode']:<10} {result['p50_ms']:>8.1f}ms {result['p99_ms']:>8.1f}ms "
+            f"{result['max_ms']:>8.1f}ms {result['wall_s']:>7.2f}s"
+        )
+    close_db_executor()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Standalone document ingestion worker.
+
+Usage:
+    python ingest_worker.py
+
+Set INGESTION_INLINE_WORKER=false on the API so uploads are only
+processed here. Several workers may share the same queue database.
+"""
+
+import asyncio
+import signal
+
+from app.core.database import close_db_executor
+from app.core.http import init_http_clients, close_http_clients
+from app.core.qdrant import close_qdrant_client
+from app.services.ingestion_worker import create_ingestion_worker
+from app.services.parsing_pool import close_parsing_pool
+
+
+async def main():
+    init_http_clients()
+    worker = create_ingestion_worker()
+
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    print("Ingestion worker started")
+    run_task = asyncio.create_task(worker.run())
+    await stop.wait()
+
+    print("Ingestion worker stopping")
+    await worker.stop()
+    await run_task
+
+    await close_http_clients()
+    await close_qdrant_client()
+    close_parsing_pool()
+    close_db_executor()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,12 +1,64 @@
+from contextlib import asynccontextmanager
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
+from app.core.database import close_db_executor
+from app.core.http import init_http_clients, close_http_clients
+from app.core.qdrant import close_qdrant_client
+from app.llm.registry import get_provider_registry, startup_targets
+from app.llm.router import get_provider_health
+from app.services.collection_gc import run_collection_gc, close_collection_gc
+from app.services.embedding_cache import get_embedding_cache
+from app.services.ingestion_worker import create_ingestion_worker
+from app.services.parsing_pool import close_parsing_pool
+from app.services.vector_store import get_vector_store
 from app.api import meetings, participants, personas, settings as settings_api, documents, knowledge_stacks
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup/shutdown hooks."""
+    init_http_clients()
+    
+    # Warm providers in the background so a slow model load doesn't delay startup
+    warmup_task = None
+    if settings.provider_warmup_on_startup:
+        warmup_task = asyncio.create_task(get_provider_registry().warm_up(startup_targets()))
+    
+    worker = None
+    if settings.ingestion_inline_worker:
+        worker = create_ingestion_worker()
+        worker_task = asyncio.create_task(worker.run())
+    
+    gc_task = None
+    if settings.collection_gc_interval > 0:
+        gc_task = asyncio.create_task(run_collection_gc(settings.collection_gc_interval))
+    
+    yield
+    
+    if warmup_task is not None:
+        warmup_task.cancel()
+        await asyncio.gather(warmup_task, return_exceptions=True)
+    if gc_task is not None:
+        gc_task.cancel()
+        await asyncio.gather(gc_task, return_exceptions=True)
+    if worker is not None:
+        await worker.stop()
+        await worker_task
+    await close_collection_gc()
+    await close_http_clients()
+    await close_qdrant_client()
+    close_parsing_pool()
+    close_db_executor()
+
+
 app = FastAPI(
     title="Sabha API",
     description="Multi-Agent AI Advisory Board Backend",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan,
 )
 
 # CORS configuration
@@ -35,3 +87,30 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/health/providers")
+async def provider_health_check():
+    """Health-check the LLM providers in use."""
+    results = await get_provider_registry().health()
+    return {
+        "status": "healthy" if all(r["ok"] for r in results) else "degraded",
+        "providers": results,
+        "queues": get_provider_registry().queue_stats(),
+        "routing": get_provider_health().snapshot(),
+    }
+
+
+@app.get("/metrics/llm-queues")
+async def llm_queue_metrics():
+    """Queue depth and admission metrics of the LLM rate limiters."""
+    return {"queues": get_provider_registry().queue_stats()}
+
+
+@app.get("/metrics/caches")
+async def cache_metrics():
+    """Hit/miss counters of the in-process caches."""
+    return {
+        "collections": get_vector_store().collection_cache_stats(),
+        "embeddings": get_embedding_cache().stats() if settings.embedding_cache_max_bytes > 0 else None,
+    }
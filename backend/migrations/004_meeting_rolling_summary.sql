@@ -0,0 +1,9 @@
+-- Rolling Meeting Summary Migration
+-- Run this in Supabase SQL Editor
+
+-- ============================================
+-- MODIFY MEETINGS TABLE
+-- ============================================
+-- Hierarchical running summary maintained in the background:
+-- {"overview": str, "overview_end": int, "sections": [{"start": int, "end": int, "text": str}]}
+ALTER TABLE meetings ADD COLUMN IF NOT EXISTS rolling_summary JSONB;
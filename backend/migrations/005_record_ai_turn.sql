@@ -0,0 +1,39 @@
+-- Atomic AI Turn Write Migration
+-- Run this in Supabase SQL Editor
+
+-- ============================================
+-- RECORD AI TURN
+-- Inserts a turn's message, disagreements and consensus entries and
+-- bumps the meeting cost in one transaction (one round-trip per turn)
+-- ============================================
+CREATE OR REPLACE FUNCTION record_ai_turn(
+    p_message JSONB,
+    p_disagreements JSONB DEFAULT '[]'::jsonb,
+    p_consensus JSONB DEFAULT '[]'::jsonb
+)
+RETURNS SETOF messages AS $$
+DECLARE
+    v_cost DECIMAL := COALESCE((p_message->>'estimated_cost')::DECIMAL, 0);
+BEGIN
+    INSERT INTO disagreements (id, meeting_id, source_ai_id, target_name, topic, reasoning, severity, status, created_at)
+    SELECT id, meeting_id, source_ai_id, target_name, topic, reasoning, severity, status, created_at
+    FROM jsonb_populate_recordset(NULL::disagreements, p_disagreements);
+
+    INSERT INTO consensus (id, meeting_id, participants, topic, strength, created_at)
+    SELECT id, meeting_id, participants, topic, strength, created_at
+    FROM jsonb_populate_recordset(NULL::consensus, p_consensus);
+
+    IF v_cost > 0 THEN
+        UPDATE meetings
+        SET total_cost = total_cost + v_cost
+        WHERE id = (p_message->>'meeting_id')::UUID;
+    END IF;
+
+    RETURN QUERY
+    INSERT INTO messages (id, meeting_id, sender_type, sender_id, sender_name, content, citations, tool_artifacts, thinking_content, estimated_cost, created_at)
+    SELECT id, meeting_id, sender_type, sender_id, sender_name, content,
+           COALESCE(citations, '[]'::jsonb), tool_artifacts, thinking_content, COALESCE(estimated_cost, 0), created_at
+    FROM jsonb_populate_record(NULL::messages, p_message)
+    RETURNING *;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,33 @@
+-- Meeting Cascade Delete Migration
+-- Run this in Supabase SQL Editor
+
+-- ============================================
+-- ENSURE ON DELETE CASCADE FOR MEETING CHILDREN
+-- ============================================
+-- Deleting a meeting row removes everything that belongs to it in one
+-- statement. Re-creates the constraints for databases set up before the
+-- cascades were part of supabase_schema.sql.
+ALTER TABLE ai_participants
+    DROP CONSTRAINT IF EXISTS ai_participants_meeting_id_fkey,
+    ADD CONSTRAINT ai_participants_meeting_id_fkey
+        FOREIGN KEY (meeting_id) REFERENCES meetings(id) ON DELETE CASCADE;
+
+ALTER TABLE messages
+    DROP CONSTRAINT IF EXISTS messages_meeting_id_fkey,
+    ADD CONSTRAINT messages_meeting_id_fkey
+        FOREIGN KEY (meeting_id) REFERENCES meetings(id) ON DELETE CASCADE;
+
+ALTER TABLE disagreements
+    DROP CONSTRAINT IF EXISTS disagreements_meeting_id_fkey,
+    ADD CONSTRAINT disagreements_meeting_id_fkey
+        FOREIGN KEY (meeting_id) REFERENCES meetings(id) ON DELETE CASCADE;
+
+ALTER TABLE consensus
+    DROP CONSTRAINT IF EXISTS consensus_meeting_id_fkey,
+    ADD CONSTRAINT consensus_meeting_id_fkey
+        FOREIGN KEY (meeting_id) REFERENCES meetings(id) ON DELETE CASCADE;
+
+ALTER TABLE documents
+    DROP CONSTRAINT IF EXISTS documents_meeting_id_fkey,
+    ADD CONSTRAINT documents_meeting_id_fkey
+        FOREIGN KEY (meeting_id) REFERENCES meetings(id) ON DELETE CASCADE;
@@ -0,0 +1,85 @@
+-- Message Token Accounting Migration
+-- Run this in Supabase SQL Editor
+
+-- ============================================
+-- MODIFY MESSAGES AND MEETINGS TABLES
+-- ============================================
+-- Tokens in content + thinking_content, counted by the backend on save
+ALTER TABLE messages ADD COLUMN IF NOT EXISTS token_count INTEGER NOT NULL DEFAULT 0;
+
+-- Running per-meeting totals, maintained by the trigger below
+ALTER TABLE meetings ADD COLUMN IF NOT EXISTS message_tokens BIGINT NOT NULL DEFAULT 0;
+ALTER TABLE meetings ADD COLUMN IF NOT EXISTS message_count INTEGER NOT NULL DEFAULT 0;
+
+-- ============================================
+-- KEEP MEETING TOTALS IN STEP
+-- ============================================
+CREATE OR REPLACE FUNCTION add_message_to_meeting_totals()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE meetings
+    SET message_tokens = message_tokens + NEW.token_count,
+        message_count = message_count + 1
+    WHERE id = NEW.meeting_id;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS messages_meeting_totals ON messages;
+CREATE TRIGGER messages_meeting_totals
+    AFTER INSERT ON messages
+    FOR EACH ROW EXECUTE FUNCTION add_message_to_meeting_totals();
+
+-- ============================================
+-- RECORD AI TURN (now stores token_count)
+-- ============================================
+CREATE OR REPLACE FUNCTION record_ai_turn(
+    p_message JSONB,
+    p_disagreements JSONB DEFAULT '[]'::jsonb,
+    p_consensus JSONB DEFAULT '[]'::jsonb
+)
+RETURNS SETOF messages AS $$
+DECLARE
+    v_cost DECIMAL := COALESCE((p_message->>'estimated_cost')::DECIMAL, 0);
+BEGIN
+    INSERT INTO disagreements (id, meeting_id, source_ai_id, target_name, topic, reasoning, severity, status, created_at)
+    SELECT id, meeting_id, source_ai_id, target_name, topic, reasoning, severity, status, created_at
+    FROM jsonb_populate_recordset(NULL::disagreements, p_disagreements);
+
+    INSERT INTO consensus (id, meeting_id, participants, topic, strength, created_at)
+    SELECT id, meeting_id, participants, topic, strength, created_at
+    FROM jsonb_populate_recordset(NULL::consensus, p_consensus);
+
+    IF v_cost > 0 THEN
+        UPDATE meetings
+        SET total_cost = total_cost + v_cost
+        WHERE id = (p_message->>'meeting_id')::UUID;
+    END IF;
+
+    RETURN QUERY
+    INSERT INTO messages (id, meeting_id, sender_type, sender_id, sender_name, content, citations, tool_artifacts, thinking_content, estimated_cost, token_count, created_at)
+    SELECT id, meeting_id, sender_type, sender_id, sender_name, content,
+           COALESCE(citations, '[]'::jsonb), tool_artifacts, thinking_content, COALESCE(estimated_cost, 0),
+           COALESCE(token_count, 0), created_at
+    FROM jsonb_populate_record(NULL::messages, p_message)
+    RETURNING *;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================
+-- BACKFILL EXISTING MESSAGES
+-- ============================================
+-- Approximate (~4 characters per token); new messages are counted exactly
+UPDATE messages
+SET token_count = CEIL((LENGTH(content) + COALESCE(LENGTH(thinking_content), 0)) / 4.0)
+WHERE token_count = 0;
+
+UPDATE meetings m
+SET message_tokens = t.tokens,
+    message_count = t.messages
+FROM (
+    SELECT meeting_id, SUM(token_count) AS tokens, COUNT(*) AS messages
+    FROM messages
+    GROUP BY meeting_id
+) t
+WHERE m.id = t.meeting_id;